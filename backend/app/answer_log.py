@@ -0,0 +1,188 @@
+"""
+Write-behind answer log
+Answer submissions append to an in-process buffer that is flushed to
+user_answers in one executemany INSERT when it reaches ANSWER_LOG_BATCH_SIZE
+rows or every ANSWER_LOG_FLUSH_SECONDS, whichever comes first. The buffer is
+flushed on worker shutdown; rows still buffered if a worker is killed outright
+are lost, which is the trade-off for not committing per answer.
+
+A batch that fails because the database is unreachable or locked is kept
+for the next flush. Any other failure (a constraint violation, say) is
+pinned down by writing the batch's rows one at a time; rows that still fail
+are logged and dropped, so one bad row can't hold up every later flush.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from decouple import config
+from sqlalchemy import exc, insert
+
+from app.database import AsyncSessionLocal
+from app.models.answer_tracking import AnswerTracking
+from app.performance import rollup_delta_statement
+from app.ratings import RATING_DELTA_KEYS, rating_delta_statements
+
+ANSWER_LOG_BATCH_SIZE = config("ANSWER_LOG_BATCH_SIZE", default=200, cast=int)
+ANSWER_LOG_FLUSH_SECONDS = config("ANSWER_LOG_FLUSH_SECONDS", default=1.0, cast=float)
+# Cap on rows held while the database is unavailable; oldest rows are dropped
+ANSWER_LOG_MAX_PENDING = config("ANSWER_LOG_MAX_PENDING", default=10000, cast=int)
+
+# Worth retrying the whole batch later: the database was unreachable, busy or
+# locked, not the rows themselves (OSError covers connection and timeout errors)
+TRANSIENT_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.DisconnectionError, exc.TimeoutError, OSError)
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+async def write_answers(db, batch: List[dict]):
+    """Insert answer rows plus their rollup and rating deltas, in the caller's transaction"""
+    await db.execute(insert(AnswerTracking), [
+        {k: v for k, v in row.items() if k not in RATING_DELTA_KEYS} for row in batch
+    ])
+    # Rollups and ratings move in the same transaction as the answers they count
+    stmt, rows = rollup_delta_statement(db, batch)
+    if rows:
+        await db.execute(stmt, rows)
+    for stmt, rows in rating_delta_statements(db, batch):
+        await db.execute(stmt, rows)
+
+
+class AnswerLogBuffer:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = ANSWER_LOG_BATCH_SIZE,
+        flush_seconds: float = ANSWER_LOG_FLUSH_SECONDS,
+        max_pending: int = ANSWER_LOG_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._size_flush: Optional[asyncio.Task] = None
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def record(
+        self,
+        user_id: Optional[int],
+        question_id: int,
+        user_answer: str,
+        is_correct: bool,
+        subject: str,
+        difficulty: Optional[str] = None,
+        time_spent_seconds: Optional[int] = None,
+        user_rating_delta: Optional[float] = None,
+        question_rating_delta: Optional[float] = None,
+    ):
+        """Queue one answer (and its rating moves, if any); never waits on the database"""
+        self._pending.append({
+            "user_id": user_id,
+            "question_id": question_id,
+            "user_answer": user_answer,
+            "is_correct": is_correct,
+            "subject": subject,
+            "difficulty": difficulty,
+            "time_spent_seconds": time_spent_seconds,
+            "created_at": datetime.now(timezone.utc),
+            "user_rating_delta": user_rating_delta,
+            "question_rating_delta": question_rating_delta,
+        })
+        if len(self._pending) >= self.batch_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Write everything buffered so far in one transaction"""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                async with self.session_factory() as db:
+                    await self._write(db, batch)
+                    await db.commit()
+            except Exception as e:
+                self.failures += 1
+                if is_transient(e):
+                    print(f"Answer log flush failed ({len(batch)} rows kept for retry): {e}")
+                    self._requeue(batch)
+                    return
+                print(f"Answer log flush failed ({len(batch)} rows), writing them one at a time: {e}")
+                await self._write_each(batch)
+                return
+            self.flushed_rows += len(batch)
+            self.flushes += 1
+
+    async def _write_each(self, batch: List[dict]):
+        """Write rows in their own transactions, dropping the ones that are rejected"""
+        async with self.session_factory() as db:
+            for i, row in enumerate(batch):
+                try:
+                    await self._write(db, [row])
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    if is_transient(e):
+                        print(f"Answer log flush failed ({len(batch) - i} rows kept for retry): {e}")
+                        self._requeue(batch[i:])
+                        return
+                    print(f"Answer log dropped a rejected row (user {row['user_id']}, question {row['question_id']}): {e}")
+                    self.rejected += 1
+                    continue
+                self.flushed_rows += 1
+        self.flushes += 1
+
+    def _requeue(self, rows: List[dict]):
+        # Keep order: failed rows go back in front of newer ones
+        self._pending = rows + self._pending
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+
+    async def _write(self, db, batch: List[dict]):
+        await write_answers(db, batch)
+
+    async def _run_timer(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    def start(self):
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._run_timer())
+
+    async def stop(self):
+        """Stop the timer and flush what's left (worker shutdown)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+
+answer_log = AnswerLogBuffer()
@@ -1,16 +1,19 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 import os
 
+from app.auth.passwords import PASSWORD_HASH_ROUNDS, crypt_context
+
 # Secret key for JWT (should be in environment variable in production)
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
 # Use PBKDF2-SHA256 for compatibility in the dev environment (avoids bcrypt C-extension issues)
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Request handlers hash through app.auth.passwords.password_hasher; these
+# blocking helpers are for scripts
+pwd_context = crypt_context(PASSWORD_HASH_ROUNDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
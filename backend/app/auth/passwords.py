@@ -0,0 +1,111 @@
+"""
+Password hashing off the event loop
+PBKDF2 is deliberately slow, so hashing and verification run in a dedicated
+process pool (PASSWORD_HASH_WORKERS processes per app worker) instead of the
+request threadpool, where a signup or login burst would starve everything
+else. The pool is created lazily in each app worker, after gunicorn forks.
+
+The work factor is PASSWORD_HASH_ROUNDS; hashes made with a different
+number of rounds still verify, and are rehashed with the current setting on
+the next successful login. PASSWORD_HASH_WORKERS=0 hashes on the threadpool.
+
+Pool processes are spawned, so they re-import __main__: scripts that hash
+through the pool need the usual `if __name__ == "__main__":` guard.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from decouple import config
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", default=29000, cast=int)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    """pbkdf2_sha256 context that flags any other round count for rehash"""
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+
+# Module-level so they can be pickled into pool processes
+def _hash(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return crypt_context(rounds).verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, rounds: int = PASSWORD_HASH_ROUNDS):
+        self.workers = workers
+        self.rounds = rounds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.queued = 0  # submitted and not yet finished
+        self.max_queued = 0
+        self.completed = 0
+        self.rehashed = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: the children must not inherit the app's threads or open connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.queued -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash if the stored one should be replaced)"""
+        ok, new_hash = await self._run(_verify_and_update, password, hashed, self.rounds)
+        if new_hash:
+            self.rehashed += 1
+        return ok, new_hash
+
+    def start(self):
+        """Spin the pool up ahead of the first login"""
+        if self.workers > 0:
+            self._executor()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,154 @@
+"""
+Authenticated-principal caches
+get_current_user runs on every authenticated request. Tokens whose signature
+has already been verified are kept in a bounded LRU (token -> claims), so a
+repeat token only has its expiry checked. The user behind a token is kept as
+a small Principal for AUTH_PRINCIPAL_TTL_SECONDS, so the hot path does no DB
+round trip either.
+
+Both caches are per worker. Any ORM update or delete of a User in this
+worker calls invalidate_user() for it; other workers pick up changes (or deletion) once their principal
+entry expires, so AUTH_PRINCIPAL_TTL_SECONDS bounds how stale they can be.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from decouple import config
+from sqlalchemy import event
+
+from app.models.user import User
+
+AUTH_TOKEN_CACHE_SIZE = config("AUTH_TOKEN_CACHE_SIZE", default=10000, cast=int)
+AUTH_PRINCIPAL_CACHE_SIZE = config("AUTH_PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+AUTH_PRINCIPAL_TTL_SECONDS = config("AUTH_PRINCIPAL_TTL_SECONDS", default=60, cast=float)
+
+
+class Principal:
+    """The fields of a User that request handlers need, detached from any session"""
+    __slots__ = ("id", "email", "username", "full_name")
+
+    def __init__(self, id: int, email: str, username: Optional[str], full_name: Optional[str]):
+        self.id = id
+        self.email = email
+        self.username = username
+        self.full_name = full_name
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.email, user.username, user.full_name)
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        token_size: int = AUTH_TOKEN_CACHE_SIZE,
+        principal_size: int = AUTH_PRINCIPAL_CACHE_SIZE,
+        ttl: float = AUTH_PRINCIPAL_TTL_SECONDS,
+    ):
+        self.token_size = token_size
+        self.principal_size = principal_size
+        self.ttl = ttl
+        self._tokens: "OrderedDict[str, dict]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._principals: "OrderedDict[int, Tuple[Principal, float]]" = OrderedDict()
+        self.token_hits = 0
+        self.token_misses = 0
+        self.principal_hits = 0
+        self.principal_misses = 0
+
+    # ---- verified tokens ----
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        """Claims of a previously verified token, or None if unseen or expired"""
+        claims = self._tokens.get(token)
+        if claims is None:
+            self.token_misses += 1
+            return None
+        exp = claims.get("exp")
+        if exp is not None and exp <= time.time():
+            self._forget_token(token)
+            self.token_misses += 1
+            return None
+        self._tokens.move_to_end(token)
+        self.token_hits += 1
+        return claims
+
+    def put_claims(self, token: str, claims: dict):
+        self._tokens[token] = claims
+        self._tokens.move_to_end(token)
+        user_id = _user_id(claims)
+        if user_id is not None:
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+        while len(self._tokens) > self.token_size:
+            self._forget_token(next(iter(self._tokens)))
+
+    def _forget_token(self, token: str):
+        claims = self._tokens.pop(token, None)
+        user_id = _user_id(claims) if claims else None
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    # ---- principals ----
+
+    def get_principal(self, user_id: int) -> Optional[Principal]:
+        entry = self._principals.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._principals[user_id]
+            self.principal_misses += 1
+            return None
+        self._principals.move_to_end(user_id)
+        self.principal_hits += 1
+        return entry[0]
+
+    def put_principal(self, principal: Principal):
+        self._principals[principal.id] = (principal, time.monotonic() + self.ttl)
+        self._principals.move_to_end(principal.id)
+        while len(self._principals) > self.principal_size:
+            self._principals.popitem(last=False)
+
+    # ---- invalidation ----
+
+    def invalidate_user(self, user_id: int):
+        """
+        Forget a changed or removed user: the next request re-verifies its token
+        and reloads the user, so a deleted user is refused right away here
+        """
+        self._principals.pop(user_id, None)
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self._forget_token(token)
+
+    def clear(self):
+        self._tokens.clear()
+        self._tokens_by_user.clear()
+        self._principals.clear()
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self._tokens),
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "principals": len(self._principals),
+            "principal_hits": self.principal_hits,
+            "principal_misses": self.principal_misses,
+        }
+
+
+def _user_id(claims: dict) -> Optional[int]:
+    try:
+        return int(claims.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
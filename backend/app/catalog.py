@@ -0,0 +1,225 @@
+"""
+In-process question catalog
+Keeps an index of every question id by (subject, difficulty) plus an LRU of
+question bodies, so question reads don't touch the database. Each body's
+public JSON is rendered once, when it is written or first loaded, and
+responses splice those bytes in rather than re-encoding them. The ETag of
+those bytes is kept per id until the next reload, so conditional GETs can be
+answered after the body itself has been evicted.
+
+The question bank only changes through admin routes and seed scripts, which
+bump `catalog_state.version` in the same transaction as their writes. Each
+worker re-reads that version at most every QUESTION_CACHE_REVALIDATE_SECONDS
+and reloads its index when it has moved.
+"""
+import asyncio
+import bisect
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from decouple import config
+from sqlalchemy import select
+
+from app.database import dialect_insert
+from app.http_cache import content_etag
+from app.models.catalog_state import CatalogState
+from app.models.question import Question
+from app.responses import RawJSON, dumps
+
+QUESTION_CACHE_MAX_BODIES = config("QUESTION_CACHE_MAX_BODIES", default=5000, cast=int)
+QUESTION_CACHE_REVALIDATE_SECONDS = config("QUESTION_CACHE_REVALIDATE_SECONDS", default=5.0, cast=float)
+
+
+def catalog_version_bump(db):
+    """Statement that increments the catalog version and returns the new value"""
+    return (
+        dialect_insert(db, CatalogState)
+        .values(id=1, version=1)
+        .on_conflict_do_update(
+            index_elements=[CatalogState.id],
+            set_={"version": CatalogState.version + 1},
+        )
+        .returning(CatalogState.version)
+    )
+
+
+class CatalogEntry:
+    """
+    A question as served publicly (no answer or explanation): the decoded
+    dict, and the same rendered once to JSON bytes for FastJSONResponse
+    """
+
+    __slots__ = ("id", "subject", "difficulty", "data", "payload", "etag")
+
+    def __init__(self, question: Question):
+        choices = json.loads(question.choices) if isinstance(question.choices, str) else question.choices
+        self.id = question.id
+        self.subject = question.subject
+        self.difficulty = question.difficulty
+        self.data = {
+            "id": question.id,
+            "subject": question.subject,
+            "difficulty": question.difficulty,
+            "question_text": question.question_text,
+            "choices": choices,
+        }
+        self.payload = RawJSON(dumps(self.data))
+        self.etag = content_etag(self.payload.data)
+
+
+class QuestionCatalog:
+    def __init__(
+        self,
+        max_bodies: int = QUESTION_CACHE_MAX_BODIES,
+        revalidate_seconds: float = QUESTION_CACHE_REVALIDATE_SECONDS,
+    ):
+        self.max_bodies = max_bodies
+        self.revalidate_seconds = revalidate_seconds
+        self.version = 0
+        # (subject|None, difficulty|None) -> sorted ids; None is a wildcard
+        self._index: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        self._keys: Dict[int, Tuple[str, str]] = {}
+        self._bodies: "OrderedDict[int, CatalogEntry]" = OrderedDict()
+        self._etags: Dict[int, str] = {}
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    # ----------------------------
+    # Loading / invalidation
+    # ----------------------------
+    async def ensure_fresh(self, db):
+        """Reload the index if another worker or script changed the bank"""
+        if self._loaded and time.monotonic() - self._checked_at < self.revalidate_seconds:
+            return
+        async with self._lock:
+            if self._loaded and time.monotonic() - self._checked_at < self.revalidate_seconds:
+                return
+            version = await db.scalar(
+                select(CatalogState.version).where(CatalogState.id == 1)
+            ) or 0
+            if not self._loaded or version != self.version:
+                await self._load(db, version)
+            self._checked_at = time.monotonic()
+
+    async def _load(self, db, version: int):
+        rows = (await db.execute(
+            select(Question.id, Question.subject, Question.difficulty).order_by(Question.id)
+        )).all()
+        self._index = {}
+        self._keys = {}
+        for question_id, subject, difficulty in rows:
+            self._keys[question_id] = (subject, difficulty)
+            for key in ((subject, difficulty), (subject, None), (None, difficulty), (None, None)):
+                self._index.setdefault(key, []).append(question_id)
+        self._bodies.clear()
+        self._etags.clear()
+        self.version = version
+        self._loaded = True
+        self.reloads += 1
+
+    async def warm(self, db):
+        """Load the index and fill the body cache up to its capacity"""
+        await self.ensure_fresh(db)
+        await self.get_many(db, self.ids()[: self.max_bodies])
+
+    def invalidate(self):
+        """Drop everything; the next read reloads from the database"""
+        self._loaded = False
+        self._bodies.clear()
+        self._etags.clear()
+
+    def put(self, question: Question, version: int):
+        """Write-through after a committed insert that bumped the version to `version`"""
+        if not self._loaded or version != self.version + 1:
+            # Another writer got in between; reload rather than guess
+            self.invalidate()
+            return
+        self._add_key(question.id, question.subject, question.difficulty)
+        self._store(CatalogEntry(question))
+        self.version = version
+
+    def _add_key(self, question_id: int, subject: str, difficulty: str):
+        if question_id in self._keys:
+            return
+        self._keys[question_id] = (subject, difficulty)
+        for key in ((subject, difficulty), (subject, None), (None, difficulty), (None, None)):
+            ids = self._index.setdefault(key, [])
+            if not ids or ids[-1] < question_id:
+                ids.append(question_id)
+            else:
+                bisect.insort(ids, question_id)
+
+    def _store(self, entry: CatalogEntry):
+        self._bodies[entry.id] = entry
+        self._etags[entry.id] = entry.etag
+        self._bodies.move_to_end(entry.id)
+        while len(self._bodies) > self.max_bodies:
+            self._bodies.popitem(last=False)
+            self.evictions += 1
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def ids(self, subject: Optional[str] = None, difficulty: Optional[str] = None) -> List[int]:
+        """Sorted ids matching the filters (callers must not mutate the list)"""
+        return self._index.get((subject, difficulty), [])
+
+    def key(self, question_id: int) -> Optional[Tuple[str, str]]:
+        """(subject, difficulty) of a known question"""
+        return self._keys.get(question_id)
+
+    def etag(self, question_id: int) -> Optional[str]:
+        """ETag of a question loaded since the last reload, without its body"""
+        return self._etags.get(question_id)
+
+    async def get_many(self, db, question_ids: List[int]) -> List[CatalogEntry]:
+        """Entries for `question_ids`, in order, skipping unknown ids"""
+        found = {}
+        missing = []
+        for question_id in question_ids:
+            entry = self._bodies.get(question_id)
+            if entry is None:
+                missing.append(question_id)
+                self.misses += 1
+            else:
+                self._bodies.move_to_end(question_id)
+                found[question_id] = entry
+                self.hits += 1
+
+        if missing:
+            rows = await db.scalars(select(Question).where(Question.id.in_(missing)))
+            for question in rows:
+                entry = CatalogEntry(question)
+                self._add_key(entry.id, entry.subject, entry.difficulty)
+                self._store(entry)
+                found[entry.id] = entry
+
+        return [found[i] for i in question_ids if i in found]
+
+    async def get(self, db, question_id: int) -> Optional[CatalogEntry]:
+        result = await self.get_many(db, [question_id])
+        return result[0] if result else None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "questions": len(self._keys),
+            "cached_bodies": len(self._bodies),
+            "max_bodies": self.max_bodies,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+        }
+
+
+question_catalog = QuestionCatalog()
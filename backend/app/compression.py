@@ -0,0 +1,190 @@
+"""
+Response compression
+CompressionMiddleware negotiates Accept-Encoding (brotli, then gzip) and
+compresses text and JSON bodies of at least COMPRESSION_MIN_BYTES. Question
+passages make listings tens of kilobytes, which matters on slow connections.
+
+Responses with a strong ETag (question reads, see app.http_cache) are
+identified by it, so their compressed bytes are kept in a per-worker cache
+keyed by (ETag, encoding): a hot listing or question is compressed once per
+catalog version rather than per request. Compressed responses carry the weak
+form of the ETag, which If-None-Match still matches; 304s keep the handler's.
+
+Streaming responses (the NDJSON import progress) pass through untouched, so
+progress lines arrive as they are written.
+"""
+import gzip
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from decouple import config
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+COMPRESSION_MIN_BYTES = config("COMPRESSION_MIN_BYTES", default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config("COMPRESSION_GZIP_LEVEL", default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", default=5, cast=int)
+COMPRESSION_CACHE_MAX_BYTES = config("COMPRESSION_CACHE_MAX_BYTES", default=32 * 1024 * 1024, cast=int)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """"br" or "gzip" (in that order of preference) if the client accepts it"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies by (strong ETag, encoding), bounded in bytes"""
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._bodies: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, etag: str, encoding: str, body: bytes) -> bytes:
+        key = (etag, encoding)
+        compressed = self._bodies.get(key)
+        if compressed is not None:
+            self._bodies.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = compress(body, encoding)
+        if len(compressed) <= self.max_bytes:
+            self._bodies[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return compressed
+
+    def clear(self):
+        self._bodies.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._bodies),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+compressed_bodies = CompressedBodyCache()
+
+
+class CompressionMiddleware:
+    """Pure ASGI compression of complete (single-message) text/JSON responses"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        cache: CompressedBodyCache = compressed_bodies,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if message["status"] == 304 and "etag" in headers:
+                    # No content-type on a 304, but its ETag names a body we
+                    # may have compressed: caches must key it the same way
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                    await send(message)
+                    return
+                if headers.get("content-encoding") or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    await send(message)
+                    return
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                # Hold the start until we know the body's size
+                start = message
+                return
+
+            if message["type"] == "http.response.body" and start is not None:
+                message_start, start = start, None
+                body = message.get("body", b"")
+                if message.get("more_body", False) or len(body) < self.minimum_size:
+                    await send(message_start)
+                    await send(message)
+                    return
+
+                headers = MutableHeaders(raw=message_start["headers"])
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/") and message_start["status"] == 200:
+                    compressed = self.cache.get(etag, encoding, body)
+                else:
+                    compressed = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                _weaken_etag(message_start)
+                await send(message_start)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _weaken_etag(message: Message):
+    """A compressed body isn't byte-identical to the one the strong ETag names"""
+    headers = MutableHeaders(raw=message["headers"])
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
@@ -0,0 +1,26 @@
+# app/database/__init__.py
+from app.database.connection import (
+    Base,
+    engine,
+    async_engine,
+    SessionLocal,
+    AsyncSessionLocal,
+    create_engines,
+    dialect_insert,
+    get_db,
+    get_async_db,
+    to_async_url,
+)
+
+__all__ = [
+    "Base",
+    "engine",
+    "async_engine",
+    "SessionLocal",
+    "AsyncSessionLocal",
+    "create_engines",
+    "dialect_insert",
+    "get_db",
+    "get_async_db",
+    "to_async_url",
+]
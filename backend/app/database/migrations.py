@@ -0,0 +1,25 @@
+"""
+Schema migrations
+Alembic (backend/migrations) is the only way the schema is created or
+changed. Production runs `alembic upgrade head` once, before gunicorn forks
+its workers (see the Procfile); the app itself never creates tables.
+Scripts that touch the configured database call run_migrations() first.
+"""
+import os
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+def run_migrations(revision: str = "head"):
+    """Upgrade DATABASE_URL's schema to `revision`"""
+    # Imported here so the app's own import path doesn't pay for alembic
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config(ALEMBIC_INI)
+    cfg.attributes["configure_logger"] = False
+    command.upgrade(cfg, revision)
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,196 @@
+"""
+AI feedback cache
+Generated feedback is keyed by a fingerprint of the analytics summary
+(bucketed overall accuracy, per-subject stats and weak areas), so a student
+whose stats haven't meaningfully moved gets the cached text with no API call.
+The text is shared by everyone in the same buckets, so it is generated from
+feedback_profile() alone.
+
+Entries are fresh for AI_FEEDBACK_CACHE_TTL seconds. For a further
+AI_FEEDBACK_CACHE_STALE_SECONDS they are still served, while a single
+background call regenerates them (stale-while-revalidate). With
+AI_FEEDBACK_CACHE_PERSIST on, entries are also kept in ai_feedback_cache so
+they survive restarts and are shared between workers.
+
+Concurrent misses and refreshes for one fingerprint share a single in-flight
+generation, so a burst of identical requests makes one upstream call.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from decouple import config
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.ai_feedback_cache import AIFeedbackCache
+
+AI_FEEDBACK_CACHE_TTL = config("AI_FEEDBACK_CACHE_TTL", default=24 * 3600, cast=int)
+AI_FEEDBACK_CACHE_STALE_SECONDS = config("AI_FEEDBACK_CACHE_STALE_SECONDS", default=7 * 24 * 3600, cast=int)
+AI_FEEDBACK_CACHE_MAX_ENTRIES = config("AI_FEEDBACK_CACHE_MAX_ENTRIES", default=2000, cast=int)
+AI_FEEDBACK_CACHE_PERSIST = config("AI_FEEDBACK_CACHE_PERSIST", default=True, cast=bool)
+
+ACCURACY_BUCKET = 5  # percentage points
+TOTAL_BUCKET = 10  # questions answered
+
+
+def _band(value: float, size: int, ceiling: Optional[int] = None) -> List[int]:
+    low = int(value // size) * size
+    if ceiling is not None:
+        low = min(low, ceiling - size)
+    return [low, low + size]
+
+
+def feedback_profile(analytics_data: Dict) -> Dict:
+    """
+    The bucketed view of a summary that generated feedback may depend on.
+    Students whose stats fall in the same buckets share cached text, so the
+    prompt is built from this and never from their exact figures.
+    """
+    by_subject = analytics_data.get("by_subject", {})
+    return {
+        "overall_accuracy": _band(analytics_data.get("overall_accuracy", 0), ACCURACY_BUCKET, 100),
+        "total_answered": _band(sum(s["total"] for s in by_subject.values()), TOTAL_BUCKET),
+        "subjects": {
+            subject: {
+                "accuracy": _band(stats["accuracy"], ACCURACY_BUCKET, 100),
+                "total": _band(stats["total"], TOTAL_BUCKET),
+            }
+            for subject, stats in by_subject.items()
+        },
+        "weak": [[a["subject"], a["priority"]] for a in analytics_data.get("weak_areas", [])],
+    }
+
+
+def analytics_fingerprint(analytics_data: Dict) -> str:
+    """Stable hash of feedback_profile(analytics_data)"""
+    key = feedback_profile(analytics_data)
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32]
+
+
+class FeedbackCache:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        ttl: int = AI_FEEDBACK_CACHE_TTL,
+        stale_seconds: int = AI_FEEDBACK_CACHE_STALE_SECONDS,
+        max_entries: int = AI_FEEDBACK_CACHE_MAX_ENTRIES,
+        persist: bool = AI_FEEDBACK_CACHE_PERSIST,
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_generate(
+        self, fingerprint: str, generate: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """Cached feedback for `fingerprint`, calling `generate` only on a miss"""
+        entry = self._entries.get(fingerprint)
+        if entry is None and self.persist:
+            entry = await self._load(fingerprint)
+            if entry is not None:
+                self._remember(fingerprint, *entry)
+
+        if entry is not None:
+            text, created_at = entry
+            age = time.time() - created_at
+            if age < self.ttl:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return text
+            if age < self.ttl + self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh_in_background(fingerprint, generate)
+                return text
+
+        self.misses += 1
+        # Shielded: a client disconnecting must not cancel a call others wait on
+        return await asyncio.shield(self._generate_once(fingerprint, generate))
+
+    async def set(self, fingerprint: str, text: str):
+        created_at = time.time()
+        self._remember(fingerprint, text, created_at)
+        if self.persist:
+            try:
+                async with self.session_factory() as db:
+                    stmt = dialect_insert(db, AIFeedbackCache).values(
+                        fingerprint=fingerprint, feedback=text, created_at=created_at
+                    )
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[AIFeedbackCache.fingerprint],
+                        set_={"feedback": stmt.excluded.feedback, "created_at": stmt.excluded.created_at},
+                    )
+                    await db.execute(stmt)
+                    await db.commit()
+            except Exception as e:
+                print(f"AI feedback cache persist failed: {e}")
+
+    def _remember(self, fingerprint: str, text: str, created_at: float):
+        self._entries[fingerprint] = (text, created_at)
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, fingerprint: str) -> Optional[Tuple[str, float]]:
+        try:
+            async with self.session_factory() as db:
+                row = (await db.execute(
+                    select(AIFeedbackCache.feedback, AIFeedbackCache.created_at)
+                    .where(AIFeedbackCache.fingerprint == fingerprint)
+                )).first()
+        except Exception as e:
+            print(f"AI feedback cache lookup failed: {e}")
+            return None
+        return (row.feedback, row.created_at) if row else None
+
+    def _generate_once(self, fingerprint: str, generate) -> asyncio.Task:
+        """The in-flight generation for `fingerprint`, starting one if there is none"""
+        task = self._inflight.get(fingerprint)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        async def run():
+            try:
+                text = await generate()
+                if text:
+                    await self.set(fingerprint, text)
+                return text
+            finally:
+                self._inflight.pop(fingerprint, None)
+
+        task = self._inflight[fingerprint] = asyncio.create_task(run())
+        return task
+
+    def _refresh_in_background(self, fingerprint: str, generate):
+        self._generate_once(fingerprint, generate)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+feedback_cache = FeedbackCache()
@@ -0,0 +1,60 @@
+"""
+Conditional GETs for question reads
+Question content only changes through admin writes, which bump the catalog
+version, so responses carry strong ETags:
+- a single question's ETag is a hash of its public JSON, so it only changes
+  when that question does (the catalog keeps it even after the body is
+  evicted)
+- listings and counts hash the catalog version with the query parameters
+
+Handlers compare If-None-Match against the in-memory catalog and answer 304
+before touching the database; the only query a 304 can cost is the
+catalog's periodic version check. Cache-Control lets browsers and the edge
+reuse a response for HTTP_CACHE_MAX_AGE seconds and revalidate after that.
+"""
+import hashlib
+from typing import Optional
+
+from decouple import config
+from fastapi import Request, Response
+
+HTTP_CACHE_MAX_AGE = config("HTTP_CACHE_MAX_AGE", default=60, cast=int)
+
+
+def content_etag(data: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+
+
+def version_etag(version: int, *parts) -> str:
+    """Strong ETag for a response determined by the catalog version and `parts`"""
+    key = "\x1f".join("" if p is None else str(p) for p in parts).encode()
+    return f'"v{version}-{hashlib.blake2b(key, digest_size=8).hexdigest()}"'
+
+
+def cache_headers(etag: str, max_age: int = HTTP_CACHE_MAX_AGE) -> dict:
+    # max-age=0 still lets clients revalidate, they just always ask first
+    cache_control = f"public, max-age={max_age}" if max_age > 0 else "public, no-cache"
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x" """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """A 304 for `etag` if the client already has it, else None"""
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers=cache_headers(etag))
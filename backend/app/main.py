@@ -1,28 +1,51 @@
+import asyncio
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from app.routes import (
     auth,
     admin,
-    # analytics,  # TODO: Migrate to SQLAlchemy
-    # ai_feedback,  # TODO: Migrate to SQLAlchemy
+    analytics,
+    ai_feedback,
     questions,
-    # sessions,  # TODO: Migrate to SQLAlchemy
+    sessions,
 )
 
 load_dotenv()
 
-# Ensure database tables are created for local/dev usage (use local SQLite DB)
-from app.local_db import engine, Base
-from app import models as _models  # import models so SQLAlchemy registers them
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic: run `alembic upgrade head` before starting
+from app.database import AsyncSessionLocal
+from app.answer_log import answer_log
+from app.auth.passwords import password_hasher
+from app.catalog import question_catalog
+from app import compression, metrics, query_log
+from app.question_counts import ensure_counts
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm this worker's question catalog before serving traffic
+    async with AsyncSessionLocal() as db:
+        await ensure_counts(db)
+        await question_catalog.warm(db)
+    answer_log.start()
+    password_hasher.start()
+    cache_metrics = asyncio.create_task(metrics.refresh_cache_gauges_forever())
+    yield
+    cache_metrics.cancel()
+    # Don't lose buffered answers when gunicorn stops or recycles the worker
+    await answer_log.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="ACT Study API",
     version="1.0.0",
     description="Week 5 ACT Prep Backend",
+    lifespan=lifespan,
 )
 
 # -------------------------------
@@ -39,6 +62,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Development/CI only: per-request statement log, slow queries, N+1 warnings
+if query_log.QUERY_LOG_ENABLED:
+    query_log.install(app)
+
+# gzip/brotli for text and JSON bodies; question reads reuse cached compressed bytes
+app.add_middleware(compression.CompressionMiddleware)
+
+# Outermost, so latency covers the whole middleware stack
+app.add_middleware(metrics.MetricsMiddleware)
+
 # -------------------------------
 # Basic endpoints
 # -------------------------------
@@ -50,12 +83,17 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition, aggregated across gunicorn workers"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # -------------------------------
 # Routers
 # -------------------------------
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
-# app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])  # TODO: Migrate
-# app.include_router(ai_feedback.router, prefix="/api/ai", tags=["ai"])  # TODO: Migrate
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(ai_feedback.router, tags=["ai"])  # routes carry their own /api/ai-feedback paths
 app.include_router(questions.router, prefix="/api/questions", tags=["questions"])
-# app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])  # TODO: Migrate
+app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
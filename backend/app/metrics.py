@@ -0,0 +1,263 @@
+"""
+Prometheus metrics
+Per-route request counts, latency histograms and in-flight gauges come from
+MetricsMiddleware; SQL query counts and time per request come from
+cursor-execute hooks on the shared engines, attributed to the request
+through a context variable. Pool gauges follow checkout/checkin events, and
+the in-process caches' hit/miss counters are copied into gauges every
+METRICS_CACHE_REFRESH_SECONDS.
+
+Under gunicorn each worker has its own registry. With PROMETHEUS_MULTIPROC_DIR
+set (gunicorn.conf.py sets it up), prometheus_client writes every worker's
+values to files in that directory and GET /metrics, whichever worker serves
+it, aggregates them all. Without it, /metrics reports the one process.
+"""
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from decouple import config
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.principals import principal_cache
+from app.catalog import question_catalog
+from app.compression import compressed_bodies
+from app.database import async_engine, engine
+from app.feedback_cache import feedback_cache
+
+METRICS_CACHE_REFRESH_SECONDS = config("METRICS_CACHE_REFRESH_SECONDS", default=15.0, cast=float)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method", "route"],
+    multiprocess_mode="livesum",
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request", ["route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+QUERIES = Counter("db_queries_total", "SQL statements executed (in requests or not)", ["engine"])
+QUERY_SECONDS = Counter("db_query_seconds_total", "Time spent executing SQL", ["engine"])
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections checked out of the pool", ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Checked-out connections beyond pool_size", ["engine"],
+    multiprocess_mode="livesum",
+)
+CACHE_HITS = Gauge("cache_hits", "In-process cache hits", ["cache"], multiprocess_mode="livesum")
+CACHE_MISSES = Gauge("cache_misses", "In-process cache misses", ["cache"], multiprocess_mode="livesum")
+
+
+# ----------------------------
+# SQL query hooks
+# ----------------------------
+class RequestQueries:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set per request by MetricsMiddleware; SQLAlchemy carries it into the
+# greenlets the async engine runs statements in
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+# Called as listener(conn, statement, parameters, executemany, seconds) after
+# every statement, so other consumers (app.query_log) reuse this timing
+# instead of hooking the engines again
+statement_listeners: List[Callable] = []
+
+
+def instrument_engine(sync_engine, name: str):
+    """Count statements, time and pool usage for one (sync or async.sync_engine) engine"""
+    queries = QUERIES.labels(name)
+    query_seconds = QUERY_SECONDS.labels(name)
+    checked_out = POOL_CHECKED_OUT.labels(name)
+    overflow = POOL_OVERFLOW.labels(name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        queries.inc()
+        query_seconds.inc(elapsed)
+        stats = current_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+        for listener in statement_listeners:
+            listener(conn, statement, parameters, executemany, elapsed)
+
+    # Counted here rather than read from the pool: checkin fires before the
+    # pool's own counter drops
+    size = sync_engine.pool.size() if hasattr(sync_engine.pool, "size") else None
+    out = [0]
+
+    def _moved(delta: int):
+        out[0] += delta
+        checked_out.set(out[0])
+        if size is not None:
+            overflow.set(max(out[0] - size, 0))
+
+    event.listen(sync_engine, "checkout", lambda *_: _moved(1))
+    event.listen(sync_engine, "checkin", lambda *_: _moved(-1))
+
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
+
+# ----------------------------
+# Caches
+# ----------------------------
+def refresh_cache_gauges():
+    """Copy this worker's cache counters into the gauges"""
+    auth = principal_cache.stats()
+    feedback = feedback_cache.stats()
+    compressed = compressed_bodies.stats()
+    counts = {
+        "question_catalog": (question_catalog.hits, question_catalog.misses),
+        "ai_feedback": (feedback["hits"] + feedback["stale_hits"], feedback["misses"]),
+        "auth_tokens": (auth["token_hits"], auth["token_misses"]),
+        "auth_principals": (auth["principal_hits"], auth["principal_misses"]),
+        "compressed_bodies": (compressed["hits"], compressed["misses"]),
+    }
+    for cache, (hits, misses) in counts.items():
+        CACHE_HITS.labels(cache).set(hits)
+        CACHE_MISSES.labels(cache).set(misses)
+
+
+async def refresh_cache_gauges_forever(interval: float = METRICS_CACHE_REFRESH_SECONDS):
+    """Per-worker task (see main's lifespan): the scraping worker can't read the others' caches"""
+    while True:
+        refresh_cache_gauges()
+        await asyncio.sleep(interval)
+
+
+def cache_hit_ratio(families) -> GaugeMetricFamily:
+    """cache_hit_ratio from the (already aggregated) cache_hits/cache_misses families"""
+    totals = {}
+    for family in families:
+        if family.name in ("cache_hits", "cache_misses"):
+            for sample in family.samples:
+                entry = totals.setdefault(sample.labels["cache"], [0.0, 0.0])
+                entry[family.name == "cache_misses"] += sample.value
+    ratio = GaugeMetricFamily("cache_hit_ratio", "Cache hits / lookups, all workers", labels=["cache"])
+    for cache, (hits, misses) in sorted(totals.items()):
+        ratio.add_metric([cache], hits / (hits + misses) if hits + misses else 0.0)
+    return ratio
+
+
+# ----------------------------
+# Exposition
+# ----------------------------
+class _Collected:
+    """Already-collected families in the shape generate_latest expects"""
+
+    def __init__(self, families):
+        self.families = families
+
+    def collect(self):
+        return self.families
+
+
+def render() -> bytes:
+    """Prometheus text format for every worker (multiprocess) or this process"""
+    refresh_cache_gauges()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    families = list(registry.collect())
+    families.append(cache_hit_ratio(families))
+    return generate_latest(_Collected(families))
+
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+# ----------------------------
+# Middleware
+# ----------------------------
+def route_label(scope: Scope) -> str:
+    """The matched route's path template, so ids don't become label values"""
+    partial = None
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return getattr(route, "path", "other")
+        if match is Match.PARTIAL and partial is None:
+            # Right path, wrong method (the router answers 405)
+            partial = getattr(route, "path", "other")
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead) recording request metrics"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_label(scope)
+        status = 500
+        stats = RequestQueries()
+        token = current_queries.set(stats)
+        in_progress = IN_PROGRESS.labels(method, route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            current_queries.reset(token)
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUEST_QUERIES.labels(route).observe(stats.count)
+            REQUEST_DB_SECONDS.labels(route).observe(stats.seconds)
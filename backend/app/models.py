@@ -1,12 +0,0 @@
-# app/models.py
-from sqlalchemy import Column, Integer, String
-from .database import Base
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    username = Column(String, unique=True, index=True, nullable=True)
-    full_name = Column(String, nullable=True)
-    hashed_password = Column(String, nullable=False)
@@ -1,5 +1,23 @@
 # app/models/__init__.py
 from app.models.user import User
 from app.models.question import Question
+from app.models.catalog_state import CatalogState
+from app.models.question_count import QuestionCount
+from app.models.answer_tracking import AnswerTracking
+from app.models.user_performance import UserPerformance
+from app.models.ai_feedback_cache import AIFeedbackCache
+from app.models.rating import UserRating, QuestionRating
+from app.models.practice_session import PracticeSession
 
-__all__ = ["User", "Question"]
+__all__ = [
+    "User",
+    "Question",
+    "CatalogState",
+    "QuestionCount",
+    "AnswerTracking",
+    "UserPerformance",
+    "AIFeedbackCache",
+    "UserRating",
+    "QuestionRating",
+    "PracticeSession",
+]
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Text, Float
+from app.database import Base
+
+class AIFeedbackCache(Base):
+    """Persisted AI feedback, keyed by the analytics fingerprint it was generated for"""
+    __tablename__ = "ai_feedback_cache"
+    
+    fingerprint = Column(String, primary_key=True)
+    feedback = Column(Text, nullable=False)
+    created_at = Column(Float, nullable=False)  # unix timestamp, compared against the TTL
@@ -1,45 +1,24 @@
-"""
-Answer tracking model for Supabase
-This represents the structure of the user_answers table in Supabase
-"""
-from datetime import datetime
-from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
+from sqlalchemy.sql import func
+from app.database import Base
 
-class AnswerTracking:
+class AnswerTracking(Base):
     """
-    Model for tracking user answers to questions
-    This should match the Supabase table structure:
-    
-    CREATE TABLE user_answers (
-        id SERIAL PRIMARY KEY,
-        user_id INTEGER,
-        question_id INTEGER,
-        user_answer TEXT,
-        is_correct BOOLEAN,
-        subject TEXT,
-        difficulty TEXT,
-        time_spent_seconds INTEGER,
-        created_at TIMESTAMP DEFAULT NOW()
-    );
+    One row per submitted answer (the user_answers table).
+    Written in batches through app.answer_log, not per request.
     """
+    __tablename__ = "user_answers"
+    __table_args__ = (
+        Index("ix_user_answers_user_id_created_at", "user_id", "created_at"),
+    )
     
-    def __init__(
-        self,
-        user_id: Optional[int] = None,
-        question_id: int = 0,
-        user_answer: str = "",
-        is_correct: bool = False,
-        subject: str = "",
-        difficulty: str = "",
-        time_spent_seconds: Optional[int] = None,
-        created_at: Optional[datetime] = None
-    ):
-        self.user_id = user_id
-        self.question_id = question_id
-        self.user_answer = user_answer
-        self.is_correct = is_correct
-        self.subject = subject
-        self.difficulty = difficulty
-        self.time_spent_seconds = time_spent_seconds
-        self.created_at = created_at or datetime.now()
-
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=True)
+    session_id = Column(Integer, index=True, nullable=True)  # practice_sessions.id, if answered in one
+    question_id = Column(Integer, index=True, nullable=False)
+    user_answer = Column(Text, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    subject = Column(String, index=True, nullable=False)
+    difficulty = Column(String, nullable=True)
+    time_spent_seconds = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer
+from app.database import Base
+
+class CatalogState(Base):
+    __tablename__ = "catalog_state"
+    
+    id = Column(Integer, primary_key=True)  # single row, id = 1
+    version = Column(Integer, nullable=False, default=0)  # bumped on every question bank write
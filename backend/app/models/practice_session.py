@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class PracticeSession(Base):
+    """
+    A practice/test session with running answer tallies, overall and per
+    subject, incremented in the same transaction as each submitted answer
+    """
+    __tablename__ = "practice_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)
+    session_type = Column(String, nullable=False, default="practice")
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    total_questions = Column(Integer, nullable=False, default=0)
+    correct_answers = Column(Integer, nullable=False, default=0)
+    math_total = Column(Integer, nullable=False, default=0)
+    math_correct = Column(Integer, nullable=False, default=0)
+    english_total = Column(Integer, nullable=False, default=0)
+    english_correct = Column(Integer, nullable=False, default=0)
+    reading_total = Column(Integer, nullable=False, default=0)
+    reading_correct = Column(Integer, nullable=False, default=0)
+    science_total = Column(Integer, nullable=False, default=0)
+    science_correct = Column(Integer, nullable=False, default=0)
+    score = Column(Integer, nullable=True)  # composite, 1-36 scale
+    section_scores = Column(JSON, nullable=True)  # {subject: score}, set on finish
+    duration_seconds = Column(Integer, nullable=True)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.sql import func
-from app.local_db import Base
+from app.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Keyset pagination order for the question listing (cursor mode)
+        Index("ix_questions_subject_difficulty_id", "subject", "difficulty", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     subject = Column(String, index=True, nullable=False)  # math, english, reading, science
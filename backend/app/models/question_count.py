@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class QuestionCount(Base):
+    __tablename__ = "question_counts"
+    
+    subject = Column(String, primary_key=True)  # math, english, reading, science
+    difficulty = Column(String, primary_key=True)  # easy, medium, hard
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, Integer
+from app.database import Base
+
+class UserRating(Base):
+    """Ability rating: the user's level's base rating plus `adjustment`"""
+    __tablename__ = "user_ratings"
+    
+    user_id = Column(Integer, primary_key=True)
+    adjustment = Column(Float, nullable=False, default=0.0)
+    answers = Column(Integer, nullable=False, default=0)
+
+class QuestionRating(Base):
+    """Difficulty rating: the question's difficulty's base rating plus `adjustment`"""
+    __tablename__ = "question_ratings"
+    
+    question_id = Column(Integer, primary_key=True)
+    adjustment = Column(Float, nullable=False, default=0.0)
+    answers = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, Float
 from sqlalchemy.sql import func
-from app.local_db import Base
+from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
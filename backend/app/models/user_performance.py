@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class UserPerformance(Base):
+    """Running per-user answer totals, maintained as answers are written"""
+    __tablename__ = "user_performance"
+    
+    user_id = Column(Integer, primary_key=True)
+    subject = Column(String, primary_key=True)  # math, english, reading, science
+    difficulty = Column(String, primary_key=True)  # easy, medium, hard
+    total = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    time_spent_seconds = Column(Integer, nullable=False, default=0)
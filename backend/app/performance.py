@@ -0,0 +1,107 @@
+"""
+Per-user performance rollups
+user_performance keeps (user, subject, difficulty) answer totals that are
+upserted in the same transaction as the user_answers rows they summarize,
+so analytics and feedback read a handful of rows instead of a user's whole
+answer history.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+
+from app.database import dialect_insert
+from app.models.answer_tracking import AnswerTracking
+from app.models.user_performance import UserPerformance
+
+SUBJECTS = ["math", "english", "reading", "science"]
+
+
+def rollup_delta_statement(db, answers: Iterable[dict]):
+    """Upsert statement and executemany rows adding `answers` to the rollups"""
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for a in answers:
+        if a.get("user_id") is None:
+            continue
+        delta = deltas[(a["user_id"], a["subject"], a.get("difficulty") or "")]
+        delta[0] += 1
+        delta[1] += 1 if a["is_correct"] else 0
+        delta[2] += a.get("time_spent_seconds") or 0
+
+    stmt = dialect_insert(db, UserPerformance)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserPerformance.user_id, UserPerformance.subject, UserPerformance.difficulty],
+        set_={
+            "total": UserPerformance.total + stmt.excluded.total,
+            "correct": UserPerformance.correct + stmt.excluded.correct,
+            "time_spent_seconds": UserPerformance.time_spent_seconds + stmt.excluded.time_spent_seconds,
+        },
+    )
+    rows = [
+        {
+            "user_id": user_id,
+            "subject": subject,
+            "difficulty": difficulty,
+            "total": total,
+            "correct": correct,
+            "time_spent_seconds": seconds,
+        }
+        for (user_id, subject, difficulty), (total, correct, seconds) in deltas.items()
+    ]
+    return stmt, rows
+
+
+async def read_rollups(db, user_id: int, subject: Optional[str] = None) -> List[UserPerformance]:
+    query = select(UserPerformance).where(UserPerformance.user_id == user_id)
+    if subject:
+        query = query.where(UserPerformance.subject == subject)
+    return list((await db.scalars(query)).all())
+
+
+def summarize(rollups: Iterable[UserPerformance]) -> Dict:
+    """Overall and per-subject totals/accuracy from rollup rows"""
+    by_subject = {}
+    for r in rollups:
+        stats = by_subject.setdefault(r.subject, {"total": 0, "correct": 0})
+        stats["total"] += r.total
+        stats["correct"] += r.correct
+    for stats in by_subject.values():
+        stats["accuracy"] = (stats["correct"] / stats["total"] * 100) if stats["total"] else 0.0
+
+    total_answered = sum(s["total"] for s in by_subject.values())
+    total_correct = sum(s["correct"] for s in by_subject.values())
+    return {
+        "total_answered": total_answered,
+        "total_correct": total_correct,
+        "overall_accuracy": (total_correct / total_answered * 100) if total_answered else 0.0,
+        "by_subject": by_subject,
+    }
+
+
+async def rebuild_rollups(db, user_id: Optional[int] = None):
+    """Recompute rollups from user_answers (all users, or one) with one GROUP BY"""
+    source = (
+        select(
+            AnswerTracking.user_id,
+            AnswerTracking.subject,
+            func.coalesce(AnswerTracking.difficulty, ""),
+            func.count(AnswerTracking.id),
+            func.sum(case((AnswerTracking.is_correct, 1), else_=0)),
+            func.sum(func.coalesce(AnswerTracking.time_spent_seconds, 0)),
+        )
+        .where(AnswerTracking.user_id.is_not(None))
+        .group_by(AnswerTracking.user_id, AnswerTracking.subject, func.coalesce(AnswerTracking.difficulty, ""))
+    )
+    clear = delete(UserPerformance)
+    if user_id is not None:
+        source = source.where(AnswerTracking.user_id == user_id)
+        clear = clear.where(UserPerformance.user_id == user_id)
+
+    await db.execute(clear)
+    await db.execute(
+        insert(UserPerformance).from_select(
+            ["user_id", "subject", "difficulty", "total", "correct", "time_spent_seconds"],
+            source,
+        )
+    )
+    await db.commit()
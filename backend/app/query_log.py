@@ -0,0 +1,164 @@
+"""
+Development/CI query inspector
+With QUERY_LOG_ENABLED, every SQL statement run on the shared engines is
+recorded (statement, parameters, duration) against the request that ran it,
+using the timing app.metrics' engine hooks already take.
+Statements slower than SLOW_QUERY_MS are printed with their query plan
+(EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL), and a request that
+runs the same statement shape QUERY_LOG_REPEAT_THRESHOLD or more times (the
+N+1 pattern: one query per row of an earlier result) is flagged when it
+finishes. Off by default: nothing is hooked in production.
+
+Tests read the per-request reports through `capture()`; see the
+query_budget fixture in tests/conftest.py.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, NamedTuple, Optional
+
+from decouple import config
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import metrics
+
+QUERY_LOG_ENABLED = config("QUERY_LOG_ENABLED", default=False, cast=bool)
+SLOW_QUERY_MS = config("SLOW_QUERY_MS", default=100.0, cast=float)
+QUERY_LOG_REPEAT_THRESHOLD = config("QUERY_LOG_REPEAT_THRESHOLD", default=3, cast=int)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and literal numbers don't change a statement's shape
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(\?|\$\d+|%\(\w+\)s)(\s*,\s*(\?|\$\d+|%\(\w+\)s))*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+class Statement(NamedTuple):
+    sql: str
+    parameters: object
+    seconds: float
+    executemany: bool
+
+
+class RequestReport:
+    """Statements one request ran, in order"""
+
+    __slots__ = ("method", "route", "statements")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.statements: List[Statement] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(s.seconds for s in self.statements)
+
+    def repeated(self, threshold: int = QUERY_LOG_REPEAT_THRESHOLD) -> List[tuple]:
+        """[(statement shape, times)] for shapes run at least `threshold` times"""
+        shapes = Counter(shape(s.sql) for s in self.statements)
+        return [(sql, n) for sql, n in shapes.most_common() if n >= threshold]
+
+    def __repr__(self) -> str:
+        return f"<{self.method} {self.route}: {self.count} statements>"
+
+
+def shape(sql: str) -> str:
+    """Statement text with whitespace, IN-list lengths and literal numbers normalized"""
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql)
+    return _NUMBER.sub("N", sql)
+
+
+current_report: ContextVar[Optional[RequestReport]] = ContextVar("current_report", default=None)
+# Open capture() lists; reports are appended as their requests finish
+_captures: List[List[RequestReport]] = []
+
+
+@contextmanager
+def capture():
+    """Collect the RequestReport of every request that finishes inside the block"""
+    reports: List[RequestReport] = []
+    _captures.append(reports)
+    try:
+        yield reports
+    finally:
+        _captures.remove(reports)
+
+
+# ----------------------------
+# Statement hook
+# ----------------------------
+def explain(conn, statement: str, parameters) -> str:
+    """Query plan for `statement`, on a raw cursor so it isn't recorded itself"""
+    postgres = conn.dialect.name == "postgresql"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(("EXPLAIN " if postgres else "EXPLAIN QUERY PLAN ") + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if postgres:
+        return "\n".join(row[0] for row in rows)
+    # SQLite rows are (id, parent, notused, detail); indent children under parents
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+
+def record_statement(conn, statement: str, parameters, executemany: bool, elapsed: float):
+    """metrics statement listener: the statement as app.metrics timed it"""
+    report = current_report.get()
+    if report is not None:
+        report.statements.append(Statement(statement, parameters, elapsed, executemany))
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        where = f" in {report.method} {report.route}" if report is not None else ""
+        print(f"Slow query ({elapsed * 1000:.1f} ms){where}: {_PLACEHOLDER_LIST.sub('(?, ...)', _WHITESPACE.sub(' ', statement))}")
+        print(f"  parameters: {parameters!r}"[:500])
+        if not executemany:
+            try:
+                plan = explain(conn, statement, parameters) or "(none)"
+                print("  plan:\n    " + plan.replace("\n", "\n    "))
+            except Exception as e:
+                print(f"  plan unavailable: {e}")
+
+
+# ----------------------------
+# Middleware
+# ----------------------------
+class QueryLogMiddleware:
+    """Gives each request a RequestReport and flags repeated statements when it ends"""
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = QUERY_LOG_REPEAT_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        report = RequestReport(scope["method"], metrics.route_label(scope))
+        token = current_report.set(report)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_report.reset(token)
+            for sql, times in report.repeated(self.repeat_threshold):
+                print(f"Possible N+1 in {report.method} {report.route}: ran {times}x: {sql[:300]}")
+            for reports in _captures:
+                reports.append(report)
+
+
+def install(app):
+    """Listen to app.metrics' statement timings and add the middleware (main does this when enabled)"""
+    if record_statement not in metrics.statement_listeners:
+        metrics.statement_listeners.append(record_statement)
+    app.add_middleware(QueryLogMiddleware)
@@ -0,0 +1,84 @@
+"""
+Maintained question counters
+One row per (subject, difficulty) in `question_counts`, adjusted in the same
+transaction as every question insert/delete, so count endpoints are a single
+read of a tiny table instead of COUNT(*) per subject.
+"""
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select
+
+from app.database import dialect_insert
+from app.models.question import Question
+from app.models.question_count import QuestionCount
+
+SUBJECTS = ["math", "english", "reading", "science"]
+
+
+def count_deltas(questions: Iterable, sign: int = 1) -> Counter:
+    """(subject, difficulty) -> +n for inserted questions (sign=-1 for deletes)"""
+    deltas = Counter()
+    for q in questions:
+        deltas[(q.subject, q.difficulty)] += sign
+    return deltas
+
+
+def count_delta_statement(db, deltas: Counter):
+    """Upsert statement and executemany rows applying `deltas` to the counters"""
+    stmt = dialect_insert(db, QuestionCount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[QuestionCount.subject, QuestionCount.difficulty],
+        set_={"count": QuestionCount.count + stmt.excluded.count},
+    )
+    rows = [
+        {"subject": subject, "difficulty": difficulty, "count": n}
+        for (subject, difficulty), n in deltas.items()
+        if n
+    ]
+    return stmt, rows
+
+
+async def apply_count_deltas(db, deltas: Counter):
+    """Apply `deltas` inside the caller's (async) transaction"""
+    stmt, rows = count_delta_statement(db, deltas)
+    if rows:
+        await db.execute(stmt, rows)
+
+
+async def read_counts(db) -> dict:
+    """Per-subject totals plus overall total, from the counters table"""
+    rows = await db.execute(
+        select(QuestionCount.subject, func.sum(QuestionCount.count)).group_by(QuestionCount.subject)
+    )
+    counts = {subject: 0 for subject in SUBJECTS}
+    for subject, count in rows:
+        counts[subject] = int(count or 0)
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+async def reconcile_counts(db):
+    """Rebuild the counters from the questions table with one GROUP BY"""
+    await db.execute(delete(QuestionCount))
+    await db.execute(
+        insert(QuestionCount).from_select(
+            ["subject", "difficulty", "count"],
+            select(Question.subject, Question.difficulty, func.count(Question.id))
+            .group_by(Question.subject, Question.difficulty),
+        )
+    )
+    await db.commit()
+
+
+async def ensure_counts(db):
+    """Reconcile once if the counters table has never been populated"""
+    if await db.scalar(select(QuestionCount.subject).limit(1)) is not None:
+        return
+    if await db.scalar(select(Question.id).limit(1)) is None:
+        return
+    try:
+        await reconcile_counts(db)
+    except Exception:
+        # Another worker is doing the same thing at startup
+        await db.rollback()
@@ -0,0 +1,138 @@
+"""
+Streaming question import
+Reads NDJSON or CSV incrementally from any async source of bytes/lines,
+validates each record and inserts them in bounded chunks through
+app.question_ingest. Progress is yielded per chunk, so callers can stream it
+back while memory stays bounded by the chunk size, not the file size.
+
+CSV files need a header row with the QuestionCreate field names; `choices`
+is either a JSON array or a "|"-separated list.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.question_ingest import BULK_INSERT_CHUNK_SIZE, insert_rows, validate_question
+from app.schemas import QuestionCreate
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines (newline kept), holding at most one partial line"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_file_lines(path: str) -> AsyncIterator[str]:
+    """Lines of a local file, read lazily"""
+    with open(path, encoding="utf-8", newline="") as f:
+        for line in f:
+            yield line
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[str]:
+    """Raw record text: one per NDJSON line, one per (possibly multi-line) CSV row"""
+    pending = ""
+    async for line in lines:
+        if fmt == "ndjson":
+            if line.strip():
+                yield line
+            continue
+        pending += line
+        # A quoted CSV field may span lines; wait until the quotes balance
+        if pending.count('"') % 2 == 0:
+            if pending.strip():
+                yield pending
+            pending = ""
+    if pending.strip():
+        yield pending
+
+
+def _split_choices(value: str) -> List[str]:
+    if value.lstrip().startswith("["):
+        return json.loads(value)
+    return [c.strip() for c in value.split("|")]
+
+
+def parse_record(text: str, fmt: str, header: Optional[List[str]] = None) -> QuestionCreate:
+    """QuestionCreate for one record; ValueError/TypeError if it can't be parsed"""
+    if fmt == "ndjson":
+        return QuestionCreate(**json.loads(text))
+    values = next(csv.reader(io.StringIO(text)))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    record = dict(zip(header, values))
+    record["choices"] = _split_choices(record.get("choices", ""))
+    if not record.get("explanation"):
+        record["explanation"] = None
+    if not record.get("difficulty"):
+        record["difficulty"] = None
+    return QuestionCreate(**record)
+
+
+async def stream_import(
+    db, lines: AsyncIterator[str], fmt: str = "ndjson", chunk_size: int = BULK_INSERT_CHUNK_SIZE
+) -> AsyncIterator[dict]:
+    """
+    Import records from `lines`, yielding one progress event per inserted chunk
+    and a final "done" event. Record indexes are 0-based, excluding any CSV header.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+    header = None
+    batch: List[Tuple[int, dict]] = []
+    batch_errors: List[dict] = []
+    processed = created_count = error_count = 0
+
+    async def flush():
+        nonlocal batch, batch_errors, created_count, error_count
+        created, errors = await insert_rows(db, batch, chunk_size)
+        errors = sorted(batch_errors + errors, key=lambda e: e["index"])
+        created_count += len(created)
+        error_count += len(errors)
+        event = {
+            "type": "progress",
+            "processed": processed,
+            "created_count": created_count,
+            "error_count": error_count,
+            "errors": errors,
+        }
+        batch, batch_errors = [], []
+        return event
+
+    async for text in iter_records(lines, fmt):
+        if fmt == "csv" and header is None:
+            header = [h.strip() for h in next(csv.reader(io.StringIO(text)))]
+            continue
+        idx = processed
+        processed += 1
+        try:
+            batch.append((idx, validate_question(parse_record(text, fmt, header))))
+        except (ValueError, TypeError) as e:
+            batch_errors.append({"index": idx, "error": str(e)})
+
+        # Insert before reading further, so a fast sender can't pile up rows
+        if len(batch) + len(batch_errors) >= chunk_size:
+            yield await flush()
+
+    if batch or batch_errors:
+        yield await flush()
+
+    yield {
+        "type": "done",
+        "processed": processed,
+        "created_count": created_count,
+        "error_count": error_count,
+    }
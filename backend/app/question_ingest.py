@@ -0,0 +1,107 @@
+"""
+Set-based question ingestion
+Validates a batch of QuestionCreate items up front, then inserts the valid
+rows with executemany INSERT ... RETURNING in chunked transactions. Counters,
+the search index and the catalog version are updated in the same
+transaction as each chunk.
+"""
+import json
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+from decouple import config
+from sqlalchemy import insert
+
+from app.catalog import catalog_version_bump
+from app.models.question import Question
+from app.question_counts import apply_count_deltas
+from app.search import apply_search_index
+
+BULK_INSERT_CHUNK_SIZE = config("BULK_INSERT_CHUNK_SIZE", default=1000, cast=int)
+
+VALID_SUBJECTS = ["math", "english", "reading", "science"]
+VALID_DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def validate_question(question) -> dict:
+    """Row dict for a QuestionCreate, or ValueError with the per-index message"""
+    if question.subject.lower() not in VALID_SUBJECTS:
+        raise ValueError(f"Invalid subject: {question.subject}")
+    if not question.difficulty:
+        raise ValueError("difficulty is required")
+    if question.difficulty.lower() not in VALID_DIFFICULTIES:
+        raise ValueError(f"Invalid difficulty: {question.difficulty}")
+    if question.correct_answer not in question.choices:
+        raise ValueError("correct_answer not in choices")
+    if not question.explanation or not question.explanation.strip():
+        raise ValueError("explanation is required")
+    return {
+        "subject": question.subject.lower(),
+        "question_text": question.question_text,
+        "choices": json.dumps(question.choices),
+        "correct_answer": question.correct_answer,
+        "explanation": question.explanation,
+        "difficulty": question.difficulty.lower(),
+    }
+
+
+def validate_batch(questions: Iterable, start_index: int = 0) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """Split a batch into (index, row) pairs and per-index errors"""
+    rows = []
+    errors = []
+    for idx, question in enumerate(questions, start=start_index):
+        try:
+            rows.append((idx, validate_question(question)))
+        except ValueError as e:
+            errors.append({"index": idx, "error": str(e)})
+    return rows, errors
+
+
+async def _insert_chunk(db, chunk: List[dict]) -> List[int]:
+    """Insert one chunk and its counter deltas in a single transaction"""
+    # Without sort_by_parameter_order: SQLite can't guarantee it in one
+    # statement, so SQLAlchemy would fall back to one INSERT per row
+    ids = sorted(await db.scalars(insert(Question).returning(Question.id), chunk))
+    await apply_count_deltas(db, Counter((r["subject"], r["difficulty"]) for r in chunk))
+    await apply_search_index(db, ids)
+    await db.execute(catalog_version_bump(db))
+    await db.commit()
+    return ids
+
+
+async def insert_rows(
+    db, rows: List[Tuple[int, dict]], chunk_size: int = BULK_INSERT_CHUNK_SIZE
+) -> Tuple[List[int], List[dict]]:
+    """
+    Insert validated (index, row) pairs in chunks.
+    A chunk that fails as a whole is retried row by row so the error can be
+    pinned to its index; the rest of the chunk still goes in.
+    """
+    created = []
+    errors = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            created.extend(await _insert_chunk(db, [row for _, row in chunk]))
+        except Exception:
+            await db.rollback()
+            for idx, row in chunk:
+                try:
+                    created.extend(await _insert_chunk(db, [row]))
+                except Exception as e:
+                    await db.rollback()
+                    # The driver's message carries the SQL and parameters; keep it in the log
+                    print(f"Question insert failed at index {idx}: {e}")
+                    errors.append({"index": idx, "error": f"Could not insert question ({type(e).__name__})"})
+    return created, errors
+
+
+async def ingest_questions(
+    db, questions: Iterable, start_index: int = 0, chunk_size: int = BULK_INSERT_CHUNK_SIZE
+) -> Tuple[List[int], List[dict]]:
+    """Validate then insert a batch; returns (created_ids, errors sorted by index)"""
+    rows, errors = validate_batch(questions, start_index)
+    created, insert_errors = await insert_rows(db, rows, chunk_size)
+    errors.extend(insert_errors)
+    errors.sort(key=lambda e: e["index"])
+    return created, errors
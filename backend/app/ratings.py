@@ -0,0 +1,338 @@
+"""
+Adaptive-difficulty ratings
+Users and questions carry Elo-style ratings on one scale (Rasch/1PL model):
+the chance a user answers a question correctly is
+
+    p = 1 / (1 + 10 ** ((question_rating - user_rating) / RATING_SCALE))
+
+Each answer moves both ratings by K * (outcome - p), an O(1) update applied
+in memory right away and persisted as deltas through the answer log, in the
+same transaction as the answer (like the performance rollups). Ratings are
+stored as an adjustment to a base: the user's current_level or the
+question's difficulty, so unseen items start somewhere sensible.
+
+recalibrate() refits every rating from the full answer history with a
+vectorized NumPy fit; run scripts/recalibrate_ratings.py periodically.
+
+The next-question endpoint looks up questions near a target rating in per-subject
+arrays sorted by rating (bisect, then outward; see nearest()) instead of
+scanning. The arrays are rebuilt from the database every RATING_REFRESH_SECONDS, so
+per-answer moves reach the index (and other workers) on that cadence.
+"""
+import asyncio
+import bisect
+import math
+import random
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from decouple import config
+from sqlalchemy import delete, insert, select
+
+from app.database import dialect_insert
+from app.models.answer_tracking import AnswerTracking
+from app.models.question import Question
+from app.models.rating import QuestionRating, UserRating
+from app.models.user import User
+
+RATING_SCALE = 400.0
+QUESTION_BASE_RATINGS = {"easy": 1300.0, "medium": 1500.0, "hard": 1700.0}
+USER_BASE_RATINGS = {"beginner": 1400.0, "intermediate": 1500.0, "advanced": 1600.0}
+DEFAULT_RATING = 1500.0
+
+RATING_K_USER = config("RATING_K_USER", default=40.0, cast=float)
+RATING_K_QUESTION = config("RATING_K_QUESTION", default=16.0, cast=float)
+# K shrinks as a rating accumulates answers, down to a quarter of its start
+RATING_K_DECAY_ANSWERS = config("RATING_K_DECAY_ANSWERS", default=20.0, cast=float)
+RATING_REFRESH_SECONDS = config("RATING_REFRESH_SECONDS", default=60.0, cast=float)
+RATING_MAX_USERS = config("RATING_MAX_USERS", default=10000, cast=int)
+# Success probability next_question aims for
+NEXT_QUESTION_TARGET_P = config("NEXT_QUESTION_TARGET_P", default=0.7, cast=float)
+NEXT_QUESTION_WINDOW = 8  # nearest eligible candidates to pick from at random
+NEXT_QUESTION_MAX_PROBES = 2000
+
+RATING_DELTA_KEYS = ("user_rating_delta", "question_rating_delta")
+
+
+def expected_score(user_rating: float, question_rating: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** ((question_rating - user_rating) / RATING_SCALE))
+
+
+def target_rating(user_rating: float, p: float) -> float:
+    """Question rating the user answers correctly with probability p"""
+    p = min(max(p, 0.01), 0.99)
+    return user_rating + RATING_SCALE * math.log10(1.0 / p - 1.0)
+
+
+def k_factor(k: float, answers: int) -> float:
+    return max(k / 4.0, k / (1.0 + answers / RATING_K_DECAY_ANSWERS))
+
+
+def question_base(difficulty: Optional[str]) -> float:
+    return QUESTION_BASE_RATINGS.get(difficulty or "", DEFAULT_RATING)
+
+
+def user_base(level: Optional[str]) -> float:
+    return USER_BASE_RATINGS.get(level or "", DEFAULT_RATING)
+
+
+class RatingEngine:
+    def __init__(self, refresh_seconds: float = RATING_REFRESH_SECONDS, max_users: int = RATING_MAX_USERS):
+        self.refresh_seconds = refresh_seconds
+        self.max_users = max_users
+        # id -> [base, adjustment, answers]
+        self._questions: Dict[int, list] = {}
+        self._users: "OrderedDict[int, Tuple[list, float]]" = OrderedDict()
+        # subject|None -> (ratings ascending, matching question ids)
+        self._index: Dict[Optional[str], Tuple[List[float], List[int]]] = {}
+        self._refreshed_at = 0.0
+        self._catalog_version = None
+        self._lock = asyncio.Lock()
+        self.updates = 0
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    async def ensure_fresh(self, db, catalog):
+        """Reload question ratings and the sorted index when stale or the bank changed"""
+        await catalog.ensure_fresh(db)
+        if (
+            time.monotonic() - self._refreshed_at < self.refresh_seconds
+            and self._catalog_version == catalog.version
+        ):
+            return
+        async with self._lock:
+            if (
+                time.monotonic() - self._refreshed_at < self.refresh_seconds
+                and self._catalog_version == catalog.version
+            ):
+                return
+            rows = (await db.execute(
+                select(QuestionRating.question_id, QuestionRating.adjustment, QuestionRating.answers)
+            )).all()
+            stored = {r.question_id: (r.adjustment, r.answers) for r in rows}
+
+            questions = {}
+            by_subject = defaultdict(list)
+            for question_id in catalog.ids():
+                subject, difficulty = catalog.key(question_id)
+                adjustment, answers = stored.get(question_id, (0.0, 0))
+                state = [question_base(difficulty), adjustment, answers]
+                questions[question_id] = state
+                by_subject[subject].append((state[0] + adjustment, question_id))
+                by_subject[None].append((state[0] + adjustment, question_id))
+
+            index = {}
+            for subject, pairs in by_subject.items():
+                pairs.sort()
+                index[subject] = ([r for r, _ in pairs], [q for _, q in pairs])
+
+            self._questions = questions
+            self._index = index
+            self._catalog_version = catalog.version
+            self._refreshed_at = time.monotonic()
+
+    async def _user(self, db, user_id: int) -> list:
+        entry = self._users.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] < self.refresh_seconds:
+            self._users.move_to_end(user_id)
+            return entry[0]
+        row = (await db.execute(
+            select(User.current_level, UserRating.adjustment, UserRating.answers)
+            .outerjoin(UserRating, UserRating.user_id == User.id)
+            .where(User.id == user_id)
+        )).first()
+        level, adjustment, answers = row if row else (None, None, None)
+        state = [user_base(level), adjustment or 0.0, answers or 0]
+        self._users[user_id] = (state, time.monotonic())
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return state
+
+    # ----------------------------
+    # Updates and reads
+    # ----------------------------
+    async def user_rating(self, db, user_id: int) -> float:
+        state = await self._user(db, user_id)
+        return state[0] + state[1]
+
+    def question_rating(self, question_id: int, difficulty: Optional[str] = None) -> float:
+        state = self._questions.get(question_id)
+        if state is None:
+            return question_base(difficulty)
+        return state[0] + state[1]
+
+    async def load_questions(self, db, difficulties: Dict[int, Optional[str]]):
+        """Load stored ratings for the questions (id -> difficulty) not held yet, in one query"""
+        missing = [q for q in difficulties if q not in self._questions]
+        if not missing:
+            return
+        rows = (await db.execute(
+            select(QuestionRating.question_id, QuestionRating.adjustment, QuestionRating.answers)
+            .where(QuestionRating.question_id.in_(missing))
+        )).all()
+        stored = {r.question_id: (r.adjustment, r.answers) for r in rows}
+        for question_id in missing:
+            adjustment, answers = stored.get(question_id, (0.0, 0))
+            self._questions[question_id] = [question_base(difficulties[question_id]), adjustment, answers]
+
+    async def record(
+        self, db, user_id: int, question_id: int, difficulty: Optional[str], is_correct: bool
+    ) -> Tuple[float, float]:
+        """Apply one answer in memory; returns (user delta, question delta) to persist"""
+        user = await self._user(db, user_id)
+        # Only /next refreshes the whole index; answers to other questions
+        # must still start from the stored rating and count
+        await self.load_questions(db, {question_id: difficulty})
+        question = self._questions[question_id]
+
+        surprise = (1.0 if is_correct else 0.0) - expected_score(user[0] + user[1], question[0] + question[1])
+        user_delta = k_factor(RATING_K_USER, user[2]) * surprise
+        question_delta = -k_factor(RATING_K_QUESTION, question[2]) * surprise
+        user[1] += user_delta
+        user[2] += 1
+        question[1] += question_delta
+        question[2] += 1
+        self.updates += 1
+        return user_delta, question_delta
+
+    def nearest(
+        self, target: float, subject: Optional[str] = None, exclude=None, rng: random.Random = random
+    ) -> Optional[int]:
+        """A question rated close to `target`, skipping ids in `exclude`"""
+        ratings, ids = self._index.get(subject, ([], []))
+        if not ids:
+            return None
+        hi = bisect.bisect_left(ratings, target)
+        lo = hi - 1
+        candidates = []
+        for _ in range(min(len(ids), NEXT_QUESTION_MAX_PROBES)):
+            if lo < 0 and hi >= len(ids):
+                break
+            # Step toward whichever neighbour is closer to the target
+            if hi >= len(ids) or (lo >= 0 and target - ratings[lo] <= ratings[hi] - target):
+                question_id, lo = ids[lo], lo - 1
+            else:
+                question_id, hi = ids[hi], hi + 1
+            if exclude is None or question_id not in exclude:
+                candidates.append(question_id)
+                if len(candidates) == NEXT_QUESTION_WINDOW:
+                    break
+        return rng.choice(candidates) if candidates else None
+
+    def stats(self) -> dict:
+        return {
+            "questions": len(self._questions),
+            "users": len(self._users),
+            "updates": self.updates,
+        }
+
+
+def rating_delta_statements(db, answers: Iterable[dict]):
+    """[(upsert statement, executemany rows)] adding the answers' rating deltas"""
+    users = defaultdict(lambda: [0.0, 0])
+    questions = defaultdict(lambda: [0.0, 0])
+    for a in answers:
+        if a.get("user_rating_delta") is None:
+            continue
+        users[a["user_id"]][0] += a["user_rating_delta"]
+        users[a["user_id"]][1] += 1
+        questions[a["question_id"]][0] += a["question_rating_delta"]
+        questions[a["question_id"]][1] += 1
+
+    statements = []
+    for model, key, deltas in ((UserRating, "user_id", users), (QuestionRating, "question_id", questions)):
+        if not deltas:
+            continue
+        stmt = dialect_insert(db, model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, key)],
+            set_={
+                "adjustment": model.adjustment + stmt.excluded.adjustment,
+                "answers": model.answers + stmt.excluded.answers,
+            },
+        )
+        rows = [{key: k, "adjustment": d, "answers": n} for k, (d, n) in deltas.items()]
+        statements.append((stmt, rows))
+    return statements
+
+
+# ----------------------------
+# Batch recalibration
+# ----------------------------
+PRIOR_SD = 200.0  # rating points; pulls thinly-answered items toward their base
+
+
+def fit_ratings(user_idx, question_idx, correct, user_prior, question_prior, iterations: int = 30):
+    """
+    Regularized Rasch fit over every answer at once. Arrays are NumPy: answer
+    rows as indexes into the user/question prior arrays, `correct` as 0/1.
+    Returns (user ratings, question ratings) on the rating scale.
+    """
+    import numpy as np
+
+    c = math.log(10.0) / RATING_SCALE  # rating points -> logits
+    lam = 1.0 / (PRIOR_SD * c) ** 2
+    t0, d0 = user_prior * c, question_prior * c
+    t, d = t0.copy(), d0.copy()
+    y = correct.astype(np.float64)
+    n_users, n_questions = len(t0), len(d0)
+
+    for _ in range(iterations):
+        # Diagonal Newton steps, alternating abilities and difficulties
+        p = 1.0 / (1.0 + np.exp(d[question_idx] - t[user_idx]))
+        grad = np.bincount(user_idx, y - p, n_users) - lam * (t - t0)
+        hess = np.bincount(user_idx, p * (1.0 - p), n_users) + lam
+        t += grad / hess
+
+        p = 1.0 / (1.0 + np.exp(d[question_idx] - t[user_idx]))
+        grad = np.bincount(question_idx, p - y, n_questions) - lam * (d - d0)
+        hess = np.bincount(question_idx, p * (1.0 - p), n_questions) + lam
+        d += grad / hess
+
+    return t / c, d / c
+
+
+async def recalibrate(db, iterations: int = 30) -> dict:
+    """Refit all ratings from user_answers and replace the stored adjustments"""
+    import numpy as np
+
+    answers = (await db.execute(
+        select(AnswerTracking.user_id, AnswerTracking.question_id, AnswerTracking.is_correct)
+        .where(AnswerTracking.user_id.is_not(None))
+    )).all()
+    if not answers:
+        return {"answers": 0, "users": 0, "questions": 0}
+
+    data = np.array([(u, q, 1 if c else 0) for u, q, c in answers], dtype=np.int64)
+    user_ids, user_idx = np.unique(data[:, 0], return_inverse=True)
+    question_ids, question_idx = np.unique(data[:, 1], return_inverse=True)
+
+    levels = dict((await db.execute(select(User.id, User.current_level))).all())
+    difficulties = dict((await db.execute(select(Question.id, Question.difficulty))).all())
+    user_prior = np.array([user_base(levels.get(int(u))) for u in user_ids])
+    question_prior = np.array([question_base(difficulties.get(int(q))) for q in question_ids])
+
+    user_ratings, question_ratings = fit_ratings(
+        user_idx, question_idx, data[:, 2], user_prior, question_prior, iterations
+    )
+    user_counts = np.bincount(user_idx, minlength=len(user_ids))
+    question_counts = np.bincount(question_idx, minlength=len(question_ids))
+
+    await db.execute(delete(UserRating))
+    await db.execute(delete(QuestionRating))
+    await db.execute(insert(UserRating), [
+        {"user_id": int(u), "adjustment": float(r - b), "answers": int(n)}
+        for u, r, b, n in zip(user_ids, user_ratings, user_prior, user_counts)
+    ])
+    await db.execute(insert(QuestionRating), [
+        {"question_id": int(q), "adjustment": float(r - b), "answers": int(n)}
+        for q, r, b, n in zip(question_ids, question_ratings, question_prior, question_counts)
+    ])
+    await db.commit()
+    return {"answers": len(answers), "users": len(user_ids), "questions": len(question_ids)}
+
+
+rating_engine = RatingEngine()
@@ -0,0 +1,62 @@
+# app/responses.py
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it's installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RawJSON:
+    """Already-encoded JSON that FastJSONResponse copies into the body as-is"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def _encode(obj: Any) -> bytes:
+    if isinstance(obj, RawJSON):
+        return obj.data
+    if isinstance(obj, dict):
+        return b"{" + b",".join(dumps(str(k)) + b":" + _encode(v) for k, v in obj.items()) + b"}"
+    if isinstance(obj, (list, tuple)):
+        return b"[" + b",".join(_encode(v) for v in obj) + b"]"
+    return dumps(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, splicing RawJSON values (e.g. the
+    catalog's pre-serialized questions) into the output without re-encoding.
+    Return it from the handler directly: it skips FastAPI's jsonable_encoder,
+    so content must already be plain JSON types or RawJSON.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _encode(content)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for handlers that keep reading the request body while
+    the response streams. Starlette's disconnect listener would otherwise
+    call receive() concurrently and swallow the remaining body chunks.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
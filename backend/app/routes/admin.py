@@ -1,130 +1,73 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from pydantic import BaseModel
+import json
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.passwords import password_hasher
+from app.auth.principals import principal_cache
+from app.catalog import catalog_version_bump, question_catalog
+from app.compression import compressed_bodies
+from app.database import AsyncSessionLocal, get_async_db
+from app.feedback_cache import feedback_cache
+from app.question_counts import apply_count_deltas, count_deltas, read_counts
+from app.question_import import iter_lines, stream_import
+from app.question_ingest import BULK_INSERT_CHUNK_SIZE, ingest_questions, validate_question
 from app.models.question import Question
+from app.responses import DuplexStreamingResponse
+from app.ratings import rating_engine
+from app.search import apply_search_index, search_questions
+from app.sampling import seen_questions
+from app.schemas import QuestionCreate
 
-router = APIRouter(prefix="/api/admin", tags=["admin"])
-
-class QuestionCreate(BaseModel):
-    subject: str  # 'math', 'english', 'reading', 'science'
-    question_text: str
-    choices: List[str]  # Array of answer choices (typically 4-5)
-    correct_answer: str
-    explanation: Optional[str] = None
-    difficulty: Optional[str] = None  # 'easy', 'medium', 'hard'
+router = APIRouter()  # mounted at /api/admin by main
 
 class BulkQuestionCreate(BaseModel):
     questions: List[QuestionCreate]
 
 @router.post("/questions")
-async def create_question(question: QuestionCreate, db: Session = Depends(get_db)):
+async def create_question(question: QuestionCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a single ACT question
     Requires admin authentication (add auth middleware in production)
     """
     try:
-        # Validate subject
-        valid_subjects = ["math", "english", "reading", "science"]
-        if question.subject.lower() not in valid_subjects:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Subject must be one of: {', '.join(valid_subjects)}"
-            )
-        
-        # Validate difficulty if provided
-        if question.difficulty:
-            valid_difficulties = ["easy", "medium", "hard"]
-            if question.difficulty.lower() not in valid_difficulties:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Difficulty must be one of: {', '.join(valid_difficulties)}"
-                )
-        
-        # Validate correct_answer is in choices
-        if question.correct_answer not in question.choices:
-            raise HTTPException(
-                status_code=400,
-                detail="correct_answer must be one of the provided choices"
-            )
-        
-        # Create new question
-        import json
-        db_question = Question(
-            subject=question.subject.lower(),
-            question_text=question.question_text,
-            choices=json.dumps(question.choices),
-            correct_answer=question.correct_answer,
-            explanation=question.explanation,
-            difficulty=question.difficulty.lower() if question.difficulty else None
-        )
-        
+        row = validate_question(question)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        db_question = Question(**row)
         db.add(db_question)
-        db.commit()
-        db.refresh(db_question)
+        await db.flush()
+        await apply_count_deltas(db, count_deltas([db_question]))
+        await apply_search_index(db, [db_question.id])
+        version = await db.scalar(catalog_version_bump(db))
+        await db.commit()
+        question_catalog.put(db_question, version)
         
         return {
             "success": True,
             "question_id": db_question.id,
             "message": "Question created successfully"
         }
-    except HTTPException:
-        raise
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+        await db.rollback()
+        print(f"Question create failed: {e!r}")
+        raise HTTPException(status_code=500, detail="Failed to create question")
 
 @router.post("/questions/bulk")
-async def create_questions_bulk(bulk: BulkQuestionCreate, db: Session = Depends(get_db)):
+async def create_questions_bulk(bulk: BulkQuestionCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create multiple ACT questions at once
     Useful for importing questions from a dataset
     """
     try:
-        import json
-        created = []
-        errors = []
+        # Validate the whole batch first, then insert in chunked transactions
+        created, errors = await ingest_questions(db, bulk.questions)
         
-        for idx, question in enumerate(bulk.questions):
-            try:
-                # Validate subject
-                valid_subjects = ["math", "english", "reading", "science"]
-                if question.subject.lower() not in valid_subjects:
-                    errors.append({
-                        "index": idx,
-                        "error": f"Invalid subject: {question.subject}"
-                    })
-                    continue
-                
-                # Validate correct_answer is in choices
-                if question.correct_answer not in question.choices:
-                    errors.append({
-                        "index": idx,
-                        "error": "correct_answer not in choices"
-                    })
-                    continue
-                
-                # Create new question
-                db_question = Question(
-                    subject=question.subject.lower(),
-                    question_text=question.question_text,
-                    choices=json.dumps(question.choices),
-                    correct_answer=question.correct_answer,
-                    explanation=question.explanation,
-                    difficulty=question.difficulty.lower() if question.difficulty else None
-                )
-                
-                db.add(db_question)
-                db.commit()
-                db.refresh(db_question)
-                created.append(db_question.id)
-            except Exception as e:
-                db.rollback()
-                errors.append({
-                    "index": idx,
-                    "error": str(e)
-                })
+        if created:
+            question_catalog.invalidate()
         
         return {
             "success": True,
@@ -136,21 +79,108 @@ async def create_questions_bulk(bulk: BulkQuestionCreate, db: Session = Depends(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/questions/import")
+async def import_questions_stream(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunk_size: int = Query(BULK_INSERT_CHUNK_SIZE, ge=1, le=10000),
+):
+    """
+    Stream an NDJSON or CSV question file in the request body.
+    Rows are validated and inserted in chunks as the body arrives, and
+    progress/errors are streamed back as NDJSON, one line per chunk.
+    """
+    async def events():
+        # Own session: the response outlives the request's dependencies
+        async with AsyncSessionLocal() as db:
+            created_any = False
+            try:
+                async for event in stream_import(db, iter_lines(request.stream()), format, chunk_size):
+                    created_any = created_any or event["created_count"] > 0
+                    yield json.dumps(event) + "\n"
+            except Exception as e:
+                yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+            finally:
+                if created_any:
+                    question_catalog.invalidate()
+
+    return DuplexStreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/questions/search")
+async def search_questions_admin(
+    q: str = Query(..., min_length=1, max_length=200),
+    subject: Optional[str] = Query(None),
+    difficulty: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Full-text search returning complete questions (answer and explanation
+    included) with their rank, for finding duplicates
+    """
+    try:
+        matches, total = await search_questions(
+            db,
+            q,
+            subject.lower() if subject else None,
+            difficulty.lower() if difficulty else None,
+            limit,
+            offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        ranks = dict(matches)
+        rows = await db.scalars(select(Question).where(Question.id.in_(ranks)))
+        by_id = {question.id: question for question in rows}
+        results = [
+            {
+                "id": question.id,
+                "subject": question.subject,
+                "difficulty": question.difficulty,
+                "question_text": question.question_text,
+                "choices": json.loads(question.choices),
+                "correct_answer": question.correct_answer,
+                "explanation": question.explanation,
+                "rank": round(ranks[question.id], 4),
+            }
+            for question in (by_id.get(question_id) for question_id in ranks)
+            if question is not None
+        ]
+        return {
+            "questions": results,
+            "count": len(results),
+            "total": total,
+            "offset": offset,
+            "limit": limit
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/questions/count")
-async def get_question_count(db: Session = Depends(get_db)):
+async def get_question_count(db: AsyncSession = Depends(get_async_db)):
     """Get total count of questions by subject"""
     try:
-        subjects = ["math", "english", "reading", "science"]
-        result = {}
-        
-        for subject in subjects:
-            count = db.query(Question).filter(Question.subject == subject).count()
-            result[subject] = count
-        
-        total = sum(result.values())
-        result["total"] = total
-        
-        return result
+        return await read_counts(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for this worker's in-process caches"""
+    return {
+        "question_catalog": question_catalog.stats(),
+        "ai_feedback": feedback_cache.stats(),
+        "auth": principal_cache.stats(),
+        "seen_questions": seen_questions.stats(),
+        "ratings": rating_engine.stats(),
+        "compressed_bodies": compressed_bodies.stats(),
+    }
+
+
+@router.get("/hasher/stats")
+async def get_hasher_stats():
+    """Password hashing pool: work factor, queue depth and rehash count for this worker"""
+    return password_hasher.stats()
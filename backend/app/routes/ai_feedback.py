@@ -1,52 +1,83 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional, Dict, List
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import os
-# from app.database import get_supabase_client  # TODO: Migrate to SQLAlchemy
+from app.database import get_async_db
+from app.feedback_cache import analytics_fingerprint, feedback_cache, feedback_profile
+from app.performance import read_rollups, summarize
 
 router = APIRouter()
 
 # Check if OpenAI is available (optional - can work without it)
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    if OPENAI_API_KEY:
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
-    else:
-        openai_client = None
-except ImportError:
-    OPENAI_AVAILABLE = False
-    OPENAI_API_KEY = None
-    openai_client = None
+# Point OPENAI_BASE_URL at scripts/fake_openai_server.py to try it locally
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "8"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+
+# The openai package is only imported when a key is set (it adds ~0.5s to startup)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+openai_client = None
+if OPENAI_API_KEY:
+    try:
+        from openai import AsyncOpenAI
+        openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT_SECONDS, max_retries=0)
+    except ImportError:
+        print("OPENAI_API_KEY is set but the openai package is not installed; using rule-based feedback")
+OPENAI_AVAILABLE = openai_client is not None
+
+# Global cap on in-flight completions per worker
+openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
 
-def generate_ai_feedback_with_openai(analytics_data: Dict) -> str:
+async def _create_completion(client, prompt: str):
+    async with openai_semaphore:
+        return await client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a helpful ACT test prep tutor that provides encouraging and actionable feedback."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=0.7
+        )
+
+def _band_text(band, counts: bool = False) -> str:
+    """Band as text: "55-60" for accuracy, "10-19" for question counts"""
+    low, high = band
+    return f"{low}-{high - 1 if counts else high}"
+
+async def generate_ai_feedback_with_openai(analytics_data: Dict, client=None) -> str:
     """
     Generate AI-powered feedback using OpenAI
+    `client` defaults to the module's AsyncOpenAI client; pass a stub to test without the API.
+    Returns None on error or if the call (including waiting for a slot) exceeds
+    OPENAI_TIMEOUT_SECONDS, so callers fall back to rule-based feedback.
     """
-    if not OPENAI_AVAILABLE or not OPENAI_API_KEY:
+    client = client or openai_client
+    if client is None:
         return None
     
     try:
-        weak_areas = analytics_data.get("weak_areas", [])
-        by_subject = analytics_data.get("by_subject", {})
-        overall_accuracy = analytics_data.get("overall_accuracy", 0)
+        # Only bucketed figures: the result is cached for every student
+        # whose stats share these buckets
+        profile = feedback_profile(analytics_data)
         
         # Build prompt for OpenAI
         prompt = f"""You are an ACT test prep tutor. Analyze this student's performance and provide personalized, actionable feedback.
 
 Student Performance Summary:
-- Overall Accuracy: {overall_accuracy}%
-- Total Questions Answered: {analytics_data.get('total_answered', 0)}
+- Overall Accuracy: {_band_text(profile['overall_accuracy'])}%
+- Total Questions Answered: {_band_text(profile['total_answered'], counts=True)}
 
 Subject Performance:
 """
-        for subject, stats in by_subject.items():
-            prompt += f"- {subject.capitalize()}: {stats['accuracy']:.1f}% ({stats['correct']}/{stats['total']})\n"
+        for subject, stats in profile["subjects"].items():
+            prompt += f"- {subject.capitalize()}: {_band_text(stats['accuracy'])}% over {_band_text(stats['total'], counts=True)} questions\n"
         
-        if weak_areas:
+        if profile["weak"]:
             prompt += f"\nWeak Areas Identified:\n"
-            for area in weak_areas:
-                prompt += f"- {area['subject'].capitalize()}: {area['accuracy']:.1f}% accuracy ({area['priority']} priority)\n"
+            for subject, priority in profile["weak"]:
+                accuracy = profile["subjects"][subject]["accuracy"]
+                prompt += f"- {subject.capitalize()}: {_band_text(accuracy)}% accuracy ({priority} priority)\n"
         
         prompt += """
 Provide:
@@ -57,20 +88,14 @@ Provide:
 
 Keep the response concise, friendly, and motivating (max 200 words)."""
 
-        if not openai_client:
-            return None
-            
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful ACT test prep tutor that provides encouraging and actionable feedback."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.7
+        response = await asyncio.wait_for(
+            _create_completion(client, prompt), timeout=OPENAI_TIMEOUT_SECONDS
         )
         
         return response.choices[0].message.content.strip()
+    except asyncio.TimeoutError:
+        print(f"OpenAI API timed out after {OPENAI_TIMEOUT_SECONDS}s; using fallback feedback")
+        return None
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return None
@@ -135,16 +160,15 @@ def generate_fallback_feedback(analytics_data: Dict) -> str:
     return "\n".join(feedback_parts)
 
 @router.get("/api/ai-feedback/{user_id}")
-async def get_ai_feedback(user_id: int, use_ai: bool = True):
+async def get_ai_feedback(user_id: int, use_ai: bool = True, db: AsyncSession = Depends(get_async_db)):
     """
     Get AI-powered personalized feedback based on student performance
     """
     try:
-        # Get analytics data by calling the analytics endpoint internally
-        supabase = get_supabase_client()
-        answers_response = supabase.table("user_answers").select("*").eq("user_id", user_id).execute()
+        # Per-subject totals come from the maintained rollups
+        summary = summarize(await read_rollups(db, user_id))
         
-        if not answers_response.data:
+        if not summary["total_answered"]:
             return {
                 "feedback": "Start practicing questions to receive personalized feedback!",
                 "recommendations": [
@@ -155,24 +179,17 @@ async def get_ai_feedback(user_id: int, use_ai: bool = True):
                 "ai_generated": False
             }
         
-        answers = answers_response.data
-        total_answered = len(answers)
-        total_correct = sum(1 for a in answers if a.get("is_correct", False))
-        overall_accuracy = (total_correct / total_answered * 100) if total_answered > 0 else 0.0
+        total_answered = summary["total_answered"]
+        total_correct = summary["total_correct"]
+        overall_accuracy = summary["overall_accuracy"]
         
-        # Calculate performance by subject
+        # Performance by subject, in the usual subject order
         subjects = ["math", "english", "reading", "science"]
-        by_subject = {}
-        
-        for subject in subjects:
-            subject_answers = [a for a in answers if a.get("subject") == subject]
-            if subject_answers:
-                subject_correct = sum(1 for a in subject_answers if a.get("is_correct", False))
-                by_subject[subject] = {
-                    "total": len(subject_answers),
-                    "correct": subject_correct,
-                    "accuracy": (subject_correct / len(subject_answers) * 100) if subject_answers else 0.0
-                }
+        by_subject = {
+            subject: summary["by_subject"][subject]
+            for subject in subjects
+            if subject in summary["by_subject"]
+        }
         
         # Identify weak areas
         weak_areas = []
@@ -196,10 +213,15 @@ async def get_ai_feedback(user_id: int, use_ai: bool = True):
             "weak_areas": weak_areas
         }
         
-        # Try to generate AI feedback if available
+        # Try to generate AI feedback if available; unchanged stats reuse cached text
         ai_feedback = None
-        if use_ai and OPENAI_AVAILABLE and OPENAI_API_KEY:
-            ai_feedback = generate_ai_feedback_with_openai(analytics_data)
+        if use_ai and openai_client is not None:
+            async def generate():
+                return await generate_ai_feedback_with_openai(analytics_data)
+
+            ai_feedback = await feedback_cache.get_or_generate(
+                analytics_fingerprint(analytics_data), generate
+            )
         
         # Use AI feedback if available, otherwise use fallback
         feedback = ai_feedback if ai_feedback else generate_fallback_feedback(analytics_data)
@@ -237,30 +259,22 @@ async def get_ai_feedback(user_id: int, use_ai: bool = True):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/ai-feedback/{user_id}/subject/{subject}")
-async def get_subject_specific_feedback(user_id: int, subject: str):
+async def get_subject_specific_feedback(user_id: int, subject: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get AI feedback specific to a subject
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Get subject-specific analytics
-        answers_response = supabase.table("user_answers")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("subject", subject)\
-            .execute()
+        # Get subject-specific analytics from the rollups
+        stats = summarize(await read_rollups(db, user_id, subject))["by_subject"].get(subject)
         
-        if not answers_response.data:
+        if not stats:
             return {
                 "feedback": f"No {subject} questions answered yet. Start practicing to get feedback!",
                 "subject": subject,
                 "ai_generated": False
             }
         
-        answers = answers_response.data
-        subject_correct = sum(1 for a in answers if a.get("is_correct", False))
-        subject_accuracy = (subject_correct / len(answers) * 100) if answers else 0.0
+        subject_accuracy = stats["accuracy"]
         
         # Generate subject-specific feedback
         feedback_parts = [f"📚 {subject.capitalize()} Performance: {subject_accuracy:.1f}%"]
@@ -289,7 +303,7 @@ async def get_subject_specific_feedback(user_id: int, subject: str):
             "feedback": "\n".join(feedback_parts),
             "subject": subject,
             "accuracy": round(subject_accuracy, 2),
-            "total_answered": len(answers),
+            "total_answered": stats["total"],
             "ai_generated": False
         }
     except Exception as e:
@@ -1,15 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-# from app.database import get_supabase_client  # TODO: Migrate to SQLAlchemy
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.practice_session import PracticeSession
+from app.performance import read_rollups, summarize
+from app.auth.principals import Principal
 from app.routes.auth import get_current_user
 
 router = APIRouter()
 
 # User-specific analytics
 @router.get("/user")
-async def get_user_analytics(user: dict = Depends(get_current_user)):
-    supabase = get_supabase_client()
-    
-    sessions = supabase.table("practice_sessions").select("*").eq("user_id", user["id"]).execute().data
+async def get_user_analytics(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await db.scalars(
+        select(PracticeSession)
+        .where(PracticeSession.user_id == current_user.id)
+        .order_by(PracticeSession.id)
+    )
+    sessions = [
+        {
+            "id": s.id,
+            "session_type": s.session_type,
+            "started_at": s.started_at,
+            "completed_at": s.completed_at,
+            "total_questions": s.total_questions,
+            "correct_answers": s.correct_answers,
+            "score": s.score,
+            "section_scores": s.section_scores,
+            "duration_seconds": s.duration_seconds,
+        }
+        for s in rows
+    ]
     if not sessions:
         return {"message": "No sessions found", "sessions": []}
     
@@ -17,23 +41,18 @@ async def get_user_analytics(user: dict = Depends(get_current_user)):
 
 # Subject accuracy breakdown
 @router.get("/user/subjects")
-async def get_subject_breakdown(user: dict = Depends(get_current_user)):
-    supabase = get_supabase_client()
-    answers = supabase.table("user_answers").select("*").eq("user_id", user["id"]).execute().data
+async def get_subject_breakdown(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Reads the maintained rollups, not the user's full answer history
+    summary = summarize(await read_rollups(db, current_user.id))
+    subjects = summary["by_subject"]
     
-    if not answers:
+    if not subjects:
         return {"message": "No answers found", "subjects": {}}
     
-    subjects = {}
-    for a in answers:
-        subj = a["subject"]
-        subjects[subj] = subjects.get(subj, {"correct": 0, "total": 0})
-        subjects[subj]["total"] += 1
-        if a["is_correct"]:
-            subjects[subj]["correct"] += 1
-    
-    # Calculate accuracy
-    for subj, data in subjects.items():
-        data["accuracy"] = round(data["correct"] / data["total"] * 100, 2)
+    for data in subjects.values():
+        data["accuracy"] = round(data["accuracy"], 2)
     
     return subjects
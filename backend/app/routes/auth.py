@@ -1,40 +1,42 @@
 # app/routes/auth.py
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas
 from app.models.user import User as UserModel
-from app.local_db import get_db
+from app.database import AsyncSessionLocal, get_async_db
 from app.auth.jwt_handler import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     decode_access_token,
 )
+from app.auth.passwords import password_hasher
+from app.auth.principals import Principal, principal_cache
 
 router = APIRouter(tags=["auth"])  # router has no internal prefix; main.py includes it under /api/auth
 
 # Dependency to get DB session
-# get_db is provided by app.database.connection (SQLAlchemy session)
+# get_async_db is provided by app.database.connection (SQLAlchemy AsyncSession)
 
 
 # Register
 @router.post("/register")
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(UserModel).filter(UserModel.email == user.email).first()
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(UserModel).where(UserModel.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     db_user = UserModel(
         email=user.email,
         full_name=user.full_name,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await password_hasher.hash(user.password),
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     token = create_access_token({"sub": str(db_user.id)})
     return {
         "user": {
@@ -54,18 +56,25 @@ class LoginRequest(BaseModel):
 
 
 @router.post("/login")
-def login(body: LoginRequest, db: Session = Depends(get_db)):
+async def login(body: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login accepts JSON body {username, password} - can use email or username."""
     username = body.username
     password = body.password
     # Try to find by username first, then by email if username not found
-    user = db.query(UserModel).filter(UserModel.username == username).first()
+    user = await db.scalar(select(UserModel).where(UserModel.username == username))
     if not user:
         # If not found by username, try email
-        user = db.query(UserModel).filter(UserModel.email == username).first()
+        user = await db.scalar(select(UserModel).where(UserModel.email == username))
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    ok, new_hash = await password_hasher.verify(password, user.hashed_password)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an older work factor; upgrade it now that we have the password
+        user.hashed_password = new_hash
+        await db.commit()
     token = create_access_token({"sub": str(user.id)})
     return {
         "user": {
@@ -79,23 +88,53 @@ def login(body: LoginRequest, db: Session = Depends(get_db)):
 
 
 # Get current user
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request) -> Principal:
+    """
+    Principal for the request's bearer token. Seen tokens skip signature
+    verification and cached principals skip the DB (see app.auth.principals).
+    """
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing token")
     token = auth_header.split(" ")[1]
-    payload = decode_access_token(token)
-    if not payload:
+    try:
+        payload = principal_cache.get_claims(token)
+        if payload is None:
+            payload = decode_access_token(token)
+            if not payload:
+                raise ValueError("undecodable token")
+            principal_cache.put_claims(token, payload)
+        # A signed token can still carry a missing or non-numeric subject
+        user_id = int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.query(UserModel).get(int(user_id))
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = principal_cache.get_principal(user_id)
+    if principal is None:
+        # Session only on a miss, so the cached path never touches the pool
+        async with AsyncSessionLocal() as db:
+            user = await db.get(UserModel, user_id)
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.put_principal(principal)
+    return principal
+
+
+async def get_optional_user(request: Request) -> Optional[Principal]:
+    """
+    Like get_current_user, but a request without a usable token (none,
+    malformed, expired, or for a deleted user) is anonymous: None, not a 401
+    """
+    if not request.headers.get("Authorization"):
+        return None
+    try:
+        return await get_current_user(request)
+    except HTTPException as e:
+        if e.status_code == 401:
+            return None
+        raise
 
 
 @router.get("/me")
-def read_me(current_user: UserModel = Depends(get_current_user)):
+def read_me(current_user: Principal = Depends(get_current_user)):
     return {"user": {"email": current_user.email, "full_name": current_user.full_name, "username": current_user.username}}
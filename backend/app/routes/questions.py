@@ -1,12 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import Optional, List
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from sqlalchemy import select, tuple_
+import base64
 import json
-from app.local_db import get_db
+import random
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.answer_log import answer_log
+from app.catalog import question_catalog
+from app.database import get_async_db
+from app.http_cache import cache_headers, not_modified, version_etag
+from app.question_counts import read_counts
 from app.models.question import Question
-from app.routes.auth import get_current_user
-from app.models.user import User
+from app.question_ingest import VALID_DIFFICULTIES, VALID_SUBJECTS
+from app.responses import FastJSONResponse
+from app.ratings import NEXT_QUESTION_TARGET_P, expected_score, rating_engine, target_rating
+from app.sampling import allocate, draw, parse_mix, seen_questions
+from app.search import search_questions
+from app.auth.principals import Principal
+from app.routes.auth import get_current_user, get_optional_user
 
 router = APIRouter()
 
@@ -38,57 +50,295 @@ class CheckAnswerResponse(BaseModel):
     correct_answer: str
     explanation: str
 
+class BatchCheckRequest(BaseModel):
+    answers: List[CheckAnswerRequest] = Field(..., min_length=1, max_length=100)
+
+# ============================
+# Cursor helpers
+# ============================
+def encode_cursor(subject: str, difficulty: str, question_id: int) -> str:
+    """Opaque cursor for the keyset (subject, difficulty, id)"""
+    raw = json.dumps([subject, difficulty, question_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        subject, difficulty, question_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(subject), str(difficulty), int(question_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 # ============================
 # GET MULTIPLE QUESTIONS
 # ============================
 @router.get("/")
 async def get_questions(
+    request: Request,
     subject: Optional[str] = Query(None),
     difficulty: Optional[str] = Query(None),
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    paginate: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Returns a list of questions, with optional filters:
     - subject (math, english, reading, science)
     - difficulty (easy, medium, hard)
     - limit and offset for pagination
+
+    With paginate=cursor (or any cursor given), pages are ordered by
+    (subject, difficulty, id) and walked with the returned next_cursor;
+    total is only included when include_total=true.
+
+    Responses carry an ETag; send it back in If-None-Match to get a 304.
     """
+    if paginate == "cursor" or cursor is not None:
+        return await _get_questions_page(request, subject, difficulty, limit, cursor, include_total, db)
+
+    subject = subject.lower() if subject else None
+    difficulty = difficulty.lower() if difficulty else None
     try:
-        query = db.query(Question)
+        # Served from the in-process catalog; the DB is only hit on body misses
+        await question_catalog.ensure_fresh(db)
+        etag = version_etag(question_catalog.version, "list", subject, difficulty, limit, offset)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        if subject:
-            query = query.filter(Question.subject == subject.lower())
+        ids = question_catalog.ids(subject, difficulty)
+        total = len(ids)
 
-        if difficulty:
-            query = query.filter(Question.difficulty == difficulty.lower())
-
-        # Get total count before limit
-        total = query.count()
-
-        # Apply pagination
-        questions = query.offset(offset).limit(limit).all()
-
-        # Convert choices JSON string back to list
-        result = []
-        for q in questions:
-            choices = json.loads(q.choices) if isinstance(q.choices, str) else q.choices
-            result.append({
-                "id": q.id,
-                "subject": q.subject,
-                "difficulty": q.difficulty,
-                "question_text": q.question_text,
-                "choices": choices
-            })
+        entries = await question_catalog.get_many(db, ids[offset:offset + limit])
 
-        return {
-            "questions": result,
-            "count": len(result),
+        # Pre-serialized question bodies are spliced in, not re-encoded
+        return FastJSONResponse({
+            "questions": [e.payload for e in entries],
+            "count": len(entries),
             "total": total,
             "offset": offset,
             "limit": limit
+        }, headers=cache_headers(etag))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _get_questions_page(
+    request: Request,
+    subject: Optional[str],
+    difficulty: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool,
+    db: AsyncSession,
+):
+    """Keyset page over ix_questions_subject_difficulty_id"""
+    after = decode_cursor(cursor) if cursor else None
+    subject = subject.lower() if subject else None
+    difficulty = difficulty.lower() if difficulty else None
+    try:
+        # Pages only change when the catalog version does
+        await question_catalog.ensure_fresh(db)
+        etag = version_etag(question_catalog.version, "page", subject, difficulty, limit, cursor, include_total)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        query = select(Question.subject, Question.difficulty, Question.id).order_by(
+            Question.subject, Question.difficulty, Question.id
+        )
+        if subject:
+            query = query.where(Question.subject == subject)
+        if difficulty:
+            query = query.where(Question.difficulty == difficulty)
+        if after:
+            query = query.where(
+                tuple_(Question.subject, Question.difficulty, Question.id) > tuple_(*after)
+            )
+
+        # One extra row tells us whether there is a next page
+        keys = (await db.execute(query.limit(limit + 1))).all()
+        has_more = len(keys) > limit
+        keys = keys[:limit]
+
+        entries = await question_catalog.get_many(db, [k.id for k in keys])
+
+        response = {
+            "questions": [e.payload for e in entries],
+            "count": len(entries),
+            "limit": limit,
+            "next_cursor": encode_cursor(*keys[-1]) if has_more else None,
         }
+        if include_total:
+            # Index size from the catalog; no COUNT(*) per page
+            response["total"] = len(question_catalog.ids(subject, difficulty))
+        return FastJSONResponse(response, headers=cache_headers(etag))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================
+# RANDOM / STRATIFIED SAMPLE
+# ============================
+@router.get("/sample")
+async def sample_questions(
+    k: int = Query(10, ge=1, le=50),
+    subject: Optional[str] = Query(None),
+    difficulty: Optional[str] = Query(None),
+    mix: Optional[str] = Query(None),
+    exclude_seen: bool = Query(True),
+    current_user: Optional[Principal] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Returns k random questions, without repeats.
+    - subject / difficulty filter the pool like the listing does
+    - mix splits k across strata by weight, e.g. mix=medium:40,hard:30,easy:30;
+      names are difficulties or subjects, combined with the other filter
+    - signed-in users don't get questions they've already answered
+      (exclude_seen=false turns that off); if a stratum runs out of unseen
+      questions it is topped up from the rest of the pool, then from seen ones
+    """
+    subject = subject.lower() if subject else None
+    difficulty = difficulty.lower() if difficulty else None
+    try:
+        weights = parse_mix(mix) if mix else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    strata = {}
+    if weights:
+        for name in weights:
+            if name in VALID_DIFFICULTIES:
+                strata[name] = (subject, name)
+            elif name in VALID_SUBJECTS:
+                strata[name] = (name, difficulty)
+            else:
+                raise HTTPException(status_code=400, detail=f"Unknown mix name: {name}")
+
+    try:
+        await question_catalog.ensure_fresh(db)
+        seen = None
+        if current_user is not None and exclude_seen:
+            seen = await seen_questions.get(db, current_user.id)
+
+        taken = set()
+        picked = []
+        if weights:
+            for name, count in allocate(k, weights).items():
+                ids = draw(question_catalog.ids(*strata[name]), count, seen, taken)
+                taken.update(ids)
+                picked.extend(ids)
+        # Top up from the whole filtered pool, first unseen, then anything
+        pool = question_catalog.ids(subject, difficulty)
+        for exclude in (seen, None):
+            if len(picked) < k:
+                ids = draw(pool, k - len(picked), exclude, taken)
+                taken.update(ids)
+                picked.extend(ids)
+
+        if weights:
+            random.shuffle(picked)  # interleave the strata
+        entries = await question_catalog.get_many(db, picked)
+        return FastJSONResponse({
+            "questions": [e.payload for e in entries],
+            "count": len(entries),
+            "repeats": sum(1 for e in entries if seen is not None and e.id in seen),
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================
+# NEXT QUESTION (ADAPTIVE)
+# ============================
+@router.get("/next")
+async def next_question(
+    subject: Optional[str] = Query(None),
+    target_p: float = Query(NEXT_QUESTION_TARGET_P, gt=0, lt=1),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Returns an unanswered question rated near the user's level: one they
+    should get right with probability about target_p (default 0.7).
+    """
+    subject = subject.lower() if subject else None
+    try:
+        await rating_engine.ensure_fresh(db, question_catalog)
+        seen = await seen_questions.get(db, current_user.id)
+        user_rating = await rating_engine.user_rating(db, current_user.id)
+        target = target_rating(user_rating, target_p)
+
+        question_id = rating_engine.nearest(target, subject, exclude=seen)
+        if question_id is None:
+            # Everything in range answered already; repeats beat nothing
+            question_id = rating_engine.nearest(target, subject)
+        if question_id is None:
+            raise HTTPException(status_code=404, detail="No questions available")
+
+        entry = await question_catalog.get(db, question_id)
+        question_rating = rating_engine.question_rating(question_id, entry.difficulty)
+        return FastJSONResponse({
+            "question": entry.payload,
+            "user_rating": round(user_rating, 1),
+            "question_rating": round(question_rating, 1),
+            "expected_correct": round(expected_score(user_rating, question_rating), 3),
+            "repeat": question_id in seen,
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================
+# FULL-TEXT SEARCH
+# ============================
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    subject: Optional[str] = Query(None),
+    difficulty: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Questions whose text or explanation contains every word of q, best
+    match first. End q with * to match the last word as a prefix.
+    """
+    try:
+        matches, total = await search_questions(
+            db,
+            q,
+            subject.lower() if subject else None,
+            difficulty.lower() if difficulty else None,
+            limit,
+            offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # Bodies come from the catalog, which must have seen any edit the
+        # index already reflects
+        await question_catalog.ensure_fresh(db)
+        entries = await question_catalog.get_many(db, [question_id for question_id, _ in matches])
+        return FastJSONResponse({
+            "questions": [e.payload for e in entries],
+            "count": len(entries),
+            "total": total,
+            "offset": offset,
+            "limit": limit
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,26 +349,28 @@ async def get_questions(
 @router.get("/{question_id}")
 async def get_question(
     question_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Returns a single question WITHOUT the correct answer.
+    The ETag is a hash of the question itself, so it survives unrelated edits.
     """
     try:
-        q = db.query(Question).filter(Question.id == question_id).first()
+        await question_catalog.ensure_fresh(db)
+        # Known ETags are answered without loading the body
+        cached = not_modified(request, question_catalog.etag(question_id))
+        if cached is not None:
+            return cached
 
-        if not q:
-            raise HTTPException(status_code=404, detail="Question not found")
+        entry = await question_catalog.get(db, question_id)
 
-        choices = json.loads(q.choices) if isinstance(q.choices, str) else q.choices
+        if not entry:
+            raise HTTPException(status_code=404, detail="Question not found")
 
-        return {
-            "id": q.id,
-            "subject": q.subject,
-            "difficulty": q.difficulty,
-            "question_text": q.question_text,
-            "choices": choices
-        }
+        return not_modified(request, entry.etag) or FastJSONResponse(
+            entry.payload, headers=cache_headers(entry.etag)
+        )
 
     except HTTPException:
         raise
@@ -131,14 +383,14 @@ async def get_question(
 @router.post("/check", response_model=CheckAnswerResponse)
 async def check_answer(
     body: CheckAnswerRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Checks an answer and returns correctness + explanation.
     """
     try:
-        q = db.query(Question).filter(Question.id == body.question_id).first()
+        q = await db.get(Question, body.question_id)
 
         if not q:
             raise HTTPException(status_code=404, detail="Question not found")
@@ -149,6 +401,25 @@ async def check_answer(
             q.correct_answer.strip().upper()
         )
 
+        # O(1) rating moves, applied now and persisted with the answer
+        user_delta, question_delta = await rating_engine.record(
+            db, current_user.id, q.id, q.difficulty, is_correct
+        )
+
+        # Buffered; flushed to user_answers in batches
+        answer_log.record(
+            user_id=current_user.id,
+            question_id=q.id,
+            user_answer=body.user_answer,
+            is_correct=is_correct,
+            subject=q.subject,
+            difficulty=q.difficulty,
+            time_spent_seconds=body.time_spent_seconds,
+            user_rating_delta=user_delta,
+            question_rating_delta=question_delta,
+        )
+        seen_questions.mark(current_user.id, q.id)
+
         return {
             "is_correct": is_correct,
             "correct_answer": q.correct_answer,
@@ -160,24 +431,96 @@ async def check_answer(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/check/batch")
+async def check_answers(
+    body: BatchCheckRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Checks up to 100 answers at once (e.g. a timed section), in order.
+    Each result has ok=false and an error for a question that doesn't
+    exist; the other answers are still checked and recorded.
+    """
+    try:
+        # One IN query for every referenced question
+        ids = {item.question_id for item in body.answers}
+        questions = {
+            q.id: q for q in (await db.execute(
+                select(
+                    Question.id,
+                    Question.subject,
+                    Question.difficulty,
+                    Question.correct_answer,
+                    Question.explanation,
+                ).where(Question.id.in_(ids))
+            )).all()
+        }
+
+        # Stored ratings for every question in one query, not one per record()
+        await rating_engine.load_questions(db, {q.id: q.difficulty for q in questions.values()})
+
+        results = []
+        correct = 0
+        for item in body.answers:
+            q = questions.get(item.question_id)
+            if q is None:
+                results.append({"question_id": item.question_id, "ok": False, "error": "Question not found"})
+                continue
+
+            is_correct = item.user_answer.strip().upper() == q.correct_answer.strip().upper()
+            correct += is_correct
+            user_delta, question_delta = await rating_engine.record(
+                db, current_user.id, q.id, q.difficulty, is_correct
+            )
+            answer_log.record(
+                user_id=current_user.id,
+                question_id=q.id,
+                user_answer=item.user_answer,
+                is_correct=is_correct,
+                subject=q.subject,
+                difficulty=q.difficulty,
+                time_spent_seconds=item.time_spent_seconds,
+                user_rating_delta=user_delta,
+                question_rating_delta=question_delta,
+            )
+            seen_questions.mark(current_user.id, q.id)
+            results.append({
+                "question_id": q.id,
+                "ok": True,
+                "is_correct": is_correct,
+                "correct_answer": q.correct_answer,
+                "explanation": q.explanation,
+            })
+
+        errors = sum(1 for r in results if not r["ok"])
+        return FastJSONResponse({
+            "results": results,
+            "checked": len(results) - errors,
+            "correct": correct,
+            "errors": errors,
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================
 # SUBJECT COUNTS
 # ============================
 @router.get("/subjects/counts")
-async def get_subject_counts(db: Session = Depends(get_db)):
+async def get_subject_counts(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Returns number of questions available per subject.
     """
     try:
-        subjects = ["math", "english", "reading", "science"]
-        counts = {}
-
-        for subj in subjects:
-            count = db.query(Question).filter(Question.subject == subj).count()
-            counts[subj] = count
+        # The counters move in the same transactions that bump the version
+        await question_catalog.ensure_fresh(db)
+        etag = version_etag(question_catalog.version, "counts")
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        counts["total"] = sum(counts.values())
-        return counts
+        return FastJSONResponse(await read_counts(db), headers=cache_headers(etag))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,40 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
-from typing import List, Dict
-from datetime import datetime
-# from app.database import get_supabase_client  # TODO: Migrate to SQLAlchemy
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from datetime import datetime, timezone
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.answer_log import write_answers
+from app.auth.principals import Principal
+from app.database import get_async_db
+from app.models.practice_session import PracticeSession
+from app.models.question import Question
+from app.ratings import rating_engine
 from app.routes.auth import get_current_user
+from app.sampling import seen_questions
+from app.session_scores import (
+    close_statement,
+    composite_score,
+    elapsed_seconds,
+    section_scores,
+    tally_statement,
+)
 
 router = APIRouter()
 
+class StartSessionRequest(BaseModel):
+    session_type: str = "practice"
+
+class SubmitAnswerRequest(BaseModel):
+    session_id: int
+    question_id: int
+    user_answer: str
+    time_spent_seconds: int = 0
+
+class FinishSessionRequest(BaseModel):
+    session_id: int
+
 # ---------------------------
 # Start a new session
 # ---------------------------
 @router.post("/start")
-async def start_session(session_type: str = "practice", user: dict = Depends(get_current_user)):
+async def start_session(
+    body: StartSessionRequest = StartSessionRequest(),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Start a new practice session
     """
     try:
-        supabase = get_supabase_client()
-        start_time = datetime.utcnow().isoformat()
-        response = supabase.table("practice_sessions").insert({
-            "user_id": user["id"],
-            "session_type": session_type,
-            "started_at": start_time,
-            "completed_at": None,
-            "total_questions": 0,
-            "correct_answers": 0,
-            "score": None,
-            "duration_seconds": None
-        }).execute()
-
-        if not response.data:
-            raise HTTPException(status_code=500, detail="Failed to start session")
-
-        session_id = response.data[0]["id"]
-        return {"session_id": session_id, "started_at": start_time}
+        start_time = datetime.now(timezone.utc)
+        session_id = await db.scalar(
+            insert(PracticeSession)
+            .values(user_id=user.id, session_type=body.session_type, started_at=start_time)
+            .returning(PracticeSession.id)
+        )
+        await db.commit()
+        return {"session_id": session_id, "started_at": start_time.isoformat()}
 
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -43,48 +65,60 @@ async def start_session(session_type: str = "practice", user: dict = Depends(get
 # ---------------------------
 @router.post("/submit")
 async def submit_answer(
-    session_id: int,
-    question_id: int,
-    user_answer: str,
-    time_spent_seconds: int = 0,
-    user: dict = Depends(get_current_user)
+    body: SubmitAnswerRequest,
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Log a user's answer in a session
     """
     try:
-        supabase = get_supabase_client()
-
-        # Fetch question
-        q_resp = supabase.table("questions").select("*").eq("id", question_id).execute()
-        if not q_resp.data:
+        question = await db.get(Question, body.question_id)
+        if not question:
             raise HTTPException(status_code=404, detail="Question not found")
-        question = q_resp.data[0]
-
-        is_correct = user_answer.strip().lower() == question["correct_answer"].strip().lower()
 
-        # Insert into user_answers with session_id
-        supabase.table("user_answers").insert({
-            "user_id": user["id"],
-            "session_id": session_id,
-            "question_id": question_id,
-            "user_answer": user_answer,
+        is_correct = body.user_answer.strip().lower() == question.correct_answer.strip().lower()
+
+        # Session tallies, the answer row, rollups and ratings commit together
+        updated = await db.scalar(
+            tally_statement(body.session_id, user.id, question.subject, is_correct)
+        )
+        if updated is None:
+            raise HTTPException(status_code=404, detail="Session not found or already finished")
+
+        user_delta, question_delta = await rating_engine.record(
+            db, user.id, question.id, question.difficulty, is_correct
+        )
+        await write_answers(db, [{
+            "user_id": user.id,
+            "session_id": body.session_id,
+            "question_id": question.id,
+            "user_answer": body.user_answer,
             "is_correct": is_correct,
-            "subject": question["subject"],
-            "time_spent_seconds": time_spent_seconds,
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
+            "subject": question.subject,
+            "difficulty": question.difficulty,
+            "time_spent_seconds": body.time_spent_seconds,
+            "created_at": datetime.now(timezone.utc),
+            "user_rating_delta": user_delta,
+            "question_rating_delta": question_delta,
+        }])
+        await db.commit()
+        seen_questions.mark(user.id, question.id)
 
         return {
-            "question_id": question_id,
-            "user_answer": user_answer,
+            "question_id": question.id,
+            "user_answer": body.user_answer,
             "is_correct": is_correct,
-            "correct_answer": question["correct_answer"],
-            "explanation": question["explanation"],
-            "subject": question["subject"]
+            "correct_answer": question.correct_answer,
+            "explanation": question.explanation,
+            "subject": question.subject
         }
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -93,67 +127,58 @@ async def submit_answer(
 # ---------------------------
 @router.post("/finish")
 async def finish_session(
-    session_id: int,
-    user: dict = Depends(get_current_user)
+    body: FinishSessionRequest,
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Finish a session, calculate per-subject and composite scores
+    from its running tallies
     """
     try:
-        supabase = get_supabase_client()
-
-        # Fetch all answers for this session
-        answers_resp = supabase.table("user_answers").select("*").eq("session_id", session_id).eq("user_id", user["id"]).execute()
-        answers = answers_resp.data
-        if not answers:
-            raise HTTPException(status_code=404, detail="No answers found for this session")
-
-        # Fetch question details
-        question_ids = [a["question_id"] for a in answers]
-        questions_resp = supabase.table("questions").select("*").in_("id", question_ids).execute()
-        questions = {q["id"]: q for q in questions_resp.data}
-
-        # Count correct answers per subject
-        subject_counts = {}
-        subject_correct = {}
-        for a in answers:
-            q = questions.get(a["question_id"])
-            if not q:
-                continue
-            subj = q["subject"]
-            subject_counts[subj] = subject_counts.get(subj, 0) + 1
-            if a["is_correct"]:
-                subject_correct[subj] = subject_correct.get(subj, 0) + 1
-
-        # Calculate per-subject scores
-        section_scores = {subj: round((subject_correct.get(subj, 0) / total) * 36) for subj, total in subject_counts.items()}
-
-        # Composite score = average of section scores
-        composite_score = round(sum(section_scores.values()) / len(section_scores)) if section_scores else 0
-
-        # Update session record
-        completed_at = datetime.utcnow().isoformat()
-        start_time = answers[0]["created_at"]
-        duration_seconds = int((datetime.fromisoformat(completed_at) - datetime.fromisoformat(start_time)).total_seconds())
-
-        supabase.table("practice_sessions").update({
-            "completed_at": completed_at,
-            "total_questions": len(answers),
-            "correct_answers": sum(a["is_correct"] for a in answers),
-            "score": composite_score,
-            "duration_seconds": duration_seconds,
-            "section_scores": section_scores
-        }).eq("id", session_id).execute()
+        completed_at = datetime.now(timezone.utc)
+        tallies = (await db.execute(close_statement(body.session_id, user.id, completed_at))).mappings().first()
+        if tallies is None:
+            raise HTTPException(status_code=404, detail=await _finish_error(db, body.session_id, user.id))
+
+        scores = section_scores(tallies)
+        composite = composite_score(scores)
+        duration_seconds = elapsed_seconds(tallies["started_at"], completed_at)
+
+        await db.execute(
+            update(PracticeSession)
+            .where(PracticeSession.id == body.session_id)
+            .values(score=composite, section_scores=scores, duration_seconds=duration_seconds)
+        )
+        await db.commit()
 
         return {
-            "session_id": session_id,
-            "total_questions": len(answers),
-            "total_correct": sum(a["is_correct"] for a in answers),
-            "section_scores": section_scores,
-            "composite_score": composite_score,
-            "completed_at": completed_at,
+            "session_id": body.session_id,
+            "total_questions": tallies["total_questions"],
+            "total_correct": tallies["correct_answers"],
+            "section_scores": scores,
+            "composite_score": composite,
+            "completed_at": completed_at.isoformat(),
             "duration_seconds": duration_seconds
         }
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _finish_error(db: AsyncSession, session_id: int, user_id: int) -> str:
+    """Why a session couldn't be closed (only read on the error path)"""
+    session = (await db.execute(
+        select(PracticeSession.completed_at, PracticeSession.total_questions).where(
+            PracticeSession.id == session_id, PracticeSession.user_id == user_id
+        )
+    )).first()
+    if session is None:
+        return "Session not found"
+    if session.completed_at is not None:
+        return "Session already finished"
+    return "No answers found for this session"
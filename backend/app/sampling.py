@@ -0,0 +1,211 @@
+"""
+Random and stratified question sampling
+Draws come from the catalog's in-memory id arrays per (subject, difficulty):
+picking k questions without replacement costs O(k) random index draws, not
+a table scan (ORDER BY RANDOM()) or a shuffle of the whole bank.
+
+Questions a user has already answered are skipped using a per-user bitset
+(one bit per question id). Bitsets are loaded from user_answers on first
+use, updated as this worker checks answers, and re-read from the database
+every SEEN_CACHE_TTL_SECONDS so answers taken by other workers show up.
+"""
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from decouple import config
+from sqlalchemy import select
+
+from app.models.answer_tracking import AnswerTracking
+
+SEEN_CACHE_MAX_USERS = config("SEEN_CACHE_MAX_USERS", default=5000, cast=int)
+SEEN_CACHE_TTL_SECONDS = config("SEEN_CACHE_TTL_SECONDS", default=300.0, cast=float)
+
+# Random probes per wanted question before falling back to a filtered scan,
+# which only happens once most of a stratum has been seen
+PROBES_PER_PICK = 4
+
+
+class SeenSet:
+    """Set of question ids as a bitset: 1 bit per id up to the largest id added"""
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._bits = bytearray()
+        self._count = 0
+        self.update(ids)
+
+    def add(self, question_id: int):
+        byte, bit = divmod(question_id, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1))
+        mask = 1 << bit
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+
+    def update(self, ids: Iterable[int]):
+        for question_id in ids:
+            self.add(question_id)
+
+    def union(self, other: "SeenSet"):
+        for question_id in other:
+            self.add(question_id)
+
+    def __contains__(self, question_id: int) -> bool:
+        byte, bit = divmod(question_id, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+    def __iter__(self):
+        for byte, value in enumerate(self._bits):
+            if value:
+                for bit in range(8):
+                    if value & (1 << bit):
+                        yield byte * 8 + bit
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class SeenTracker:
+    """Per-user SeenSets for this worker, LRU-bounded and periodically refreshed"""
+
+    def __init__(self, max_users: int = SEEN_CACHE_MAX_USERS, ttl: float = SEEN_CACHE_TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users: "OrderedDict[int, Tuple[SeenSet, float]]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def get(self, db, user_id: int) -> SeenSet:
+        entry = self._users.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self._users.move_to_end(user_id)
+            return entry[0]
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            entry = self._users.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                return entry[0]
+            rows = await db.scalars(
+                select(AnswerTracking.question_id).where(AnswerTracking.user_id == user_id).distinct()
+            )
+            seen = SeenSet(rows)
+            if entry is not None:
+                # Keep answers this worker recorded that are still in the write-behind buffer
+                seen.union(entry[0])
+            self._store(user_id, seen)
+        self._locks.pop(user_id, None)
+        return seen
+
+    def mark(self, user_id: int, question_id: int):
+        """Record an answer this worker just took"""
+        entry = self._users.get(user_id)
+        if entry is not None:
+            entry[0].add(question_id)
+        else:
+            # Stale from the start: the next get() reads the DB and keeps this
+            # answer, which may still be in the write-behind buffer
+            self._store(user_id, SeenSet([question_id]), loaded_at=float("-inf"))
+
+    def _store(self, user_id: int, seen: SeenSet, loaded_at: Optional[float] = None):
+        self._users[user_id] = (seen, time.monotonic() if loaded_at is None else loaded_at)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "bytes": sum(seen.nbytes for seen, _ in self._users.values()),
+        }
+
+
+def draw(
+    ids: Sequence[int],
+    k: int,
+    exclude: Optional[SeenSet] = None,
+    taken: Optional[set] = None,
+    rng: random.Random = random,
+) -> List[int]:
+    """
+    Up to k distinct ids from `ids` (sorted catalog array) that are in neither
+    `exclude` nor `taken`. O(k) expected while most candidates are eligible.
+    """
+    n = len(ids)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if not exclude and not taken:
+        return rng.sample(ids, k)
+
+    picked: List[int] = []
+    probed = set()
+    for _ in range(PROBES_PER_PICK * k + 16):
+        if len(picked) == k or len(probed) == n:
+            return picked
+        i = rng.randrange(n)
+        if i in probed:
+            continue
+        probed.add(i)
+        question_id = ids[i]
+        if (exclude is None or question_id not in exclude) and (taken is None or question_id not in taken):
+            picked.append(question_id)
+
+    if len(picked) < k:
+        # Mostly excluded: one pass over what's left
+        rest = [
+            q for j, q in enumerate(ids)
+            if j not in probed
+            and (exclude is None or q not in exclude)
+            and (taken is None or q not in taken)
+        ]
+        picked.extend(rng.sample(rest, min(k - len(picked), len(rest))))
+    return picked
+
+
+def allocate(k: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Split k across weighted strata by largest remainder (sums to exactly k)"""
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    exact = {key: k * w / total for key, w in weights.items()}
+    counts = {key: int(v) for key, v in exact.items()}
+    short = k - sum(counts.values())
+    for key in sorted(exact, key=lambda key: exact[key] - counts[key], reverse=True)[:short]:
+        counts[key] += 1
+    return counts
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'medium:40,hard:30,easy:30' (percentages or fractions) -> {key: weight}"""
+    weights = {}
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        key, sep, weight = part.partition(":")
+        if not sep:
+            raise ValueError(f"Mix entry '{part}' must look like name:weight")
+        try:
+            value = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight in mix entry '{part}'")
+        if value < 0:
+            raise ValueError(f"Negative weight in mix entry '{part}'")
+        weights[key.strip().lower()] = weights.get(key.strip().lower(), 0.0) + value
+    if not weights:
+        raise ValueError("Mix is empty")
+    if sum(weights.values()) <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    return weights
+
+
+seen_questions = SeenTracker()
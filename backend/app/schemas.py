@@ -1,4 +1,6 @@
 # app/schemas.py
+from typing import List, Optional
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -14,3 +16,12 @@ class UserResponse(BaseModel):
     access_token: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class QuestionCreate(BaseModel):
+    subject: str  # 'math', 'english', 'reading', 'science'
+    question_text: str
+    choices: List[str]  # Array of answer choices (typically 4-5)
+    correct_answer: str
+    explanation: Optional[str] = None
+    difficulty: Optional[str] = None  # 'easy', 'medium', 'hard'
@@ -0,0 +1,165 @@
+"""
+Full-text search over question_text and explanation
+On SQLite the index is an FTS5 table, `question_search`, using `questions`
+as external content (the text is stored once, in questions). FTS5 doesn't
+see writes to questions by itself: every insert path adds its new ids with
+search_index_statement() in the same transaction, the same way it updates
+the question counters. Edits and deletes must first take the old text out
+with search_unindex_statement() (FTS5 only removes the terms it is given),
+and edits then re-add the row. scripts/rebuild_search_index.py rebuilds the
+whole index if it ever drifts (e.g. rows inserted by hand).
+
+On PostgreSQL a GIN expression index over to_tsvector() is maintained by the
+database itself, so there is nothing to sync.
+
+Results are ranked by BM25 (question_text weighted above explanation) on
+SQLite and ts_rank_cd on PostgreSQL, ties broken by id.
+"""
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+
+SEARCH_TABLE = "question_search"
+PG_SEARCH_INDEX = "ix_questions_search"
+
+# BM25 column weights: (question_text, explanation)
+BM25_WEIGHTS = (2.0, 1.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def is_search_object(name: str) -> bool:
+    """FTS5 table/shadow tables and the PG index, which the models don't declare"""
+    return name == PG_SEARCH_INDEX or name == SEARCH_TABLE or name.startswith(SEARCH_TABLE + "_")
+
+
+def match_expression(query: str) -> str:
+    """
+    FTS5 MATCH string for free text: every word must appear (AND); a trailing
+    `*` makes the last word a prefix. User input never reaches FTS5's query
+    syntax unquoted, so stray quotes/operators can't cause syntax errors.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        raise ValueError("Search query must contain at least one word")
+    terms = [f'"{t}"' for t in tokens]
+    if query.rstrip().endswith("*"):
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+# ----------------------------
+# Index maintenance (SQLite)
+# ----------------------------
+def search_index_statement(db, question_ids: Sequence[int]):
+    """Statement adding `question_ids` to the index, or None if there's nothing to do"""
+    if db.bind.dialect.name != "sqlite" or not question_ids:
+        return None
+    return text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, question_text, explanation) "
+        "SELECT id, question_text, explanation FROM questions WHERE id IN :ids"
+    ).bindparams(bindparam("ids", value=list(question_ids), expanding=True))
+
+
+async def apply_search_index(db, question_ids: Sequence[int]):
+    """Index `question_ids` inside the caller's (async) transaction"""
+    stmt = search_index_statement(db, question_ids)
+    if stmt is not None:
+        await db.execute(stmt)
+
+
+def search_unindex_statement(db, question_ids: Sequence[int]):
+    """
+    Statement removing `question_ids` from the index, or None if there's
+    nothing to do. Run it before the rows' text changes or they are deleted:
+    it reads the text still in questions to find the terms to remove.
+    """
+    if db.bind.dialect.name != "sqlite" or not question_ids:
+        return None
+    return text(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, question_text, explanation) "
+        "SELECT 'delete', id, question_text, explanation FROM questions WHERE id IN :ids"
+    ).bindparams(bindparam("ids", value=list(question_ids), expanding=True))
+
+
+async def remove_from_search_index(db, question_ids: Sequence[int]):
+    """Unindex `question_ids` inside the caller's (async) transaction"""
+    stmt = search_unindex_statement(db, question_ids)
+    if stmt is not None:
+        await db.execute(stmt)
+
+
+async def rebuild_search_index(db):
+    """Re-read every question into the index and merge its segments"""
+    if db.bind.dialect.name != "sqlite":
+        return
+    await db.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')"))
+    await db.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+    await db.commit()
+
+
+# ----------------------------
+# Queries
+# ----------------------------
+def _filters(subject: Optional[str], difficulty: Optional[str], prefix: str = "") -> Tuple[str, dict]:
+    sql = ""
+    params = {}
+    if subject:
+        sql += f" AND {prefix}q.subject = :subject"
+        params["subject"] = subject
+    if difficulty:
+        sql += f" AND {prefix}q.difficulty = :difficulty"
+        params["difficulty"] = difficulty
+    return sql, params
+
+
+async def search_questions(
+    db,
+    query: str,
+    subject: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    limit: int = 10,
+    offset: int = 0,
+) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    One page of (question_id, rank) best match first, plus the total number
+    of matches. Lower rank is better on SQLite (BM25), higher on PostgreSQL.
+    Raises ValueError for a query with no searchable words.
+
+    Cost grows with the number of matches (every match is scored), so words
+    found in most of the bank are the slow case.
+    """
+    if db.bind.dialect.name == "postgresql":
+        where, params = _filters(subject, difficulty)
+        if not _TOKEN.search(query):
+            raise ValueError("Search query must contain at least one word")
+        params["query"] = query
+        source = (
+            "FROM questions q, websearch_to_tsquery('english', :query) tsq "
+            "WHERE to_tsvector('english', q.question_text || ' ' || q.explanation) @@ tsq"
+        )
+        rank = "ts_rank_cd(to_tsvector('english', q.question_text || ' ' || q.explanation), tsq)"
+        key = "q.id"
+        order = "rank DESC, q.id"
+    else:
+        # Unary + keeps SQLite from driving the join off the subject/difficulty
+        # indexes and probing the FTS table once per row; matches come first
+        where, params = _filters(subject, difficulty, prefix="+")
+        params["match"] = match_expression(query)
+        # Without filters the questions table isn't needed at all
+        join = " JOIN questions q ON q.id = s.rowid" if where else ""
+        source = f"FROM {SEARCH_TABLE} s{join} WHERE {SEARCH_TABLE} MATCH :match"
+        rank = f"bm25({SEARCH_TABLE}, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]})"
+        key = "s.rowid"
+        order = "rank, s.rowid"
+
+    rows = (await db.execute(
+        text(f"SELECT {key}, {rank} AS rank {source}{where} ORDER BY {order} LIMIT :limit OFFSET :offset"),
+        {**params, "limit": limit, "offset": offset},
+    )).all()
+    if offset == 0 and len(rows) < limit:
+        total = len(rows)
+    else:
+        total = await db.scalar(text(f"SELECT COUNT(*) {source}{where}"), params)
+    return [(question_id, float(rank)) for question_id, rank in rows], total
@@ -0,0 +1,93 @@
+"""
+Running practice-session tallies
+Every answer submitted in a session increments the session's overall and
+per-subject counters with one UPDATE, in the same transaction as the
+user_answers insert. Finishing a session closes and reads that one row, so
+scoring costs the same whatever the session's length.
+"""
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import update
+
+from app.models.practice_session import PracticeSession
+
+SUBJECTS = ["math", "english", "reading", "science"]
+# ACT section/composite scale
+MAX_SCORE = 36
+
+
+def tally_statement(session_id: int, user_id: int, subject: str, is_correct: bool):
+    """
+    UPDATE adding one answer to the user's open session, returning its id;
+    no row comes back if the session doesn't exist, isn't theirs or is finished
+    """
+    correct = 1 if is_correct else 0
+    values = {
+        "total_questions": PracticeSession.total_questions + 1,
+        "correct_answers": PracticeSession.correct_answers + correct,
+    }
+    if subject in SUBJECTS:
+        values[f"{subject}_total"] = getattr(PracticeSession, f"{subject}_total") + 1
+        values[f"{subject}_correct"] = getattr(PracticeSession, f"{subject}_correct") + correct
+    return (
+        update(PracticeSession)
+        .where(
+            PracticeSession.id == session_id,
+            PracticeSession.user_id == user_id,
+            PracticeSession.completed_at.is_(None),
+        )
+        .values(**values)
+        .returning(PracticeSession.id)
+    )
+
+
+def close_statement(session_id: int, user_id: int, completed_at: datetime):
+    """
+    UPDATE marking an open session with at least one answer as completed,
+    returning its start time and tallies. Closing first means no answer can
+    land between reading the tallies and saving the score.
+    """
+    tallies = [
+        getattr(PracticeSession, f"{subject}_{kind}")
+        for subject in SUBJECTS
+        for kind in ("total", "correct")
+    ]
+    return (
+        update(PracticeSession)
+        .where(
+            PracticeSession.id == session_id,
+            PracticeSession.user_id == user_id,
+            PracticeSession.completed_at.is_(None),
+            PracticeSession.total_questions > 0,
+        )
+        .values(completed_at=completed_at)
+        .returning(
+            PracticeSession.started_at,
+            PracticeSession.total_questions,
+            PracticeSession.correct_answers,
+            *tallies,
+        )
+    )
+
+
+def section_scores(tallies) -> Dict[str, int]:
+    """{subject: 0-36 score} for subjects answered in the session"""
+    scores = {}
+    for subject in SUBJECTS:
+        total = tallies[f"{subject}_total"]
+        if total:
+            scores[subject] = round(tallies[f"{subject}_correct"] / total * MAX_SCORE)
+    return scores
+
+
+def composite_score(scores: Dict[str, int]) -> int:
+    """Average of the section scores"""
+    return round(sum(scores.values()) / len(scores)) if scores else 0
+
+
+def elapsed_seconds(started_at: datetime, completed_at: datetime) -> int:
+    # SQLite hands timestamps back naive; they're stored in UTC
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    return int((completed_at - started_at).total_seconds())
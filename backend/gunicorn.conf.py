@@ -0,0 +1,27 @@
+"""
+gunicorn settings (Procfile: gunicorn -c gunicorn.conf.py ...)
+Sets up prometheus_client's multiprocess directory so GET /metrics can
+aggregate all workers: it must be in the environment before the workers
+import the app, be emptied on each start, and have dead workers' live
+gauges dropped.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "act-study-prometheus")
+)
+
+
+def on_starting(server):
+    # Values left by a previous run would be added to this one's
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
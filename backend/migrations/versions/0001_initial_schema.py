@@ -0,0 +1,127 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 01:59:24.991981
+
+Databases created by the old create_all-at-startup path already have some
+or all of these tables (and may be missing indexes added later), so only
+what doesn't exist yet is created; on those databases this revision adopts
+the existing schema instead of failing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(name, *columns):
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_indexes(table, indexes):
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+    for name, columns, unique in indexes:
+        if name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade():
+    _create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('target_score', sa.Integer(), nullable=True),
+        sa.Column('current_level', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_indexes('users', [
+        ('ix_users_email', ['email'], True),
+        ('ix_users_id', ['id'], False),
+        ('ix_users_username', ['username'], True),
+    ])
+
+    _create_table('questions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('difficulty', sa.String(), nullable=False),
+        sa.Column('question_text', sa.Text(), nullable=False),
+        sa.Column('choices', sa.String(), nullable=False),
+        sa.Column('correct_answer', sa.String(), nullable=False),
+        sa.Column('explanation', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_indexes('questions', [
+        ('ix_questions_difficulty', ['difficulty'], False),
+        ('ix_questions_id', ['id'], False),
+        ('ix_questions_subject', ['subject'], False),
+        ('ix_questions_subject_difficulty_id', ['subject', 'difficulty', 'id'], False),
+    ])
+
+    _create_table('user_answers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('user_answer', sa.Text(), nullable=False),
+        sa.Column('is_correct', sa.Boolean(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('difficulty', sa.String(), nullable=True),
+        sa.Column('time_spent_seconds', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_indexes('user_answers', [
+        ('ix_user_answers_created_at', ['created_at'], False),
+        ('ix_user_answers_id', ['id'], False),
+        ('ix_user_answers_question_id', ['question_id'], False),
+        ('ix_user_answers_subject', ['subject'], False),
+        ('ix_user_answers_user_id', ['user_id'], False),
+        ('ix_user_answers_user_id_created_at', ['user_id', 'created_at'], False),
+    ])
+
+    _create_table('catalog_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_table('question_counts',
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('difficulty', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('subject', 'difficulty'),
+    )
+    _create_table('user_performance',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('difficulty', sa.String(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('time_spent_seconds', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'subject', 'difficulty'),
+    )
+    _create_table('ai_feedback_cache',
+        sa.Column('fingerprint', sa.String(), nullable=False),
+        sa.Column('feedback', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('fingerprint'),
+    )
+
+
+def downgrade():
+    op.drop_table('ai_feedback_cache')
+    op.drop_table('user_performance')
+    op.drop_table('question_counts')
+    op.drop_table('catalog_state')
+    op.drop_table('user_answers')
+    op.drop_table('questions')
+    op.drop_table('users')
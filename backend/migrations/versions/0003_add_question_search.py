@@ -0,0 +1,39 @@
+"""add question search index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 02:41:12.503118
+
+SQLite: FTS5 table over questions (external content), filled from the
+existing rows. PostgreSQL: GIN index on the same to_tsvector() expression
+that app.search queries with.
+"""
+from alembic import op
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_questions_search ON questions "
+            "USING gin (to_tsvector('english', question_text || ' ' || explanation))"
+        )
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE question_search USING fts5("
+        "question_text, explanation, content='questions', content_rowid='id', "
+        "tokenize='porter unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO question_search (question_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX ix_questions_search")
+        return
+    op.execute("DROP TABLE question_search")
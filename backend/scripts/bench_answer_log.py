@@ -0,0 +1,88 @@
+"""
+Benchmark: answer submissions/sec with and without the write-behind buffer
+"Unbuffered" commits one user_answers row per submission, which is what a
+naive per-request insert would do; "buffered" goes through AnswerLogBuffer
+and includes the final flush in the timing.
+
+Usage:
+    python scripts/bench_answer_log.py --submits 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.answer_log import AnswerLogBuffer
+from app.database import Base, create_engines
+from app.models.answer_tracking import AnswerTracking
+
+SUBJECTS = ["math", "english", "reading", "science"]
+
+
+def answer(i: int) -> dict:
+    return {
+        "user_id": i % 100,
+        "question_id": i % 500,
+        "user_answer": "A",
+        "is_correct": i % 3 == 0,
+        "subject": SUBJECTS[i % len(SUBJECTS)],
+        "difficulty": "medium",
+        "time_spent_seconds": 30,
+    }
+
+
+async def run(submits: int, concurrency: int, buffered: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        sync_engine, async_engine = create_engines(url)
+        Base.metadata.create_all(bind=sync_engine)
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        buffer = AnswerLogBuffer(session_factory=session_factory)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def submit(i: int):
+            async with semaphore:
+                if buffered:
+                    buffer.record(**answer(i))
+                    await asyncio.sleep(0)
+                else:
+                    async with session_factory() as db:
+                        await db.execute(insert(AnswerTracking), [answer(i)])
+                        await db.commit()
+
+        started = time.perf_counter()
+        buffer.start()
+        await asyncio.gather(*(submit(i) for i in range(submits)))
+        await buffer.stop()
+        elapsed = time.perf_counter() - started
+
+        async with session_factory() as db:
+            stored = await db.scalar(select(func.count()).select_from(AnswerTracking))
+        assert stored == submits, f"expected {submits} rows, found {stored}"
+
+        await async_engine.dispose()
+        sync_engine.dispose()
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submits", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    for name, buffered in (("unbuffered", False), ("buffered", True)):
+        elapsed = asyncio.run(run(args.submits, args.concurrency, buffered))
+        print(f"  {name:<11} {args.submits / elapsed:>10.0f} submits/s")
+
+
+if __name__ == "__main__":
+    main()
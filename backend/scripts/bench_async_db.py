@@ -0,0 +1,183 @@
+"""
+Benchmark: question listing throughput under concurrent load,
+sync Session inside `async def` (the old handlers) vs the AsyncSession layer.
+
+Usage:
+    python scripts/bench_async_db.py --questions 20000 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, create_engines
+from app.models.question import Question
+
+SUBJECTS = ["math", "english", "reading", "science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def seed(url: str, count: int):
+    """Create the schema and insert `count` synthetic questions"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    rows = [
+        {
+            "subject": SUBJECTS[i % len(SUBJECTS)],
+            "difficulty": DIFFICULTIES[i % len(DIFFICULTIES)],
+            "question_text": f"Synthetic question {i}: " + "lorem ipsum " * 40,
+            "choices": json.dumps(["A", "B", "C", "D"]),
+            "correct_answer": "A",
+            "explanation": "Synthetic explanation " * 10,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Question.__table__.insert(), rows)
+    engine.dispose()
+
+
+def build_legacy_app(url: str) -> FastAPI:
+    """The pre-async handler: an `async def` route calling a sync Session"""
+    # NullPool: with a bounded pool, checkouts block the loop while the sessions
+    # that would return connections wait on the threadpool, and the run stalls
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=NullPool)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/api/questions/")
+    async def get_questions(
+        subject: str = Query(None),
+        limit: int = Query(10),
+        offset: int = Query(0),
+        db: Session = Depends(get_db),
+    ):
+        query = db.query(Question)
+        if subject:
+            query = query.filter(Question.subject == subject)
+        total = query.count()
+        rows = query.offset(offset).limit(limit).all()
+        return {
+            "questions": [
+                {"id": q.id, "subject": q.subject, "choices": json.loads(q.choices)}
+                for q in rows
+            ],
+            "total": total,
+        }
+
+    return app
+
+
+def build_async_app(url: str) -> FastAPI:
+    """
+    The same handler on an AsyncSession. The real questions router serves
+    listings from the in-memory catalog, which would measure the cache rather
+    than the database layer, so this queries through the session directly.
+    """
+    _, async_engine = create_engines(url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/api/questions/")
+    async def get_questions(
+        subject: str = Query(None),
+        limit: int = Query(10),
+        offset: int = Query(0),
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        query = select(Question)
+        if subject:
+            query = query.where(Question.subject == subject)
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        rows = (await db.scalars(query.offset(offset).limit(limit))).all()
+        return {
+            "questions": [
+                {"id": q.id, "subject": q.subject, "choices": json.loads(q.choices)}
+                for q in rows
+            ],
+            "total": total,
+        }
+
+    app.state.async_engine = async_engine
+    return app
+
+
+async def drive(app: FastAPI, total_requests: int, concurrency: int, total_rows: int) -> dict:
+    """Fire `total_requests` listing calls with `concurrency` in flight"""
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                offset = (i * 97) % max(total_rows // len(SUBJECTS) - 50, 1)
+                started = time.perf_counter()
+                resp = await client.get(
+                    "/api/questions/",
+                    params={"subject": SUBJECTS[i % len(SUBJECTS)], "limit": 50, "offset": offset},
+                )
+                latencies.append(time.perf_counter() - started)
+                resp.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+    if hasattr(app.state, "async_engine"):
+        await app.state.async_engine.dispose()
+
+    latencies.sort()
+    return {
+        "requests_per_sec": round(total_requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.questions)
+
+        print(f"{args.questions} questions, {args.requests} requests, concurrency {args.concurrency}")
+        for name, app in (("sync-in-async (before)", build_legacy_app(url)),
+                          ("AsyncSession (after)", build_async_app(url))):
+            result = asyncio.run(drive(app, args.requests, args.concurrency, args.questions))
+            print(f"  {name:<24} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: bulk question ingestion rows/sec
+Compares the chunked executemany path (app.question_ingest) against the old
+add/commit/refresh-per-question loop. The per-row loop is only run up to
+--per-row-max questions since it needs one fsync per row.
+
+Usage:
+    python scripts/bench_bulk_ingest.py --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Migrations run against DATABASE_URL, so point it at a scratch database
+# before app.database reads it
+_tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(_tmp.name, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import create_engines
+from app.database.migrations import run_migrations
+from app.models.question import Question
+from app.question_ingest import ingest_questions
+from app.schemas import QuestionCreate
+
+SUBJECTS = ["math", "english", "reading", "science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def synthetic_questions(count: int):
+    return [
+        QuestionCreate(
+            subject=SUBJECTS[i % len(SUBJECTS)],
+            difficulty=DIFFICULTIES[i % len(DIFFICULTIES)],
+            question_text=f"Synthetic question {i}: " + "lorem ipsum " * 20,
+            choices=["A", "B", "C", "D"],
+            correct_answer="A",
+            explanation="Synthetic explanation",
+        )
+        for i in range(count)
+    ]
+
+
+async def run_chunked(session_factory, questions) -> float:
+    async with session_factory() as db:
+        started = time.perf_counter()
+        created, errors = await ingest_questions(db, questions)
+        elapsed = time.perf_counter() - started
+    assert len(created) == len(questions) and not errors
+    return elapsed
+
+
+async def run_per_row(session_factory, questions) -> float:
+    async with session_factory() as db:
+        started = time.perf_counter()
+        for q in questions:
+            db_question = Question(
+                subject=q.subject,
+                question_text=q.question_text,
+                choices=json.dumps(q.choices),
+                correct_answer=q.correct_answer,
+                explanation=q.explanation,
+                difficulty=q.difficulty,
+            )
+            db.add(db_question)
+            await db.commit()
+            await db.refresh(db_question)
+        return time.perf_counter() - started
+
+
+async def bench(size: int, per_row_max: int):
+    # A fresh database per size, with the full schema (including the search
+    # index table the ingest path writes to)
+    for path in glob.glob(DB_PATH + "*"):
+        os.remove(path)
+    run_migrations()
+    sync_engine, async_engine = create_engines(os.environ["DATABASE_URL"])
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    questions = synthetic_questions(size)
+
+    elapsed = await run_chunked(session_factory, questions)
+    line = f"{size:>7} questions  chunked: {size / elapsed:>10.0f} rows/s"
+    if size <= per_row_max:
+        elapsed = await run_per_row(session_factory, questions)
+        line += f"   per-row: {size / elapsed:>8.0f} rows/s"
+    print(line)
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--per-row-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        asyncio.run(bench(size, args.per_row_max))
+
+
+if __name__ == "__main__":
+    main()
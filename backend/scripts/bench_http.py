@@ -0,0 +1,366 @@
+"""
+HTTP load test: throughput and latency percentiles per endpoint
+Seeds a synthetic question bank and a pool of users through the API, then
+runs --concurrency virtual users for --duration seconds, each picking
+requests from a weighted mix (login, listing, cursor pages, answer checks,
+counts, sampling, search). Reports requests/s and p50/p95/p99 per endpoint
+and can write the results as JSON and compare them with an earlier run.
+
+By default the app runs in-process (ASGI, with its lifespan) against a
+throwaway SQLite database; --url points it at a running server instead
+(e.g. uvicorn app.main:app), which is seeded through the same API calls.
+
+Usage:
+    python scripts/bench_http.py --questions 5000 --users 50 --duration 30
+    python scripts/bench_http.py --url http://localhost:8000 --output run.json
+    python scripts/bench_http.py --output new.json --compare run.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+SUBJECTS = ["math", "english", "reading", "science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+WORDS = ["ratio", "triangle", "passage", "author", "comma", "cell", "energy", "slope", "tone", "graph"]
+SEED_CHUNK = 1000
+PASSWORD = "LoadTest-Password-1"
+DEFAULT_MIX = "list:30,page:15,check:25,counts:10,sample:10,search:5,login:5"
+
+
+# ----------------------------
+# Results
+# ----------------------------
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, name: str, seconds: float, ok: bool):
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {name: _stats(values, self.errors[name], elapsed) for name, values in sorted(self.latencies.items())}
+        everything = [v for values in self.latencies.values() for v in values]
+        return {
+            "endpoints": endpoints,
+            "total": _stats(everything, sum(self.errors.values()), elapsed),
+        }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def _stats(values: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(values)
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+    }
+
+
+# ----------------------------
+# Requests
+# ----------------------------
+async def timed(recorder: Recorder, name: str, request) -> Optional[httpx.Response]:
+    started = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        recorder.add(name, time.perf_counter() - started, False)
+        return None
+    recorder.add(name, time.perf_counter() - started, response.status_code < 400)
+    return response
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, credentials: dict, total: int):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.credentials = credentials
+        self.total = total
+        self.headers = {"Authorization": f"Bearer {credentials['token']}"}
+
+    async def login(self):
+        r = await timed(self.recorder, "login", self.client.post("/api/auth/login", json={
+            "username": self.credentials["username"], "password": PASSWORD,
+        }))
+        if r is not None and r.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    async def list(self):
+        offset = self.rng.randrange(max(self.total - 20, 1))
+        await timed(self.recorder, "list", self.client.get(
+            "/api/questions/", params={"limit": 20, "offset": offset, "subject": self.rng.choice(SUBJECTS)},
+        ))
+
+    async def page(self):
+        """Walk the first few cursor pages of one subject"""
+        params = {"paginate": "cursor", "limit": 20, "subject": self.rng.choice(SUBJECTS)}
+        for _ in range(3):
+            r = await timed(self.recorder, "page", self.client.get("/api/questions/", params=params))
+            cursor = r.json().get("next_cursor") if r is not None and r.status_code == 200 else None
+            if not cursor:
+                return
+            params["cursor"] = cursor
+
+    async def check(self):
+        await timed(self.recorder, "check", self.client.post("/api/questions/check", headers=self.headers, json={
+            "question_id": self.rng.randint(1, self.total),
+            "user_answer": self.rng.choice("AAABCD"),
+            "time_spent_seconds": self.rng.randint(5, 90),
+        }))
+
+    async def counts(self):
+        await timed(self.recorder, "counts", self.client.get("/api/questions/subjects/counts"))
+
+    async def sample(self):
+        await timed(self.recorder, "sample", self.client.get(
+            "/api/questions/sample", params={"k": 10}, headers=self.headers,
+        ))
+
+    async def search(self):
+        await timed(self.recorder, "search", self.client.get(
+            "/api/questions/search", params={"q": self.rng.choice(WORDS), "limit": 10},
+        ))
+
+
+OPERATIONS = ["login", "list", "page", "check", "counts", "sample", "search"]
+
+
+async def run_user(user: VirtualUser, names: List[str], weights: List[float], deadline: float):
+    while time.perf_counter() < deadline:
+        await getattr(user, user.rng.choices(names, weights)[0])()
+
+
+# ----------------------------
+# Setup
+# ----------------------------
+async def seed_questions(client: httpx.AsyncClient, count: int, rng: random.Random):
+    for start in range(0, count, SEED_CHUNK):
+        questions = [
+            {
+                "subject": SUBJECTS[i % len(SUBJECTS)],
+                "difficulty": DIFFICULTIES[i % len(DIFFICULTIES)],
+                "question_text": f"Synthetic question {i}: " + " ".join(rng.choices(WORDS, k=30)),
+                "choices": ["A", "B", "C", "D"],
+                "correct_answer": "A",
+                "explanation": " ".join(rng.choices(WORDS, k=15)),
+            }
+            for i in range(start, min(start + SEED_CHUNK, count))
+        ]
+        r = await client.post("/api/admin/questions/bulk", json={"questions": questions}, timeout=120)
+        r.raise_for_status()
+
+
+async def register_users(client: httpx.AsyncClient, count: int, concurrency: int, recorder: Recorder) -> List[dict]:
+    run = uuid.uuid4().hex[:8]
+    users = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register(i: int):
+        username = f"load-{run}-{i}"
+        async with semaphore:
+            r = await timed(recorder, "register", client.post("/api/auth/register", json={
+                "email": f"{username}@example.com", "username": username, "password": PASSWORD,
+            }))
+        if r is None or r.status_code != 200:
+            raise RuntimeError(f"Registering {username} failed: {r.text if r is not None else 'no response'}")
+        users.append({"username": username, "token": r.json()["access_token"]})
+
+    await asyncio.gather(*(register(i) for i in range(count)))
+    return users
+
+
+async def question_total(client: httpx.AsyncClient) -> int:
+    r = await client.get("/api/questions/subjects/counts")
+    r.raise_for_status()
+    return r.json()["total"]
+
+
+@contextlib.asynccontextmanager
+async def in_process_client():
+    """Client for the app in this process, with a throwaway database and its lifespan running"""
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    from app.database.migrations import run_migrations
+    run_migrations()
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+    from app.database import async_engine
+    await async_engine.dispose()
+    tmp.cleanup()
+
+
+# ----------------------------
+# Main
+# ----------------------------
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation '{name}' in --mix (choose from {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    if args.url:
+        client_context = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client_context = in_process_client()
+
+    async with client_context as client:
+        setup = Recorder()
+        if not args.no_seed:
+            started = time.perf_counter()
+            await seed_questions(client, args.questions, rng)
+            print(f"Seeded {args.questions} questions in {time.perf_counter() - started:.1f}s")
+        total = await question_total(client)
+        if not total:
+            raise SystemExit("No questions to test against (drop --no-seed)")
+
+        started = time.perf_counter()
+        credentials = await register_users(client, args.users, args.concurrency, setup)
+        print(f"Registered {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        recorder = Recorder()
+        names, weights = list(mix), list(mix.values())
+        users = [
+            VirtualUser(client, recorder, random.Random(rng.random()), credentials[i % len(credentials)], total)
+            for i in range(args.concurrency)
+        ]
+        if args.warmup:
+            warmup = Recorder()
+            for user in users:
+                user.recorder = warmup
+            await asyncio.gather(*(run_user(u, names, weights, time.perf_counter() + args.warmup) for u in users))
+            for user in users:
+                user.recorder = recorder
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_user(u, names, weights, deadline) for u in users))
+        elapsed = time.perf_counter() - started
+
+    results = recorder.summary(elapsed)
+    results["setup"] = setup.summary(elapsed)["endpoints"]
+    results["meta"] = {
+        "target": args.url or "in-process",
+        "questions": total,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "mix": mix,
+        "seed": args.seed,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    return results
+
+
+def print_report(results: dict, baseline: Optional[dict] = None):
+    meta = results["meta"]
+    print(f"\n{meta['target']}: {meta['concurrency']} concurrent users, {meta['duration_seconds']}s, "
+          f"{meta['questions']} questions (revision {meta['revision'] or 'unknown'})")
+    header = f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    if baseline:
+        header += f" {'p50 Δ':>8} {'p95 Δ':>8} {'req/s Δ':>8}"
+    print(header)
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for name, s in rows:
+        line = (f"{name:<10} {s['requests']:>9} {s['errors']:>7} {s['rps']:>8.1f} {s['p50_ms']:>8.2f} "
+                f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}")
+        if baseline:
+            old = baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+            line += "".join(
+                f" {_change(old[key], s[key]) if old else '-':>8}" for key in ("p50_ms", "p95_ms", "rps")
+            )
+        print(line)
+    for name, s in results["setup"].items():
+        print(f"(setup) {name}: {s['requests']} requests, p50 {s['p50_ms']:.2f} ms, p95 {s['p95_ms']:.2f} ms")
+
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old:+.0%}" if old else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--questions", type=int, default=2000, help="Synthetic questions to seed")
+    parser.add_argument("--no-seed", action="store_true", help="Use the questions already on the server")
+    parser.add_argument("--users", type=int, default=20, help="Accounts to register")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users running at once")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. list:50,check:50")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for data and request choices")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = asyncio.run(run(args))
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: logins/sec vs p99 latency of concurrent question reads
+Runs the API in-process on a throwaway SQLite database with one login loop
+and one question-reader loop going at the same time, once with hashing on the
+request threadpool (PASSWORD_HASH_WORKERS=0, how the old sync handlers
+hashed) and once on the process pool.
+
+Usage:
+    python scripts/bench_password_hashing.py --seconds 10 --logins 16 --readers 16 --workers 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+import httpx
+from sqlalchemy import insert
+
+from app.auth.jwt_handler import get_password_hash
+from app.auth.passwords import password_hasher
+from app.database import async_engine, engine
+from app.database.migrations import run_migrations
+from app.main import app
+from app.models.question import Question
+from app.models.user import User
+
+QUESTIONS = 200
+PASSWORD = "benchmark-password"
+
+
+def seed():
+    run_migrations()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "email": "bench@example.com",
+            "username": "bench",
+            "full_name": "Bench",
+            "hashed_password": get_password_hash(PASSWORD),
+        }])
+        conn.execute(insert(Question), [
+            {
+                "subject": "math",
+                "difficulty": "medium",
+                "question_text": f"Question {i}",
+                "choices": json.dumps(["A", "B", "C", "D"]),
+                "correct_answer": "A",
+                "explanation": "Because",
+            }
+            for i in range(QUESTIONS)
+        ])
+
+
+async def run(seconds: float, logins: int, readers: int, workers: int) -> dict:
+    password_hasher.shutdown()
+    password_hasher.workers = workers
+    password_hasher.start()
+
+    login_count = 0
+    read_latencies = []
+    deadline = time.perf_counter() + seconds
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm the catalog and the pool's processes outside the timed window
+        await client.get("/api/questions/1")
+        await client.post("/api/auth/login", json={"username": "bench", "password": PASSWORD})
+
+        async def login_loop():
+            nonlocal login_count
+            while time.perf_counter() < deadline:
+                r = await client.post("/api/auth/login", json={"username": "bench", "password": PASSWORD})
+                assert r.status_code == 200, r.text
+                login_count += 1
+
+        async def read_loop(offset: int):
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                r = await client.get(f"/api/questions/{i % QUESTIONS + 1}")
+                read_latencies.append(time.perf_counter() - started)
+                assert r.status_code == 200, r.text
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(login_loop() for _ in range(logins)),
+            *(read_loop(n * 7) for n in range(readers)),
+        )
+        elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(read_latencies, n=100)
+    return {
+        "logins_per_s": login_count / elapsed,
+        "reads_per_s": len(read_latencies) / elapsed,
+        "read_p50_ms": cuts[49] * 1000,
+        "read_p99_ms": cuts[98] * 1000,
+    }
+
+
+async def run_all(args):
+    results = {}
+    for name, workers in (("threadpool", 0), (f"process pool x{args.workers}", args.workers)):
+        results[name] = await run(args.seconds, args.logins, args.readers, workers)
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent login clients")
+    parser.add_argument("--readers", type=int, default=16, help="Concurrent question readers")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes for the pool run")
+    args = parser.parse_args()
+
+    seed()
+    results = asyncio.run(run_all(args))
+    print(f"rounds={password_hasher.rounds}, {args.logins} login clients, {args.readers} readers, {args.seconds}s each")
+    for name, r in results.items():
+        print(
+            f"  {name:<16} {r['logins_per_s']:>7.1f} logins/s  {r['reads_per_s']:>8.0f} reads/s"
+            f"  read p50 {r['read_p50_ms']:>7.1f} ms  p99 {r['read_p99_ms']:>7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
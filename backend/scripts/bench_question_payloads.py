@@ -0,0 +1,128 @@
+"""
+Benchmark: per-request CPU for GET /api/questions/?limit=50
+"dict" is the previous handler shape: the catalog's decoded dicts returned
+from the route, run through jsonable_encoder and re-encoded by the default
+JSONResponse. "spliced" is the current route, which splices each question's
+pre-serialized bytes into a FastJSONResponse. Both are served from a warm
+catalog in-process, so the difference is encoding and framework work.
+
+Usage:
+    python scripts/bench_question_payloads.py --questions 2000 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.catalog import question_catalog
+from app.database import AsyncSessionLocal, async_engine, engine, get_async_db
+from app.database.migrations import run_migrations
+from app.models.question import Question
+from app.routes import questions
+from app.responses import orjson
+
+SUBJECTS = ["math", "english", "reading", "science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def seed(count: int):
+    run_migrations()
+    with engine.begin() as conn:
+        conn.execute(insert(Question), [
+            {
+                "subject": SUBJECTS[i % len(SUBJECTS)],
+                "difficulty": DIFFICULTIES[i % len(DIFFICULTIES)],
+                "question_text": f"Synthetic question {i}: " + "lorem ipsum " * 40,
+                "choices": json.dumps(["A) first", "B) second", "C) third", "D) fourth"]),
+                "correct_answer": "A",
+                "explanation": "Synthetic explanation",
+            }
+            for i in range(count)
+        ])
+
+
+def build_dict_app() -> FastAPI:
+    """The route as it was before pre-serialization: dicts out, encoded per request"""
+    app = FastAPI()
+
+    @app.get("/api/questions/")
+    async def get_questions(
+        limit: int = Query(10, ge=1, le=50),
+        offset: int = Query(0, ge=0),
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        await question_catalog.ensure_fresh(db)
+        ids = question_catalog.ids()
+        entries = await question_catalog.get_many(db, ids[offset:offset + limit])
+        result = [e.data for e in entries]
+        return {"questions": result, "count": len(result), "total": len(ids), "offset": offset, "limit": limit}
+
+    return app
+
+
+def build_spliced_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(questions.router, prefix="/api/questions")
+    return app
+
+
+async def measure(app: FastAPI, requests: int, limit: int, total: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await client.get("/api/questions/", params={"limit": limit})
+        size = len(first.content)
+
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        for i in range(requests):
+            offset = (i * limit) % max(total - limit, 1)
+            r = await client.get("/api/questions/", params={"limit": limit, "offset": offset})
+            assert r.status_code == 200, r.text
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+    return {"cpu_us": cpu / requests * 1e6, "rps": requests / elapsed, "bytes": size}
+
+
+async def run(questions_count: int, requests: int, limit: int):
+    async with AsyncSessionLocal() as db:
+        await question_catalog.warm(db)
+
+    results = {}
+    for name, app in (("dict", build_dict_app()), ("spliced", build_spliced_app())):
+        results[name] = await measure(app, requests, limit, questions_count)
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.questions)
+    results = asyncio.run(run(args.questions, args.requests, args.limit))
+    print(f"limit={args.limit}, {args.requests} requests, orjson={'yes' if orjson else 'no'}")
+    for name, r in results.items():
+        print(f"  {name:<8} {r['cpu_us']:>8.0f} us CPU/request  {r['rps']:>7.0f} req/s  {r['bytes']} bytes")
+    base, new = results["dict"]["cpu_us"], results["spliced"]["cpu_us"]
+    print(f"  spliced uses {new / base:.0%} of the dict path's CPU per request")
+
+
+if __name__ == "__main__":
+    main()
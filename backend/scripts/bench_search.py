@@ -0,0 +1,129 @@
+"""
+Benchmark: full-text question search vs a LIKE '%term%' scan
+Builds a synthetic bank (500k questions by default) with Zipf-distributed
+words, so there are common, mid-frequency and rare terms to look up, then
+times first-page searches (ranked page + total) through app.search against
+the equivalent unranked LIKE scan over question_text and explanation.
+
+Usage:
+    python scripts/bench_search.py --questions 500000 --repeat 5
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+from sqlalchemy import insert, text
+
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.database.migrations import run_migrations
+from app.models.question import Question
+from app.search import rebuild_search_index, search_questions
+
+SUBJECTS = ["math", "english", "reading", "science"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zen", "pri", "sol", "dra", "qui"]
+VOCABULARY = 6000
+BATCH = 20000
+
+
+def vocabulary(size: int):
+    words = ("".join(p) for n in (2, 3, 4) for p in itertools.product(SYLLABLES, repeat=n))
+    return list(itertools.islice(words, size))
+
+
+def seed(count: int, words, rng: random.Random):
+    run_migrations()
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    with engine.begin() as conn:
+        for start in range(0, count, BATCH):
+            n = min(BATCH, count - start)
+            text_words = rng.choices(words, weights, k=n * 30)
+            expl_words = rng.choices(words, weights, k=n * 15)
+            conn.execute(insert(Question), [
+                {
+                    "subject": SUBJECTS[(start + i) % len(SUBJECTS)],
+                    "difficulty": DIFFICULTIES[(start + i) % len(DIFFICULTIES)],
+                    "question_text": " ".join(text_words[i * 30:(i + 1) * 30]),
+                    "choices": json.dumps(["A", "B", "C", "D"]),
+                    "correct_answer": "A",
+                    "explanation": " ".join(expl_words[i * 15:(i + 1) * 15]),
+                }
+                for i in range(n)
+            ])
+
+
+async def like_scan(db, query: str, subject, limit: int = 10):
+    where = " AND ".join(
+        f"(question_text LIKE :t{i} OR explanation LIKE :t{i})" for i in range(len(query.split()))
+    )
+    params = {f"t{i}": f"%{term}%" for i, term in enumerate(query.split())}
+    if subject:
+        where += " AND subject = :subject"
+        params["subject"] = subject
+    rows = (await db.execute(
+        text(f"SELECT id FROM questions WHERE {where} ORDER BY id LIMIT :limit"), {**params, "limit": limit}
+    )).all()
+    total = await db.scalar(text(f"SELECT COUNT(*) FROM questions WHERE {where}"), params)
+    return rows, total
+
+
+async def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def run(words, repeat: int):
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await rebuild_search_index(db)
+        print(f"index rebuild: {time.perf_counter() - started:.1f}s")
+
+        cases = [
+            ("common", words[3], None),
+            ("mid", words[300], None),
+            ("rare", words[5000], None),
+            ("two words", f"{words[40]} {words[900]}", None),
+            ("mid + subject", words[300], "math"),
+        ]
+        print(f"{'query':<14} {'matches':>8} {'fts ms':>8} {'like ms':>9}")
+        for name, query, subject in cases:
+            fts, (_, total) = await timed(lambda: search_questions(db, query, subject), repeat)
+            like, (_, like_total) = await timed(lambda: like_scan(db, query, subject), repeat)
+            # LIKE also matches inside longer words, FTS only whole (stemmed) words
+            print(f"{name:<14} {total:>8} {fts * 1000:>8.1f} {like * 1000:>9.1f}  (like matched {like_total})")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = vocabulary(VOCABULARY)
+    started = time.perf_counter()
+    seed(args.questions, words, rng)
+    print(f"seeded {args.questions} questions in {time.perf_counter() - started:.1f}s")
+    asyncio.run(run(words, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Check AI feedback under concurrency against the fake OpenAI server
+Runs the API and scripts/fake_openai_server.py in-process (no sockets) on a
+throwaway SQLite database and reports, for each scenario, upstream calls,
+peak concurrent upstream calls and the worst event-loop stall seen while
+requests were waiting on the fake server.
+
+Scenarios:
+    coalesce  - many concurrent requests for one user -> one upstream call
+    cap       - requests for many users -> never more than OPENAI_MAX_CONCURRENCY in flight
+    timeout   - upstream slower than OPENAI_TIMEOUT_SECONDS -> rule-based fallback
+
+Usage:
+    python scripts/check_ai_feedback_concurrency.py --latency 1 --requests 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'check.db')}"
+os.environ["AI_FEEDBACK_CACHE_PERSIST"] = "false"
+
+import httpx
+from openai import AsyncOpenAI
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal, async_engine, engine
+from app.database.migrations import run_migrations
+from app.feedback_cache import feedback_cache
+from app.main import app
+from app.models.user_performance import UserPerformance
+from app.routes import ai_feedback
+from scripts.fake_openai_server import create_app
+
+SUBJECTS = ["math", "english", "reading", "science"]
+
+
+async def seed_users(count: int):
+    rows = [
+        {
+            "user_id": user_id,
+            "subject": subject,
+            "difficulty": "medium",
+            "total": 20,
+            # Vary accuracy per user so each one gets its own fingerprint
+            "correct": (user_id * 3 + i * 5) % 20,
+            "time_spent_seconds": 600,
+        }
+        for user_id in range(1, count + 1)
+        for i, subject in enumerate(SUBJECTS)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(UserPerformance), rows)
+        await db.commit()
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Longest delay between consecutive ticks of a short sleep"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def scenario(client, fake, user_ids):
+    feedback_cache.clear()
+    fake.state.calls = fake.state.max_active = 0
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.get(f"/api/ai-feedback/{uid}") for uid in user_ids))
+    elapsed = time.perf_counter() - started
+    stop.set()
+
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200]
+    return {
+        "requests": len(responses),
+        "ai_generated": sum(r.json()["ai_generated"] for r in responses),
+        "upstream_calls": fake.state.calls,
+        "max_upstream_in_flight": fake.state.max_active,
+        "loop_stall_ms": round(await watcher * 1000, 1),
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+async def run(latency: float, requests: int, users: int):
+    run_migrations()
+    await seed_users(users)
+
+    fake = create_app(latency)
+    ai_feedback.openai_client = AsyncOpenAI(
+        api_key="fake",
+        base_url="http://fake-openai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)),
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        results = {}
+        results["coalesce"] = await scenario(client, fake, [1] * requests)
+        results["cap"] = await scenario(client, fake, list(range(1, users + 1)))
+
+        ai_feedback.OPENAI_TIMEOUT_SECONDS = latency / 2
+        results["timeout"] = await scenario(client, fake, [1] * 5)
+
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake server delay in seconds")
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent requests in the coalesce scenario")
+    parser.add_argument("--users", type=int, default=12, help="Distinct users in the cap scenario")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.latency, args.requests, args.users))
+    print(f"OPENAI_MAX_CONCURRENCY={ai_feedback.OPENAI_MAX_CONCURRENCY}, fake latency={args.latency}s")
+    for name, r in results.items():
+        print(f"  {name:<9} " + "  ".join(f"{k}={v}" for k, v in r.items()))
+
+    ok = (
+        results["coalesce"]["upstream_calls"] == 1
+        and results["cap"]["max_upstream_in_flight"] <= ai_feedback.OPENAI_MAX_CONCURRENCY
+        and results["timeout"]["ai_generated"] == 0
+    )
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
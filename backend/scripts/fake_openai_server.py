@@ -0,0 +1,61 @@
+"""
+Fake OpenAI server for local testing
+Serves /v1/chat/completions with a canned reply after a configurable delay,
+so AI feedback can be exercised without an API key or network access.
+
+Usage:
+    python scripts/fake_openai_server.py --port 8100 --latency 3
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+
+def create_app(latency: float = 2.0) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    app.state.latency = latency
+    app.state.calls = 0
+    app.state.active = 0
+    app.state.max_active = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        app.state.calls += 1
+        app.state.active += 1
+        app.state.max_active = max(app.state.max_active, app.state.active)
+        try:
+            await asyncio.sleep(app.state.latency)
+        finally:
+            app.state.active -= 1
+        return {
+            "id": f"chatcmpl-fake-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Great progress! Keep practicing your weakest subject."},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds to wait before replying")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Import ACT questions from an NDJSON or CSV file
+Streams the file in bounded chunks, either straight into the local database
+or to a running API's /questions/import endpoint, printing progress per chunk.
+
+Usage:
+    python scripts/import_questions.py questions.ndjson
+    python scripts/import_questions.py questions.csv --format csv
+    python scripts/import_questions.py questions.ndjson --api http://localhost:8000/api/admin/questions/import
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.database.migrations import run_migrations
+from app.question_import import iter_file_lines, stream_import
+from app.question_ingest import BULK_INSERT_CHUNK_SIZE
+
+
+def print_event(event: dict):
+    if event["type"] == "done":
+        print(f"\n✓ Done: {event['created_count']} created, {event['error_count']} errors "
+              f"({event['processed']} records)")
+        return
+    if event["type"] == "error":
+        print(f"✗ Import aborted: {event['error']}")
+        return
+    print(f"  ... {event['processed']} records, {event['created_count']} created, "
+          f"{event['error_count']} errors")
+    for error in event["errors"]:
+        print(f"  ✗ record {error['index']}: {error['error']}")
+
+
+async def import_local(path: str, fmt: str, chunk_size: int):
+    # Bring the schema up to date first
+    run_migrations()
+    async with AsyncSessionLocal() as db:
+        async for event in stream_import(db, iter_file_lines(path), fmt, chunk_size):
+            print_event(event)
+    await async_engine.dispose()
+
+
+async def import_remote(path: str, fmt: str, api_url: str, chunk_size: int):
+    import httpx
+
+    async def body():
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                yield chunk
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("POST", api_url, params={"format": fmt, "chunk_size": chunk_size}, content=body()) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if line.strip():
+                    print_event(json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None,
+                        help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=BULK_INSERT_CHUNK_SIZE)
+    parser.add_argument("--api", help="stream to this import endpoint instead of the local DB")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    if args.api:
+        asyncio.run(import_remote(args.path, fmt, args.api, args.chunk_size))
+    else:
+        asyncio.run(import_local(args.path, fmt, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
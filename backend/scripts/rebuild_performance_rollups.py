@@ -0,0 +1,39 @@
+"""
+Backfill / rebuild the user_performance rollups from user_answers
+Usage:
+    python scripts/rebuild_performance_rollups.py            # all users
+    python scripts/rebuild_performance_rollups.py --user 42  # one user
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal, async_engine
+from app.database.migrations import run_migrations
+from app.models.user_performance import UserPerformance
+from app.performance import rebuild_rollups
+
+# Bring the schema up to date first
+run_migrations()
+
+
+async def main(user_id):
+    async with AsyncSessionLocal() as db:
+        await rebuild_rollups(db, user_id)
+        rows = await db.scalar(select(func.count()).select_from(UserPerformance))
+    await async_engine.dispose()
+    scope = f"user {user_id}" if user_id is not None else "all users"
+    print(f"Rebuilt performance rollups for {scope} ({rows} rollup rows total)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.user))
@@ -0,0 +1,32 @@
+"""
+Rebuild the full-text search index from the questions table
+Run after inserting questions outside the API/seed/import paths, or if
+search results ever look stale. No-op on PostgreSQL, whose index is
+maintained by the database.
+"""
+import asyncio
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.database.migrations import run_migrations
+from app.search import rebuild_search_index
+
+# Bring the schema up to date first
+run_migrations()
+
+
+async def main():
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await rebuild_search_index(db)
+    await async_engine.dispose()
+    print(f"Rebuilt the question search index in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
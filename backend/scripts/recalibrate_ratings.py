@@ -0,0 +1,49 @@
+"""
+Refit every user and question rating from the full answer history
+Run it periodically (e.g. a nightly cron job) to correct the drift of the
+per-answer updates; workers pick the new ratings up within
+RATING_REFRESH_SECONDS. Needs NumPy.
+Usage:
+    python scripts/recalibrate_ratings.py
+    python scripts/recalibrate_ratings.py --every 3600   # keep running, hourly
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.database.migrations import run_migrations
+from app.ratings import recalibrate
+
+# Bring the schema up to date first
+run_migrations()
+
+
+async def main(iterations: int, every: float):
+    try:
+        while True:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                result = await recalibrate(db, iterations)
+            print(
+                f"Recalibrated {result['users']} users and {result['questions']} questions "
+                f"from {result['answers']} answers in {time.perf_counter() - started:.2f}s"
+            )
+            if not every:
+                break
+            await asyncio.sleep(every)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--every", type=float, default=0, help="Repeat every N seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.every))
@@ -0,0 +1,32 @@
+"""
+Rebuild the question_counts table from the questions table
+Run after importing questions outside the API or if counts ever drift.
+"""
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.database.migrations import run_migrations
+from app.question_counts import reconcile_counts, read_counts
+
+# Bring the schema up to date first
+run_migrations()
+
+
+async def main():
+    async with AsyncSessionLocal() as db:
+        await reconcile_counts(db)
+        counts = await read_counts(db)
+    await async_engine.dispose()
+
+    print("Reconciled question counts:")
+    for subject, count in counts.items():
+        print(f"   - {subject.capitalize()}: {count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,11 +10,15 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.local_db import SessionLocal, engine, Base
+from app.database import SessionLocal
+from app.database.migrations import run_migrations
 from app.models.question import Question
+from app.catalog import catalog_version_bump
+from app.question_counts import count_deltas, count_delta_statement
+from app.search import search_index_statement
 
-# Create all tables first
-Base.metadata.create_all(bind=engine)
+# Bring the schema up to date first
+run_migrations()
 
 # ACT-style questions with passage-based format
 SAMPLE_QUESTIONS = [
@@ -239,6 +243,7 @@ def seed_database():
             return
         
         # Add all sample questions
+        added = []
         for q_data in SAMPLE_QUESTIONS:
             question = Question(
                 subject=q_data["subject"],
@@ -249,7 +254,20 @@ def seed_database():
                 explanation=q_data["explanation"]
             )
             db.add(question)
+            added.append(question)
         
+        # Keep the per-(subject, difficulty) counters in the same transaction
+        stmt, rows = count_delta_statement(db, count_deltas(added))
+        db.execute(stmt, rows)
+        
+        # ...and the search index, which needs the new ids
+        db.flush()
+        search_stmt = search_index_statement(db, [q.id for q in added])
+        if search_stmt is not None:
+            db.execute(search_stmt)
+        
+        # Tell running workers to reload their question catalog
+        db.execute(catalog_version_bump(db))
         db.commit()
         print(f"Successfully seeded database with {len(SAMPLE_QUESTIONS)} questions!")
         
@@ -0,0 +1,89 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database with the query
+inspector (app.query_log) on, and `query_budget` for asserting how many SQL
+statements each request runs.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# Must be in place before anything imports app.*
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'test.db')}"
+os.environ["QUERY_LOG_ENABLED"] = "True"
+# Hash in-thread with cheap rounds; the tests aren't about hashing
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_ROUNDS"] = "1000"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.database.migrations import run_migrations
+
+    run_migrations()
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    r = client.post("/api/auth/register", json={
+        "email": "budget@example.com", "username": "budget", "password": "Budget-Password-1",
+    })
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def question_ids(client):
+    questions = [
+        {
+            "subject": ["math", "english", "reading", "science"][i % 4],
+            "difficulty": ["easy", "medium", "hard"][i % 3],
+            "question_text": f"Budget question {i}",
+            "choices": ["A", "B", "C", "D"],
+            "correct_answer": "A",
+            "explanation": "Because",
+        }
+        for i in range(40)
+    ]
+    r = client.post("/api/admin/questions/bulk", json={"questions": questions})
+    assert r.status_code == 200, r.text
+    return r.json()["created_ids"]
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager asserting that every request made inside it ran at most
+    `max_queries` SQL statements and, unless allow_repeats, no statement
+    shape QUERY_LOG_REPEAT_THRESHOLD times (the N+1 pattern):
+
+        with query_budget(1):
+            client.get("/api/questions/subjects/counts")
+    """
+    from app import query_log
+
+    @contextmanager
+    def budget(max_queries: int, allow_repeats: bool = False):
+        with query_log.capture() as reports:
+            yield reports
+        assert reports, "No requests finished inside query_budget"
+        for report in reports:
+            statements = "\n".join(f"  {query_log.shape(s.sql)}" for s in report.statements)
+            assert report.count <= max_queries, (
+                f"{report.method} {report.route} ran {report.count} statements "
+                f"(budget {max_queries}):\n{statements}"
+            )
+            if not allow_repeats:
+                assert not report.repeated(), (
+                    f"{report.method} {report.route} repeats statements {report.repeated()}:\n{statements}"
+                )
+
+    return budget
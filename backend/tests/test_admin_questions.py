@@ -0,0 +1,175 @@
+"""
+Admin question writes, and how they reach the catalog that serves reads
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+QUESTION = {
+    "subject": "math", "difficulty": "easy", "question_text": "Admin create",
+    "choices": ["A", "B"], "correct_answer": "A", "explanation": "Because",
+}
+
+
+@pytest.mark.parametrize("change, detail", [
+    ({"subject": "art"}, "Invalid subject: art"),
+    ({"difficulty": None}, "difficulty is required"),
+    ({"correct_answer": "C"}, "correct_answer not in choices"),
+    ({"explanation": "  "}, "explanation is required"),
+])
+def test_create_rejects_invalid_question(client, change, detail):
+    r = client.post("/api/admin/questions", json={**QUESTION, **change})
+    assert r.status_code == 400
+    assert r.json()["detail"] == detail
+
+
+def test_create_failure_is_generic_500(client, monkeypatch):
+    from app.routes import admin
+
+    async def broken(db, ids):
+        raise RuntimeError("secret internals")
+
+    monkeypatch.setattr(admin, "apply_search_index", broken)
+    r = client.post("/api/admin/questions", json=QUESTION)
+    assert r.status_code == 500
+    assert r.json()["detail"] == "Failed to create question"
+
+
+def _catalog_version():
+    from app.database import SessionLocal
+    from app.models.catalog_state import CatalogState
+
+    with SessionLocal() as db:
+        return db.scalar(select(CatalogState.version).where(CatalogState.id == 1))
+
+
+def _listed_ids(client, **filters):
+    """Every id the offset listing serves for `filters`"""
+    ids = []
+    while True:
+        body = client.get("/api/questions/", params={"limit": 50, "offset": len(ids), **filters}).json()
+        ids.extend(q["id"] for q in body["questions"])
+        if len(ids) >= body["total"]:
+            return ids
+
+
+def _write_elsewhere(write):
+    """
+    Run `write(db)` the way another worker or a script would: its own engine
+    and session, none of this worker's in-process state
+    """
+    from app.database import async_engine
+
+    async def scenario():
+        engine = create_async_engine(async_engine.url, poolclass=NullPool)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessions() as db:
+            result = await write(db)
+        await engine.dispose()
+        return result
+
+    return asyncio.run(scenario())
+
+
+def test_admin_writes_bump_version_and_list_at_once(client, question_ids):
+    from app.catalog import question_catalog
+
+    before = _catalog_version()
+    r = client.post("/api/admin/questions", json={**QUESTION, "question_text": "Listed at once"})
+    created = r.json()["question_id"]
+    assert _catalog_version() == before + 1
+    # Written through to this worker's catalog: no wait for revalidation
+    assert created in _listed_ids(client, subject="math")
+    assert question_catalog.version == before + 1
+
+    r = client.post("/api/admin/questions/bulk", json={"questions": [
+        {**QUESTION, "question_text": f"Bulk listed {i}"} for i in range(3)
+    ]})
+    assert _catalog_version() > before + 1
+    assert set(r.json()["created_ids"]) <= set(_listed_ids(client, subject="math"))
+
+
+def test_write_by_another_worker_lists_within_revalidate_window(client, question_ids):
+    from app.catalog import catalog_version_bump, question_catalog
+    from app.models.question import Question
+    from app.question_counts import apply_count_deltas, count_deltas
+    from app.search import apply_search_index
+
+    async def insert(db):
+        question = Question(**{**QUESTION, "question_text": "From another worker", "choices": '["A", "B"]'})
+        db.add(question)
+        await db.flush()
+        await apply_count_deltas(db, count_deltas([question]))
+        await apply_search_index(db, [question.id])
+        await db.execute(catalog_version_bump(db))
+        await db.commit()
+        return question.id
+
+    _listed_ids(client, subject="math")  # this worker has just checked the version
+    created = _write_elsewhere(insert)
+    assert created not in _listed_ids(client, subject="math")
+
+    # Once the window has passed, the next read sees the new version
+    question_catalog._checked_at -= question_catalog.revalidate_seconds
+    assert created in _listed_ids(client, subject="math")
+    assert question_catalog.version == _catalog_version()
+
+
+def _recount():
+    """Per-subject totals counted from the questions table itself"""
+    from app.database import SessionLocal
+    from app.models.question import Question
+
+    with SessionLocal() as db:
+        rows = db.execute(select(Question.subject, func.count()).group_by(Question.subject)).all()
+    counts = {subject: 0 for subject in ("math", "english", "reading", "science")}
+    counts.update(dict(rows))
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def _assert_counts_match(client):
+    expected = _recount()
+    assert client.get("/api/questions/subjects/counts").json() == expected
+    assert client.get("/api/admin/questions/count").json() == expected
+
+
+def test_counts_follow_creates_and_deletes(client, question_ids):
+    from app.catalog import catalog_version_bump, question_catalog
+    from app.models.question import Question
+    from app.question_counts import apply_count_deltas, count_deltas
+    from app.search import remove_from_search_index
+
+    _assert_counts_match(client)
+
+    client.post("/api/admin/questions", json={**QUESTION, "subject": "reading"})
+    _assert_counts_match(client)
+
+    bulk = client.post("/api/admin/questions/bulk", json={"questions": [
+        {**QUESTION, "subject": subject, "question_text": f"Counted {subject}"}
+        for subject in ("english", "english", "science")
+    ] + [{**QUESTION, "subject": "art"}]}).json()  # rejected: must not be counted
+    assert bulk["created_count"] == 3 and bulk["error_count"] == 1
+    _assert_counts_match(client)
+
+    lines = "".join(json.dumps({**QUESTION, "question_text": f"Imported {i}"}) + "\n" for i in range(4))
+    client.post("/api/admin/questions/import", params={"format": "ndjson"}, content=lines.encode())
+    _assert_counts_match(client)
+
+    # No delete route yet: delete the way one must, counters in the same transaction
+    async def remove(db):
+        ids = bulk["created_ids"][:2]
+        questions = (await db.scalars(select(Question).where(Question.id.in_(ids)))).all()
+        await remove_from_search_index(db, ids)
+        await apply_count_deltas(db, count_deltas(questions, sign=-1))
+        await db.execute(delete(Question).where(Question.id.in_(ids)))
+        await db.execute(catalog_version_bump(db))
+        await db.commit()
+
+    _write_elsewhere(remove)
+    question_catalog._checked_at -= question_catalog.revalidate_seconds
+    _assert_counts_match(client)
@@ -0,0 +1,137 @@
+"""
+AI feedback: the cache's fresh, stale and expired paths, and cached text
+being shared by students in the same buckets, so it must never carry one
+student's exact figures to another
+"""
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+
+class EchoClient:
+    """Stands in for AsyncOpenAI: the "completion" is the prompt it was sent"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=messages[-1]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class Generator:
+    """A `generate` callback returning "feedback 1", "feedback 2", ..."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return f"feedback {self.calls}"
+
+
+def _age(cache, fingerprint, seconds):
+    text, created_at = cache._entries[fingerprint]
+    cache._entries[fingerprint] = (text, created_at - seconds)
+
+
+def test_fresh_entry_is_a_hit():
+    from app.feedback_cache import FeedbackCache
+
+    async def scenario():
+        cache = FeedbackCache(ttl=60, stale_seconds=60, persist=False)
+        generate = Generator()
+        texts = [await cache.get_or_generate("fp", generate) for _ in range(3)]
+        return cache, generate, texts
+
+    cache, generate, texts = asyncio.run(scenario())
+    assert texts == ["feedback 1"] * 3
+    assert generate.calls == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 2
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    from app.feedback_cache import FeedbackCache
+
+    async def scenario():
+        cache = FeedbackCache(ttl=60, stale_seconds=60, persist=False)
+        generate = Generator()
+        await cache.get_or_generate("fp", generate)
+        _age(cache, "fp", 90)
+
+        stale = await cache.get_or_generate("fp", generate)
+        await asyncio.gather(*cache._inflight.values())
+        refreshed = await cache.get_or_generate("fp", generate)
+        return cache, generate, stale, refreshed
+
+    cache, generate, stale, refreshed = asyncio.run(scenario())
+    assert stale == "feedback 1"
+    assert refreshed == "feedback 2"
+    assert generate.calls == 2
+    assert cache.stats()["stale_hits"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_regenerated_before_answering():
+    from app.feedback_cache import FeedbackCache
+
+    async def scenario():
+        cache = FeedbackCache(ttl=60, stale_seconds=60, persist=False)
+        generate = Generator()
+        await cache.get_or_generate("fp", generate)
+        _age(cache, "fp", 150)
+        return cache, generate, await cache.get_or_generate("fp", generate)
+
+    cache, generate, text = asyncio.run(scenario())
+    assert text == "feedback 2"
+    assert generate.calls == 2
+    assert cache.stats()["misses"] == 2 and cache.stats()["stale_hits"] == 0
+
+
+def test_concurrent_misses_share_one_generation():
+    from app.feedback_cache import FeedbackCache
+
+    async def scenario():
+        cache = FeedbackCache(persist=False)
+        generate = Generator()
+        texts = await asyncio.gather(*(cache.get_or_generate("fp", generate) for _ in range(5)))
+        return cache, generate, texts
+
+    cache, generate, texts = asyncio.run(scenario())
+    assert texts == ["feedback 1"] * 5
+    assert generate.calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_shared_feedback_carries_only_bucketed_stats(client, monkeypatch):
+    from app.database import SessionLocal
+    from app.models.user_performance import UserPerformance
+    from app.routes import ai_feedback
+
+    echo = EchoClient()
+    monkeypatch.setattr(ai_feedback, "openai_client", echo)
+
+    # 7/12 = 58.3% and 8/14 = 57.1%: both in the 55-60% band, 10-19 answered
+    with SessionLocal() as db:
+        db.execute(insert(UserPerformance), [
+            {"user_id": 800001, "subject": "math", "difficulty": "easy", "total": 12, "correct": 7},
+            {"user_id": 800002, "subject": "math", "difficulty": "easy", "total": 14, "correct": 8},
+        ])
+        db.commit()
+
+    first = client.get("/api/ai-feedback/800001").json()
+    second = client.get("/api/ai-feedback/800002").json()
+
+    assert echo.calls == 1
+    assert first["ai_generated"] and second["ai_generated"]
+    assert first["feedback"] == second["feedback"]
+    feedback = first["feedback"]
+    assert "Math: 55-60% over 10-19 questions" in feedback
+    for exact in ("58.3", "7/12", "12", "57.1", "8/14", "14"):
+        assert exact not in feedback
+
+    # The per-request summary is still each student's own
+    assert first["analytics_summary"]["total_answered"] == 12
+    assert second["analytics_summary"]["total_answered"] == 14
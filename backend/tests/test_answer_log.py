@@ -0,0 +1,64 @@
+"""
+Write-behind answer log: a rejected row is dropped on its own, a locked or
+unreachable database keeps the whole batch for the next flush
+"""
+import asyncio
+
+from sqlalchemy import exc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+def _answer(question_id, user_answer="A"):
+    return dict(
+        user_id=None, question_id=question_id, user_answer=user_answer,
+        is_correct=True, subject="math", difficulty="easy",
+    )
+
+
+def test_rejected_row_is_dropped_alone(client):
+    from app.answer_log import AnswerLogBuffer
+    from app.database import async_engine
+    from app.models.answer_tracking import AnswerTracking
+
+    async def scenario():
+        # Own engine: the app's pool belongs to the TestClient's event loop
+        engine = create_async_engine(async_engine.url, poolclass=NullPool)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        buffer = AnswerLogBuffer(session_factory=sessions, batch_size=1000)
+        buffer.record(**_answer(900001))
+        buffer.record(**_answer(900002, user_answer=None))  # user_answer is NOT NULL
+        buffer.record(**_answer(900003))
+        await buffer.flush()
+        async with sessions() as db:
+            written = await db.scalar(
+                select(func.count()).where(AnswerTracking.question_id.in_([900001, 900002, 900003]))
+            )
+        await engine.dispose()
+        return buffer.stats(), written
+
+    stats, written = asyncio.run(scenario())
+    assert written == 2
+    assert stats["rejected"] == 1 and stats["pending"] == 0 and stats["flushed_rows"] == 2
+
+
+def test_locked_database_keeps_the_batch():
+    from app.answer_log import AnswerLogBuffer
+
+    class LockedSession:
+        async def __aenter__(self):
+            raise exc.OperationalError("INSERT", {}, Exception("database is locked"))
+
+        async def __aexit__(self, *args):
+            return False
+
+    async def scenario():
+        buffer = AnswerLogBuffer(session_factory=LockedSession, batch_size=1000)
+        buffer.record(**_answer(1))
+        await buffer.flush()
+        buffer.record(**_answer(2))
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert [row["question_id"] for row in buffer._pending] == [1, 2]
+    assert buffer.stats()["rejected"] == 0 and buffer.stats()["failures"] == 1
@@ -0,0 +1,46 @@
+"""
+Optional authentication: public routes treat a bad token as anonymous,
+protected routes still answer 401
+"""
+from datetime import timedelta
+
+import pytest
+
+BAD_TOKENS = ["Bearer not-a-jwt", "Token abc", "Bearer"]
+
+
+def _signed(claims, expires_delta=None):
+    from app.auth.jwt_handler import create_access_token
+
+    return "Bearer " + create_access_token(claims, expires_delta=expires_delta)
+
+
+SIGNED_BAD_TOKENS = {
+    "expired": lambda: _signed({"sub": "1"}, timedelta(minutes=-5)),
+    "non-numeric sub": lambda: _signed({"sub": "admin"}),
+    "no sub": lambda: _signed({"role": "student"}),
+}
+
+
+def _authorization(name):
+    return SIGNED_BAD_TOKENS[name]() if name in SIGNED_BAD_TOKENS else name
+
+
+@pytest.mark.parametrize("authorization", BAD_TOKENS + list(SIGNED_BAD_TOKENS))
+def test_optional_auth_treats_bad_token_as_anonymous(client, question_ids, authorization):
+    authorization = _authorization(authorization)
+    r = client.get("/api/questions/sample", params={"k": 3}, headers={"Authorization": authorization})
+    assert r.status_code == 200, r.text
+    assert r.json()["count"] == 3
+
+
+@pytest.mark.parametrize("authorization", BAD_TOKENS + list(SIGNED_BAD_TOKENS))
+def test_required_auth_still_rejects_bad_token(client, authorization):
+    authorization = _authorization(authorization)
+    r = client.get("/api/auth/me", headers={"Authorization": authorization})
+    assert r.status_code == 401
+
+
+def test_optional_auth_uses_valid_token(client, question_ids, auth_headers):
+    r = client.get("/api/questions/sample", params={"k": 3}, headers=auth_headers)
+    assert r.status_code == 200
@@ -0,0 +1,54 @@
+"""
+Response compression: encoding negotiation, the size threshold, the
+compressed-body cache and conditional GETs on compressed responses
+"""
+LISTING = "/api/questions/?limit=20"
+
+
+def test_brotli_preferred_over_gzip(client, question_ids):
+    r = client.get(LISTING, headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.json()["count"] == 20
+
+    r = client.get(LISTING, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert r.headers["content-encoding"] == "gzip"
+
+
+def test_identity_when_nothing_acceptable(client, question_ids):
+    for accept in ("identity", "deflate", "br;q=0, gzip;q=0"):
+        r = client.get(LISTING, headers={"Accept-Encoding": accept})
+        assert "content-encoding" not in r.headers
+        assert not r.headers["etag"].startswith("W/")
+        assert r.json()["count"] == 20
+
+
+def test_small_bodies_are_not_compressed(client, question_ids):
+    from app.compression import COMPRESSION_MIN_BYTES
+
+    r = client.get("/api/questions/subjects/counts", headers={"Accept-Encoding": "br, gzip"})
+    assert len(r.content) < COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in r.headers
+
+
+def test_second_read_hits_the_compressed_cache(client, question_ids):
+    from app.compression import compressed_bodies
+
+    path = "/api/questions/?limit=17&offset=3"
+    client.get(path, headers={"Accept-Encoding": "br"})
+    before = compressed_bodies.stats()
+    r = client.get(path, headers={"Accept-Encoding": "br"})
+    after = compressed_bodies.stats()
+    assert r.headers["content-encoding"] == "br"
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+def test_weak_etag_revalidates(client, question_ids):
+    r = client.get(LISTING, headers={"Accept-Encoding": "br"})
+    etag = r.headers["etag"]
+    assert etag.startswith("W/")
+
+    r = client.get(LISTING, headers={"Accept-Encoding": "br", "If-None-Match": etag})
+    assert r.status_code == 304
+    assert "Accept-Encoding" in r.headers["vary"]
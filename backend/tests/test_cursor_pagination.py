@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination of GET /api/questions/
+"""
+import base64
+
+import pytest
+
+PATH = "/api/questions/"
+
+
+def walk(client, limit=7, **filters):
+    """Every id reached by following next_cursor from the first page"""
+    ids = []
+    params = {"paginate": "cursor", "limit": limit, **filters}
+    while True:
+        r = client.get(PATH, params=params)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        ids.extend(q["id"] for q in body["questions"])
+        if body["next_cursor"] is None:
+            return ids
+        params["cursor"] = body["next_cursor"]
+
+
+def offset_ids(client, **filters):
+    """The same filter's ids through offset pagination"""
+    ids = []
+    while True:
+        body = client.get(PATH, params={"limit": 50, "offset": len(ids), **filters}).json()
+        ids.extend(q["id"] for q in body["questions"])
+        if len(ids) >= body["total"]:
+            return ids
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"subject": "math"},
+    {"difficulty": "hard"},
+    {"subject": "reading", "difficulty": "medium"},
+])
+def test_walk_reaches_every_question_once(client, question_ids, filters):
+    walked = walk(client, **filters)
+    assert len(walked) == len(set(walked))
+    assert set(walked) == set(offset_ids(client, **filters))
+
+
+def test_walk_is_ordered_by_subject_difficulty_id(client, question_ids):
+    r = client.get(PATH, params={"paginate": "cursor", "limit": 50})
+    keys = [(q["subject"], q["difficulty"], q["id"]) for q in r.json()["questions"]]
+    assert keys == sorted(keys)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    base64.urlsafe_b64encode(b"[1]").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b'["math", "easy", "x"]').decode(),
+])
+def test_malformed_cursor_is_400(client, cursor):
+    r = client.get(PATH, params={"cursor": cursor})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_is_stable_across_inserts(client, question_ids):
+    filters = {"subject": "english"}
+    before = offset_ids(client, **filters)
+
+    params = {"paginate": "cursor", "limit": 3, **filters}
+    first = client.get(PATH, params=params).json()
+    walked = [q["id"] for q in first["questions"]]
+
+    # New english questions in every difficulty, including ones that sort
+    # before the page already served
+    r = client.post("/api/admin/questions/bulk", json={"questions": [
+        {
+            "subject": "english",
+            "difficulty": difficulty,
+            "question_text": f"Inserted mid-walk ({difficulty})",
+            "choices": ["A", "B"],
+            "correct_answer": "A",
+            "explanation": "Because",
+        }
+        for difficulty in ("easy", "medium", "hard")
+    ]})
+    inserted = r.json()["created_ids"]
+
+    params["cursor"] = first["next_cursor"]
+    while params["cursor"]:
+        body = client.get(PATH, params=params).json()
+        walked.extend(q["id"] for q in body["questions"])
+        params["cursor"] = body["next_cursor"]
+
+    # Nothing repeated, nothing that existed before skipped; inserts land
+    # only where the keyset puts them (after the cursor or not at all)
+    assert len(walked) == len(set(walked))
+    assert set(before) <= set(walked)
+    assert set(walked) - set(before) <= set(inserted)
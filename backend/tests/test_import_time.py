@@ -0,0 +1,39 @@
+"""
+Import-time budget for app.main
+Each gunicorn worker imports app.main on boot, so anything slow at import
+(eager clients, schema work, heavy optional packages) lengthens cold starts.
+Override the budget with IMPORT_TIME_BUDGET_SECONDS on slow CI machines.
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+MEASURE = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def test_app_main_import_within_budget(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'import_time.db'}")
+    # Best of three fresh interpreters, to keep one noisy run from failing the build
+    timings = []
+    for _ in range(3):
+        out = subprocess.run(
+            [sys.executable, "-c", MEASURE],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    best = min(timings)
+    assert best < IMPORT_TIME_BUDGET_SECONDS, (
+        f"import app.main took {best:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS}s); "
+        f"run `python -X importtime -c 'import app.main'` to see what got slower"
+    )
+
+
+def test_app_main_import_does_not_touch_database(tmp_path):
+    db_path = tmp_path / "untouched.db"
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, env=env, check=True)
+    # The schema comes from Alembic before the workers start, never from import
+    assert not db_path.exists()
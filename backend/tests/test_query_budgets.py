@@ -0,0 +1,120 @@
+"""
+SQL statements per request for the hot routes
+Budgets are the current counts: a failure means a route started running
+more queries (or the same query per row). Raise a budget deliberately, in
+the same change that needs it.
+"""
+
+
+def test_subject_counts(client, question_ids, query_budget):
+    client.get("/api/questions/subjects/counts")
+    # The counters read, plus at most the catalog's version check
+    with query_budget(2):
+        client.get("/api/questions/subjects/counts")
+
+
+def test_question_listing_is_served_from_catalog(client, question_ids, query_budget):
+    client.get("/api/questions/", params={"limit": 20})
+    # At most the catalog's periodic version check
+    with query_budget(1):
+        client.get("/api/questions/", params={"limit": 20})
+        client.get(f"/api/questions/{question_ids[0]}")
+
+
+def test_conditional_gets_skip_the_database(client, question_ids, query_budget):
+    paths = [
+        "/api/questions/?limit=20",
+        "/api/questions/?paginate=cursor&limit=10",
+        f"/api/questions/{question_ids[0]}",
+        "/api/questions/subjects/counts",
+    ]
+    etags = {}
+    for path in paths:
+        r = client.get(path)
+        assert r.status_code == 200 and "max-age" in r.headers["cache-control"]
+        etags[path] = r.headers["etag"]
+    # At most the catalog's version check, however many requests
+    with query_budget(1):
+        for path in paths:
+            r = client.get(path, headers={"If-None-Match": etags[path]})
+            # Compressed 200s carry the weak form of the same tag
+            assert r.status_code == 304 and etags[path] in (r.headers["etag"], "W/" + r.headers["etag"])
+            assert r.content == b""
+
+
+def test_cursor_page(client, question_ids, query_budget):
+    r = client.get("/api/questions/", params={"paginate": "cursor", "limit": 10})
+    params = {"paginate": "cursor", "limit": 10, "cursor": r.json()["next_cursor"]}
+    client.get("/api/questions/", params=params)  # load the page's bodies into the catalog
+    # The keyset query, plus at most the catalog's version check
+    with query_budget(2):
+        client.get("/api/questions/", params=params)
+
+
+def test_bulk_create_does_not_scale_with_batch_size(client, query_budget):
+    questions = [
+        {
+            "subject": "math",
+            "difficulty": "easy",
+            "question_text": f"Bulk budget question {i}",
+            "choices": ["A", "B"],
+            "correct_answer": "A",
+            "explanation": "Because",
+        }
+        for i in range(100)
+    ]
+    with query_budget(8) as reports:
+        client.post("/api/admin/questions/bulk", json={"questions": questions[:5]})
+        client.post("/api/admin/questions/bulk", json={"questions": questions[5:]})
+    assert reports[0].count == reports[1].count
+
+
+def test_bulk_create_rejects_missing_explanation_up_front(client, query_budget):
+    questions = [
+        {
+            "subject": "science",
+            "difficulty": "hard",
+            "question_text": f"Explanation budget question {i}",
+            "choices": ["A", "B"],
+            "correct_answer": "A",
+            "explanation": "   " if i == 3 else "Because",
+        }
+        for i in range(10)
+    ]
+    # One chunk, not a row-by-row retry
+    with query_budget(8):
+        r = client.post("/api/admin/questions/bulk", json={"questions": questions})
+    body = r.json()
+    assert body["created_count"] == 9
+    assert body["errors"] == [{"index": 3, "error": "explanation is required"}]
+
+
+def test_check_answer(client, question_ids, auth_headers, query_budget):
+    body = {"question_id": question_ids[0], "user_answer": "A"}
+    client.post("/api/questions/check", json=body, headers=auth_headers)
+    with query_budget(1):
+        client.post("/api/questions/check", json=body, headers=auth_headers)
+
+
+def test_batch_check_is_one_query(client, question_ids, auth_headers, query_budget):
+    answers = [{"question_id": question_id, "user_answer": "A"} for question_id in question_ids[:30]]
+    answers.append({"question_id": 999999, "user_answer": "A"})
+    client.post("/api/questions/check/batch", json={"answers": answers[:1]}, headers=auth_headers)
+    # The questions, plus one read of the ratings not held yet
+    with query_budget(2):
+        r = client.post("/api/questions/check/batch", json={"answers": answers}, headers=auth_headers)
+    body = r.json()
+    assert r.status_code == 200 and body["checked"] == 30 and body["errors"] == 1
+    assert body["results"][-1] == {"question_id": 999999, "ok": False, "error": "Question not found"}
+
+
+def test_session_finish_does_not_scale_with_answers(client, question_ids, auth_headers, query_budget):
+    session_id = client.post("/api/sessions/start", json={}, headers=auth_headers).json()["session_id"]
+    with query_budget(8):
+        for question_id in question_ids[:12]:
+            client.post("/api/sessions/submit", headers=auth_headers, json={
+                "session_id": session_id, "question_id": question_id, "user_answer": "A",
+            })
+    with query_budget(2):
+        r = client.post("/api/sessions/finish", json={"session_id": session_id}, headers=auth_headers)
+    assert r.json()["total_questions"] == 12
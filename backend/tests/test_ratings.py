@@ -0,0 +1,160 @@
+"""
+Elo/Rasch ratings: the per-answer update and the NumPy recalibration
+"""
+import asyncio
+import math
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.answer_tracking import AnswerTracking
+from app.models.question import Question
+from app.models.rating import QuestionRating, UserRating
+from app.models.user import User
+from app.ratings import (
+    RATING_K_QUESTION,
+    RATING_K_USER,
+    RATING_SCALE,
+    RatingEngine,
+    fit_ratings,
+    k_factor,
+    question_base,
+    recalibrate,
+)
+
+
+def _engine_with_user(user_id=1, rating=1500.0, answers=0):
+    engine = RatingEngine()
+    # As if _user() had just loaded it: [base, adjustment, answers]
+    engine._users[user_id] = ([rating, 0.0, answers], time.monotonic())
+    return engine
+
+
+def _record(engine, difficulty, is_correct, question_id=10):
+    """engine.record() for a question with no stored rating yet"""
+    engine._questions.setdefault(question_id, [question_base(difficulty), 0.0, 0])
+    return asyncio.run(engine.record(None, 1, question_id, difficulty, is_correct))
+
+
+def test_correct_answer_raises_user_and_lowers_question():
+    engine = _engine_with_user()
+    user_delta, question_delta = _record(engine, "medium", True)
+
+    # Even match (1500 vs 1500): p = 0.5, so each side moves K/2
+    assert user_delta == pytest.approx(RATING_K_USER / 2)
+    assert question_delta == pytest.approx(-RATING_K_QUESTION / 2)
+    assert asyncio.run(engine.user_rating(None, 1)) == pytest.approx(1500 + RATING_K_USER / 2)
+    assert engine.question_rating(10) == pytest.approx(1500 - RATING_K_QUESTION / 2)
+
+
+def test_wrong_answer_lowers_user_and_raises_question():
+    engine = _engine_with_user()
+    user_delta, question_delta = _record(engine, "medium", False)
+    assert user_delta < 0 < question_delta
+
+
+def test_update_size_follows_surprise():
+    # Beating a hard question is worth more than beating an easy one
+    hard, _ = _record(_engine_with_user(), "hard", True)
+    easy, _ = _record(_engine_with_user(), "easy", True)
+    p_easy = 1 / (1 + 10 ** ((1300 - 1500) / RATING_SCALE))
+    assert easy == pytest.approx(RATING_K_USER * (1 - p_easy))
+    assert hard > easy > 0
+
+    # K shrinks as a user accumulates answers
+    seasoned, _ = _record(_engine_with_user(answers=100), "medium", True)
+    assert 0 < seasoned < RATING_K_USER / 2
+
+
+def test_check_starts_from_stored_question_rating(client, auth_headers):
+    from app.database import SessionLocal
+    from app.ratings import rating_engine
+
+    r = client.post("/api/admin/questions", json={
+        "subject": "math", "difficulty": "medium", "question_text": "Stored rating question",
+        "choices": ["A", "B"], "correct_answer": "A", "explanation": "Because",
+    })
+    question_id = r.json()["question_id"]
+    # As recalibration would leave it: well above its base, 50 answers in
+    with SessionLocal() as db:
+        db.execute(insert(QuestionRating).values(question_id=question_id, adjustment=200.0, answers=50))
+        db.commit()
+
+    body = {"question_id": question_id, "user_answer": "B"}
+    client.post("/api/questions/check", json=body, headers=auth_headers)
+    first = rating_engine.question_rating(question_id)
+    client.post("/api/questions/check", json=body, headers=auth_headers)
+    second = rating_engine.question_rating(question_id)
+
+    assert rating_engine._questions[question_id][2] == 52
+    # Each move is sized by K at 50/51 answers, from 1700, not K at 0 from 1500
+    assert 0 < first - 1700.0 <= k_factor(RATING_K_QUESTION, 50)
+    assert 0 < second - first <= k_factor(RATING_K_QUESTION, 51)
+
+
+# user, question, correct: user 0 gets everything right, user 2 everything
+# wrong; question 2 is the one most often missed
+ANSWERS = np.array([
+    (0, 0, 1), (0, 1, 1), (0, 2, 1),
+    (1, 0, 1), (1, 1, 1), (1, 2, 0),
+    (2, 0, 0), (2, 1, 0), (2, 2, 0),
+    (3, 0, 1), (3, 1, 0), (3, 2, 0),
+])
+
+
+def test_fit_ratings_orders_users_and_questions():
+    priors = np.full(4, 1500.0), np.full(3, 1500.0)
+    users, questions = fit_ratings(ANSWERS[:, 0], ANSWERS[:, 1], ANSWERS[:, 2], *priors, iterations=50)
+
+    assert users[0] > users[1] > users[3] > users[2]
+    assert questions[2] > questions[1] > questions[0]
+
+    # Converged: the penalized likelihood's gradient is ~0 at the fit
+    c = math.log(10.0) / RATING_SCALE
+    p = 1 / (1 + np.exp(c * (questions[ANSWERS[:, 1]] - users[ANSWERS[:, 0]])))
+    lam = 1 / (200.0 * c) ** 2
+    grad = np.bincount(ANSWERS[:, 0], ANSWERS[:, 2] - p, 4) - lam * c * (users - 1500.0)
+    assert np.abs(grad).max() < 1e-6
+
+
+def test_recalibrate_replaces_stored_adjustments():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessions() as db:
+            await db.execute(insert(User), [
+                {"id": u + 1, "email": f"u{u}@example.com", "hashed_password": "x", "current_level": "intermediate"}
+                for u in range(4)
+            ])
+            await db.execute(insert(Question), [
+                {"id": q + 1, "subject": "math", "difficulty": "medium", "question_text": "?",
+                 "choices": "[]", "correct_answer": "A", "explanation": "."}
+                for q in range(3)
+            ])
+            await db.execute(insert(UserRating), [{"user_id": 1, "adjustment": 999.0, "answers": 1}])
+            await db.execute(insert(AnswerTracking), [
+                {"user_id": int(u) + 1, "question_id": int(q) + 1, "user_answer": "A",
+                 "is_correct": bool(c), "subject": "math"}
+                for u, q, c in ANSWERS
+            ])
+            await db.commit()
+
+            summary = await recalibrate(db, iterations=50)
+            users = dict((await db.execute(select(UserRating.user_id, UserRating.adjustment))).all())
+            questions = dict((await db.execute(select(QuestionRating.question_id, QuestionRating.answers))).all())
+        await engine.dispose()
+        return summary, users, questions
+
+    summary, users, questions = asyncio.run(scenario())
+    assert summary == {"answers": 12, "users": 4, "questions": 3}
+
+    expected, _ = fit_ratings(ANSWERS[:, 0], ANSWERS[:, 1], ANSWERS[:, 2], np.full(4, 1500.0), np.full(3, 1500.0))
+    assert [users[u + 1] for u in range(4)] == pytest.approx(list(expected - 1500.0))
+    assert questions == {1: 4, 2: 4, 3: 4}
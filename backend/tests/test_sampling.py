@@ -0,0 +1,87 @@
+"""
+Random and stratified sampling: SeenSet, draw, allocate, parse_mix and
+GET /api/questions/sample
+"""
+import random
+
+import pytest
+
+from app.sampling import SeenSet, allocate, draw, parse_mix
+
+
+def test_seen_set():
+    seen = SeenSet([3, 17, 3, 1024])
+    seen.add(17)
+    assert len(seen) == 3
+    assert list(seen) == [3, 17, 1024]
+    assert 17 in seen and 1024 in seen
+    assert 4 not in seen and 10 ** 6 not in seen
+
+
+def test_draw_skips_seen_until_exhausted():
+    ids = list(range(1, 201))
+    seen = SeenSet(range(1, 191))
+    for seed in range(50):
+        rng = random.Random(seed)
+        picked = draw(ids, 5, exclude=seen, rng=rng)
+        assert len(picked) == len(set(picked)) == 5
+        assert not any(q in seen for q in picked)
+        # Asking for more than is unseen returns exactly the unseen ones
+        assert sorted(draw(ids, 50, exclude=seen, rng=rng)) == list(range(191, 201))
+
+
+def test_draw_respects_taken():
+    ids = list(range(1, 21))
+    taken = set(range(1, 16))
+    assert sorted(draw(ids, 10, taken=taken, rng=random.Random(1))) == [16, 17, 18, 19, 20]
+
+
+@pytest.mark.parametrize("k, weights, expected", [
+    (10, {"a": 1, "b": 1, "c": 1}, {"a": 4, "b": 3, "c": 3}),
+    (7, {"medium": 40, "hard": 30, "easy": 30}, {"medium": 3, "hard": 2, "easy": 2}),
+    (5, {"a": 0.5, "b": 0.5}, None),
+    (1, {"a": 1, "b": 1, "c": 1, "d": 1}, None),
+    (50, {"math": 0.1, "reading": 0.2, "science": 0.7}, {"math": 5, "reading": 10, "science": 35}),
+])
+def test_allocate_sums_to_k(k, weights, expected):
+    counts = allocate(k, weights)
+    assert sum(counts.values()) == k
+    assert set(counts) == set(weights)
+    if expected is not None:
+        assert counts == expected
+
+
+def test_parse_mix():
+    assert parse_mix("Medium:40, hard:30,easy:30,") == {"medium": 40.0, "hard": 30.0, "easy": 30.0}
+    assert parse_mix("math:0.5,math:0.25") == {"math": 0.75}
+
+
+@pytest.mark.parametrize("mix", ["medium40", "medium:abc", "medium:-1", ",", "medium:0,hard:0", "geometry:1"])
+def test_malformed_mix_is_400(client, question_ids, mix):
+    r = client.get("/api/questions/sample", params={"mix": mix})
+    assert r.status_code == 400, r.text
+
+
+def test_sample_prefers_unseen_questions(client, question_ids):
+    r = client.post("/api/auth/register", json={
+        "email": "sampler@example.com", "username": "sampler", "password": "Sampler-Password-1",
+    })
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    params = {"subject": "reading", "difficulty": "easy"}
+    pool = [q["id"] for q in client.get("/api/questions/", params={**params, "limit": 50}).json()["questions"]]
+    assert len(pool) >= 3
+
+    answered = pool[: len(pool) // 2]
+    client.post("/api/questions/check/batch", headers=headers, json={
+        "answers": [{"question_id": question_id, "user_answer": "A"} for question_id in answered],
+    })
+
+    unseen = len(pool) - len(answered)
+    r = client.get("/api/questions/sample", headers=headers, params={**params, "k": unseen})
+    assert r.json()["repeats"] == 0
+    assert {q["id"] for q in r.json()["questions"]} == set(pool) - set(answered)
+
+    # Only once the unseen ones run out are answered questions repeated
+    r = client.get("/api/questions/sample", headers=headers, params={**params, "k": len(pool)})
+    assert r.json()["repeats"] == len(answered)
+    assert sorted(q["id"] for q in r.json()["questions"]) == sorted(pool)
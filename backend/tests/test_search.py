@@ -0,0 +1,83 @@
+"""
+Full-text search: results follow edits and deletes made the documented way
+(unindex the old text, write, re-index) in one transaction
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+def _search(client, q, **filters):
+    r = client.get("/api/questions/search", params={"q": q, **filters})
+    assert r.status_code == 200, r.text
+    return {question["id"]: question["question_text"] for question in r.json()["questions"]}
+
+
+def _write(write):
+    """Run `write(db)` in its own session, as a script would, and bump the catalog"""
+    from app.catalog import catalog_version_bump, question_catalog
+    from app.database import async_engine
+
+    async def scenario():
+        engine = create_async_engine(async_engine.url, poolclass=NullPool)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessions() as db:
+            await write(db)
+            await db.execute(catalog_version_bump(db))
+            await db.commit()
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    # Let this worker notice the new version now rather than after the window
+    question_catalog._checked_at -= question_catalog.revalidate_seconds
+
+
+def _create(client, text):
+    r = client.post("/api/admin/questions", json={
+        "subject": "science", "difficulty": "hard", "question_text": text,
+        "choices": ["A", "B"], "correct_answer": "A", "explanation": "Because",
+    })
+    assert r.status_code == 200, r.text
+    return r.json()["question_id"]
+
+
+@pytest.mark.parametrize("filters", [{}, {"subject": "science"}])
+def test_search_follows_an_edit(client, filters):
+    from app.models.question import Question
+    from app.search import apply_search_index, remove_from_search_index
+
+    question_id = _create(client, f"Which organelle does the zebrafish {len(filters)} use?")
+    assert question_id in _search(client, "zebrafish", **filters)
+
+    async def edit(db):
+        await remove_from_search_index(db, [question_id])
+        await db.execute(
+            update(Question).where(Question.id == question_id)
+            .values(question_text=f"Which organelle does the axolotl {len(filters)} use?")
+        )
+        await apply_search_index(db, [question_id])
+
+    _write(edit)
+    assert question_id not in _search(client, "zebrafish", **filters)
+    assert _search(client, "axolotl", **filters)[question_id].startswith("Which organelle does the axolotl")
+
+
+def test_search_drops_a_deleted_question(client):
+    from app.models.question import Question
+    from app.question_counts import apply_count_deltas, count_deltas
+    from app.search import remove_from_search_index
+
+    question_id = _create(client, "How far does a narwhal swim?")
+
+    async def remove(db):
+        question = await db.get(Question, question_id)
+        await remove_from_search_index(db, [question_id])
+        await apply_count_deltas(db, count_deltas([question], sign=-1))
+        await db.execute(delete(Question).where(Question.id == question_id))
+
+    _write(remove)
+    r = client.get("/api/questions/search", params={"q": "narwhal"})
+    assert r.json()["questions"] == [] and r.json()["total"] == 0
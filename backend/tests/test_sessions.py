@@ -0,0 +1,73 @@
+"""
+Practice sessions: the running tallies kept on practice_sessions always
+equal a recount of the session's rows in user_answers
+"""
+from sqlalchemy import case, func, select
+
+SUBJECTS = ["math", "english", "reading", "science"]
+
+
+def _recount(session_id):
+    from app.database import SessionLocal
+    from app.models.answer_tracking import AnswerTracking
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                AnswerTracking.subject,
+                func.count(),
+                func.sum(case((AnswerTracking.is_correct, 1), else_=0)),
+            )
+            .where(AnswerTracking.session_id == session_id)
+            .group_by(AnswerTracking.subject)
+        ).all()
+    counts = {}
+    for subject in SUBJECTS:
+        counts[f"{subject}_total"] = counts[f"{subject}_correct"] = 0
+    for subject, total, correct in rows:
+        counts[f"{subject}_total"] = total
+        counts[f"{subject}_correct"] = correct
+    counts["total_questions"] = sum(counts[f"{s}_total"] for s in SUBJECTS)
+    counts["correct_answers"] = sum(counts[f"{s}_correct"] for s in SUBJECTS)
+    return counts
+
+
+def _tallies(session_id):
+    from app.database import SessionLocal
+    from app.models.practice_session import PracticeSession
+
+    with SessionLocal() as db:
+        session = db.get(PracticeSession, session_id)
+        return {column: getattr(session, column) for column in _recount(session_id)}
+
+
+def test_tallies_match_a_recount(client, auth_headers, question_ids):
+    session_id = client.post("/api/sessions/start", json={}, headers=auth_headers).json()["session_id"]
+
+    # Fixture questions cycle through the subjects; "A" is always right
+    for i, question_id in enumerate(question_ids[:14]):
+        r = client.post("/api/sessions/submit", headers=auth_headers, json={
+            "session_id": session_id, "question_id": question_id,
+            "user_answer": "A" if i % 3 else "B",
+        })
+        assert r.status_code == 200, r.text
+        assert _tallies(session_id) == _recount(session_id)
+
+    # A rejected submit changes nothing
+    r = client.post("/api/sessions/submit", headers=auth_headers, json={
+        "session_id": session_id, "question_id": 999999, "user_answer": "A",
+    })
+    assert r.status_code == 404
+    expected = _recount(session_id)
+    assert expected["total_questions"] == 14 and expected["correct_answers"] == 9
+    assert _tallies(session_id) == expected
+
+    finished = client.post("/api/sessions/finish", json={"session_id": session_id}, headers=auth_headers).json()
+    assert finished["total_questions"] == 14 and finished["total_correct"] == 9
+
+    # Nor does a submit after the session is finished
+    r = client.post("/api/sessions/submit", headers=auth_headers, json={
+        "session_id": session_id, "question_id": question_ids[0], "user_answer": "A",
+    })
+    assert r.status_code == 404
+    assert _tallies(session_id) == _recount(session_id) == expected
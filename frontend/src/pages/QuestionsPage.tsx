@@ -22,7 +22,7 @@ interface Answer {
 
 const QuestionsPage: React.FC = () => {
   const navigate = useNavigate();
-  const { user } = useAuth();
+  const { user, token } = useAuth();
 
   const [questions, setQuestions] = useState<Question[]>([]);
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
@@ -37,7 +37,10 @@ const QuestionsPage: React.FC = () => {
   const fetchQuestions = useCallback(async () => {
     try {
       setLoading(true);
-      const res = await fetch(`${API_URL}/questions?limit=10`);
+      // Random draw; signed-in users skip questions they've already answered
+      const res = await fetch(`${API_URL}/questions/sample?k=10`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+      });
       if (res.ok) {
         const data = await res.json();
         setQuestions(data.questions || []);
@@ -48,7 +51,7 @@ const QuestionsPage: React.FC = () => {
     } finally {
       setLoading(false);
     }
-  }, [API_URL]);
+  }, [API_URL, token]);
 
   useEffect(() => {
     fetchQuestions();